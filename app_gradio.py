@@ -20,6 +20,7 @@ def build_docstring_tab():
             with gr.Row():
                 model_selector = gr.Dropdown(label="Model", choices=models, value=models[0])
                 names_input = gr.Textbox(label="Names (comma-separated)", placeholder="e.g. foo,bar,BazClass")
+            force_input = gr.Checkbox(label="Regenerate adequate docstrings (force)", value=False)
 
         scan_btn = gr.Button("🔍 Scan & Generate")
 
@@ -45,7 +46,7 @@ def build_docstring_tab():
         # Button callbacks
         scan_btn.click(
             fn=gradio_scan_and_generate,
-            inputs=[folder_input, model_selector, names_input, project_input],
+            inputs=[folder_input, model_selector, names_input, project_input, force_input],
             outputs=[original_box, suggested_box, source_box, state_index, state_results, status_box],
         )
 
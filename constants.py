@@ -1,3 +1,4 @@
+import atexit
 import os
 
 from dotenv import load_dotenv
@@ -7,6 +8,16 @@ from openai import AsyncOpenAI
 #############
 
 MAX_TOKENS = 1000
+CONTEXT_TOKEN_BUDGET = 2000  # Max tokens of project context snippets per prompt
+CONTEXT_MODE = "stub"        # "stub" (signatures + first docstring line) or "edges" (head/tail source lines)
+GENERATION_CONCURRENCY = 4   # Files generated at the same time
+PIPELINE_QUEUE_SIZE = 8      # Generated files waiting to be written (backpressure)
+IO_WORKERS = 4               # Threads for file I/O and parsing off the event loop
+REVIEW_CONCURRENCY = 4       # Test files reviewed by the fixer agent at the same time
+TEST_WORKERS = os.cpu_count() or 1  # Sandboxed pytest processes verifying generated tests at once
+TEST_TIMEOUT = 120           # Seconds before a sandboxed test file run is killed
+FIXER_MODE = "patch"         # "patch" (failing blocks in, structured edits out) or "file" (whole test file rewrite)
+COVERAGE_THRESHOLD = 0.8     # Coverage-guided runs only generate tests for items covered below this ratio
 
 ############
 # API KEYS #
@@ -26,8 +37,9 @@ groq_url = "https://api.groq.com/openai/v1"
 # CLIENTS #
 ###########
 
-groq_client     = AsyncOpenAI(base_url=groq_url, api_key=groq_api_key)
-openai_client   = AsyncOpenAI()
+# Placeholder keys keep imports working offline; real calls still fail with a 401
+groq_client     = AsyncOpenAI(base_url=groq_url, api_key=groq_api_key or "missing-groq-key")
+openai_client   = AsyncOpenAI(api_key=openai_api_key or "missing-openai-key")
 
 
 # Clients models and client dictionary
@@ -45,3 +57,18 @@ clients = {
     "openai/gpt-oss-120b": groq_client,  # Groq GPT OSS 120B powerful  $0.15/$0.60
 }
 
+# Model ladder for --cascade, cheapest first (override with MODEL_CASCADE="model_a,model_b")
+MODEL_CASCADE = [
+    m.strip()
+    for m in os.getenv(
+        "MODEL_CASCADE",
+        "openai/gpt-oss-20b,meta-llama/llama-4-scout-17b-16e-instruct,openai/gpt-oss-120b",
+    ).split(",")
+    if m.strip()
+]
+
+# Offline deterministic backend for benchmarks and tests (FAKE_LLM=1)
+if os.getenv("FAKE_LLM"):
+    from src.core_base.agents.fake_llm import register_fake_model
+    fake_client = register_fake_model(clients, models)
+    atexit.register(lambda: print(fake_client.stats.summary()))
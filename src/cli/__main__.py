@@ -1,12 +1,16 @@
 import typer
 from src.cli.docstring_cli import docstring_app
 from src.cli.unit_test_cli import unit_test_app   
+from src.cli.generate_cli import generate_app
+from src.cli.merge_cli import merge_apply
 
 app = typer.Typer(help="LLM-based developer tools CLI")
 
 # Register subcommands
 app.add_typer(docstring_app, name="docstring")
 app.add_typer(unit_test_app, name="unit_test")  
+app.add_typer(generate_app, name="generate")
+app.command("merge-apply")(merge_apply)
 
 if __name__ == "__main__":
     app()
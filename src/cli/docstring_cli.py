@@ -1,6 +1,7 @@
 import typer
 from src.docstring_core.docstring_executor import execute_docstring_in_path
-from constants import models
+from src.core_base.executor.sharding import parse_shard
+from constants import models, MODEL_CASCADE
 
 docstring_app = typer.Typer(help="Python docstring auto-generator and updater")
 
@@ -18,7 +19,7 @@ def scan_and_generate(
         None,
         "--names",
         "-n",
-        help="Comma-separated list of function/class names to process (e.g. 'foo,bar,BazClass')",
+        help="Comma-separated list of function/class names to process (e.g. 'foo,bar,BazClass,BazClass.run')",
     ),
     project_path: str = typer.Option(
         None,
@@ -26,6 +27,32 @@ def scan_and_generate(
         "-p",
         help="Root path of the project to index (optional)",
     ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        "-f",
+        help="Regenerate docstrings even when the existing ones already match the signature",
+    ),
+    cascade: bool = typer.Option(
+        False,
+        "--cascade",
+        help=f"Try the cheapest model first and escalate failing items ({' → '.join(MODEL_CASCADE)})",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Continue an interrupted run: skip written files and write checkpointed results without calling the model",
+    ),
+    shard: str = typer.Option(
+        None,
+        "--shard",
+        help="Only process shard i of n (e.g. '2/4') and save the results to a JSONL file for 'merge-apply'",
+    ),
+    shard_output: str = typer.Option(
+        None,
+        "--shard-output",
+        help="Shard results file (default: .code_index/shards/<kind>-<i>-of-<n>.jsonl)",
+    ),
 ):
     """
     Automatically scans a specified folder or file to update docstrings using the selected model. This function can also filter the update process to specific functions or classes provided in the input.
@@ -35,9 +62,14 @@ def scan_and_generate(
       model_name (str): The name of the model to use for generating docstrings. Default is 'gpt-4o-mini'.
       names (str): A comma-separated list of function or class names to specifically process. This is optional.
       project_path (str): The root path of the project to index, which is also optional.
+      force (bool): Regenerate every docstring, including the ones that are already adequate.
+      cascade (bool): Use the MODEL_CASCADE ladder instead of a single model.
+      resume (bool): Continue the previous interrupted run of this path from its journal.
+      shard (str): Process only shard 'i/n' of the files and save the results for 'merge-apply'.
+      shard_output (str): The shard results file, optional.
     
     Raises:
-      Exit: If the provided model name is invalid.
+      Exit: If the provided model name or shard is invalid, or a shard is given without a project.
     
     Returns:
       None: This function performs actions and does not return a value.
@@ -46,9 +78,25 @@ def scan_and_generate(
         typer.echo(f"❌ Invalid model '{model_name}'. Available: {', '.join(models)}")
         raise typer.Exit(code=1)
 
+    cascade_models = MODEL_CASCADE if cascade else None
+    unknown = [m for m in cascade_models or [] if m not in models]
+    if unknown:
+        typer.echo(f"❌ Invalid cascade model(s) {', '.join(unknown)}. Available: {', '.join(models)}")
+        raise typer.Exit(code=1)
+
+    try:
+        shard_spec = parse_shard(shard) if shard else None
+    except ValueError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+    if shard_spec and not project_path:
+        # Shard results store paths relative to the project root that merge-apply resolves them against
+        typer.echo("❌ --shard requires --project (the root that merge-apply applies the results to).")
+        raise typer.Exit(code=1)
+
     target_names = [n.strip() for n in names.split(",")] if names else None
 
-    typer.echo(f"🔍 Scanning {path} using {model_name}...")
+    typer.echo(f"🔍 Scanning {path} using {' → '.join(cascade_models) if cascade else model_name}...")
     if target_names:
         typer.echo(f"🎯 Filtering for: {', '.join(target_names)}")
     if project_path:
@@ -59,4 +107,9 @@ def scan_and_generate(
         model_name=model_name,
         target_names=target_names,
         project_path=project_path,  # for project indexer
+        force=force,
+        cascade=cascade_models,
+        resume=resume,
+        shard=shard_spec,
+        shard_output=shard_output,
     )
\ No newline at end of file
@@ -0,0 +1,151 @@
+import typer
+from src.combined_core.combined_executor import execute_all_in_path
+from src.core_base.executor.sharding import parse_shard
+from pathlib import Path
+from constants import models, MODEL_CASCADE, COVERAGE_THRESHOLD
+import asyncio
+
+generate_app = typer.Typer(help="Combined generators sharing one indexing and context pass")
+
+@generate_app.command("all")
+def scan_and_generate_all(
+    path: str = typer.Argument(..., help="Path to file or folder to scan for code"),
+    project_path: str = typer.Argument(..., help="Root path of the project to index"),
+    model_name: str = typer.Option(
+        "openai/gpt-oss-120b",
+        "--model",
+        "-m",
+        help=f"Model to use ({', '.join(models)})",
+        case_sensitive=False,
+    ),
+    names: str = typer.Option(
+        None,
+        "--names",
+        "-n",
+        help="Comma-separated list of function/class names to process (e.g. 'foo,bar,BazClass,BazClass.run')",
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        "-f",
+        help="Regenerate adequate docstrings and generate tests for functions/classes that already have tests",
+    ),
+    coverage: str = typer.Option(
+        None,
+        "--coverage",
+        help="coverage.py data file (e.g. .coverage): only generate tests for items below --coverage-threshold, least covered first",
+    ),
+    coverage_threshold: float = typer.Option(
+        COVERAGE_THRESHOLD,
+        "--coverage-threshold",
+        min=0.0,
+        max=1.0,
+        help="With --coverage, skip items whose statement coverage is at least this ratio",
+    ),
+    feed_docstrings: bool = typer.Option(
+        False,
+        "--feed-docstrings",
+        help="Generate docstrings first and include them in the unit test prompts (slower: no overlap per file)",
+    ),
+    cascade: bool = typer.Option(
+        False,
+        "--cascade",
+        help=f"Try the cheapest model first and escalate failing items ({' → '.join(MODEL_CASCADE)})",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Continue an interrupted run: skip written files and write checkpointed results without calling the model",
+    ),
+    shard: str = typer.Option(
+        None,
+        "--shard",
+        help="Only process shard i of n (e.g. '2/4') and save the results to a JSONL file for 'merge-apply'",
+    ),
+    shard_output: str = typer.Option(
+        None,
+        "--shard-output",
+        help="Shard results file (default: .code_index/shards/<kind>-<i>-of-<n>.jsonl)",
+    ),
+    verify: bool = typer.Option(
+        False,
+        "--verify",
+        help="Run each test file with pytest in a sandbox (scratch copy, no network, timeout) before writing it",
+    ),
+    fix_rounds: int = typer.Option(
+        0,
+        "--fix-rounds",
+        min=0,
+        help="With --verify, send failing tests back to the fixer up to this many times",
+    ),
+):
+    """
+    Generates docstrings and pytest unit tests for a file or folder in one run: the project is
+    indexed once and both agents share the extracted items and context snippets.
+    
+    Args:
+      path (str): File or folder containing Python code.
+      project_path (str): Root path of the project to index (mandatory).
+      model_name (str): Model to use for generation. Default is 'openai/gpt-oss-120b'.
+      names (str): Optional comma-separated list of function or class names to process.
+      force (bool): Regenerate adequate docstrings and tests for items that already have tests.
+      coverage (str): A coverage.py data file used to pick the least covered items, optional.
+      coverage_threshold (float): With coverage, the ratio from which items are skipped.
+      feed_docstrings (bool): Generate docstrings before the tests and show them in the test prompts.
+      cascade (bool): Use the MODEL_CASCADE ladder instead of a single model.
+      resume (bool): Continue the previous interrupted run of this path from its journal.
+      shard (str): Process only shard 'i/n' of the files and save the results for 'merge-apply'.
+      shard_output (str): The shard results file, optional.
+      verify (bool): Run the generated tests in a sandbox and report per-file pass rates.
+      fix_rounds (int): Fixer rounds for test files with failing tests (requires verify).
+    """
+    if model_name not in models:
+        typer.echo(f"❌ Invalid model '{model_name}'. Available: {', '.join(models)}")
+        raise typer.Exit(code=1)
+
+    cascade_models = MODEL_CASCADE if cascade else None
+    unknown = [m for m in cascade_models or [] if m not in models]
+    if unknown:
+        typer.echo(f"❌ Invalid cascade model(s) {', '.join(unknown)}. Available: {', '.join(models)}")
+        raise typer.Exit(code=1)
+
+    try:
+        shard_spec = parse_shard(shard) if shard else None
+    except ValueError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+    if coverage and not Path(coverage).is_file():
+        typer.echo(f"❌ Coverage data file not found: {coverage}")
+        raise typer.Exit(code=1)
+
+    if fix_rounds and not verify:
+        typer.echo("❌ --fix-rounds requires --verify")
+        raise typer.Exit(code=1)
+
+    target_names = [n.strip() for n in names.split(",")] if names else None
+
+    typer.echo(f"🧪 Generating docstrings and unit tests for {path} using {' → '.join(cascade_models) if cascade else model_name}...")
+    typer.echo(f"🏷 Using project index at: {project_path}")
+    if target_names:
+        typer.echo(f"🎯 Filtering for: {', '.join(target_names)}")
+
+    asyncio.run(
+        execute_all_in_path(
+        path=path,
+        model_name=model_name,
+        target_names=target_names,
+        project_path=project_path,
+        cascade=cascade_models,
+        force=force,
+        coverage_file=coverage,
+        coverage_threshold=coverage_threshold,
+        feed_docstrings=feed_docstrings,
+        resume=resume,
+        shard=shard_spec,
+        shard_output=shard_output,
+        verify=verify,
+        fix_rounds=fix_rounds,
+        )
+    )
+    
\ No newline at end of file
@@ -0,0 +1,122 @@
+import asyncio
+from pathlib import Path
+from typing import Dict, List
+
+import typer
+from src.core_base.executor.sharding import load_shard_results
+from src.core_base.indexer.project_indexer import ProjectIndexer
+from src.combined_core.combined_generator import split_by_kind
+from src.docstring_core.docstring_writer import write_docstrings
+from src.unit_test_core.unit_test_writer import UnitTestWriterWithReview
+from constants import models
+
+
+async def apply_shard_results(merged: Dict[str, Dict[str, List[dict]]], project_path: str, model_name: str):
+    """
+    Applies merged shard results: each source file is written once, with the writer of its kind.
+    
+    Args:
+      merged (Dict[str, Dict[str, List[dict]]]): The items per kind and source file (see load_shard_results).
+      project_path (str): The project root the results are applied to.
+      model_name (str): The model used to review unit tests before writing them.
+    
+    Returns:
+      None
+    """
+    writers: Dict[str, UnitTestWriterWithReview] = {}
+    indexer = ProjectIndexer(Path(project_path))
+    for record_kind, files in merged.items():
+        for file_path, file_items in files.items():
+            # Combined runs ('generate all') store both kinds, tagged per item
+            for kind, items in split_by_kind(file_items, default=record_kind).items():
+                await _apply_file_results(kind, file_path, items, project_path, model_name, indexer, writers)
+
+
+async def _apply_file_results(
+    kind: str,
+    file_path: str,
+    items: List[dict],
+    project_path: str,
+    model_name: str,
+    indexer: ProjectIndexer,
+    writers: Dict[str, UnitTestWriterWithReview],
+):
+    """
+    Writes the results of one kind for one source file.
+    
+    Args:
+      kind (str): 'docstrings' or 'unit tests'.
+      file_path (str): The source file.
+      items (List[dict]): Its results of that kind.
+      project_path (str): The project root the results are applied to.
+      model_name (str): The model used to review unit tests before writing them.
+      indexer (ProjectIndexer): The project index refreshed after each change.
+      writers (Dict[str, UnitTestWriterWithReview]): The unit test writer, created on first use and reused.
+    """
+    if kind == "docstrings":
+        changed = await write_docstrings(Path(file_path), items, indexer=indexer)
+    elif kind == "unit tests":
+        if kind not in writers:
+            writers[kind] = UnitTestWriterWithReview(model_name=model_name)
+        changed = await writers[kind].write_unit_tests(items, project_path=project_path, indexer=indexer)
+    else:
+        print(f"[WARN] Unknown result kind '{kind}' for {file_path}, skipped")
+        return
+    if not changed:
+        print(f"[INFO] {kind.capitalize()} already up to date in {file_path}")
+        return
+    print(f"✅ {kind.capitalize()} writen in {file_path}")
+
+
+def merge_apply(
+    results: List[str] = typer.Argument(..., help="Shard results files (.jsonl) produced with --shard"),
+    project_path: str = typer.Option(
+        ".",
+        "--project",
+        "-p",
+        help="Root path of the project the results are applied to",
+    ),
+    model_name: str = typer.Option(
+        "openai/gpt-oss-120b",
+        "--model",
+        "-m",
+        help=f"Model used to review unit tests before writing ({', '.join(models)})",
+        case_sensitive=False,
+    ),
+):
+    """
+    Merges the JSONL results of all shards and applies them to the project in one pass.
+    
+    Args:
+      results (List[str]): The shard results files.
+      project_path (str): The project root; stored relative paths are resolved against it.
+      model_name (str): The model used to review unit tests before writing them.
+    
+    Raises:
+      Exit: If the model name is invalid, a results file does not exist or a stored path is not found under the project.
+    """
+    if model_name not in models:
+        typer.echo(f"❌ Invalid model '{model_name}'. Available: {', '.join(models)}")
+        raise typer.Exit(code=1)
+
+    missing = [r for r in results if not Path(r).is_file()]
+    if missing:
+        typer.echo(f"❌ Results file(s) not found: {', '.join(missing)}")
+        raise typer.Exit(code=1)
+
+    merged = load_shard_results([Path(r) for r in results], Path(project_path))
+    # Stored paths are relative to the project root of the shard runs: a missing file means the wrong --project
+    unresolved = sorted({
+        path
+        for files in merged.values()
+        for file_path, items in files.items()
+        for path in [file_path, *(item["file_path"] for item in items)]
+        if not Path(path).is_file()
+    })
+    if unresolved:
+        typer.echo(f"❌ Source file(s) not found under {project_path}: {', '.join(unresolved)}")
+        typer.echo("   Pass the project root the shards were run with (--project).")
+        raise typer.Exit(code=1)
+    total = sum(len(files) for files in merged.values())
+    typer.echo(f"🧩 Applying {total} file(s) from {len(results)} shard result file(s) to {project_path}...")
+    asyncio.run(apply_shard_results(merged, project_path, model_name))
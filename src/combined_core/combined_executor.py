@@ -0,0 +1,130 @@
+import functools
+from pathlib import Path
+from typing import Optional, List, Tuple
+from constants import COVERAGE_THRESHOLD, REVIEW_CONCURRENCY
+from src.core_base.executor.executor import execute_in_path
+from src.core_base.indexer.project_indexer import ProjectIndexer
+from src.combined_core.combined_generator import DOCSTRINGS, UNIT_TESTS, split_by_kind, stream_all_from_path
+from src.docstring_core.docstring_writer import write_docstrings
+from src.unit_test_core.unit_test_writer import UnitTestWriterWithReview
+from src.unit_test_core.sandbox_runner import SandboxRunner
+
+async def _combined_writer_wrapper(
+    file_path: Path,
+    items: List[dict],
+    project_path: str,
+    writer: UnitTestWriterWithReview,
+    indexer: Optional[ProjectIndexer] = None,
+    **_,
+) -> bool:
+    """
+    Writes the unit tests and then the docstrings generated for one source file.
+
+    Args:
+      file_path (Path): The source file.
+      items (List[dict]): Its docstring and unit test outputs (told apart by their 'kind').
+      project_path (str): The root path of the project; test files are mirrored under its tests/ folder.
+      writer (UnitTestWriterWithReview): The unit test writer shared by the whole run.
+      indexer (Optional[ProjectIndexer]): Project index refreshed after the files change.
+
+    Returns:
+      bool: True if the test file or the source file changed.
+
+    Raises:
+      Exception: The unit test writer's error, after the docstrings were written.
+    """
+    groups = split_by_kind(items)
+    changed = False
+    test_error = None
+    if groups.get(UNIT_TESTS):
+        # A failing test file must not cost the source file its docstrings: write them, then report it
+        try:
+            changed |= bool(await writer.write_unit_tests(groups[UNIT_TESTS], project_path=project_path, indexer=indexer))
+        except Exception as e:
+            test_error = e
+    if groups.get(DOCSTRINGS):
+        changed |= await write_docstrings(file_path, groups[DOCSTRINGS], indexer=indexer)
+    if test_error is not None:
+        raise test_error
+    return changed
+
+async def execute_all_in_path(
+    path: str,
+    model_name: str = "gpt-4o-mini",
+    project_path: str = "",
+    target_names: Optional[List[str]] = None,
+    cascade: Optional[List[str]] = None,
+    force: bool = False,
+    coverage_file: Optional[str] = None,
+    coverage_threshold: float = COVERAGE_THRESHOLD,
+    feed_docstrings: bool = False,
+    resume: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_output: Optional[str] = None,
+    verify: bool = False,
+    fix_rounds: int = 0,
+):
+    """
+    Generates and writes docstrings and unit tests for a path in a single run.
+
+    The project is indexed once and every file is extracted once; both agents share the index and
+    the context snippets (see CombinedGenerationManager). Each file's tests and docstrings are
+    written as soon as the file is generated.
+
+    Args:
+      path (str): The file or folder path to process.
+      model_name (str, optional): The model name to use for generation. Defaults to 'gpt-4o-mini'.
+      project_path (str): The base path for the project, which cannot be empty.
+      target_names (Optional[List[str]], optional): Specific names of targets to process.
+      cascade (Optional[List[str]], optional): A model ladder (cheapest first) used instead of `model_name`.
+      force (bool, optional): Regenerate adequate docstrings and tests for items that already have tests. Defaults to False.
+      coverage_file (Optional[str], optional): A coverage.py data file; only items covered below `coverage_threshold` get tests. Defaults to None.
+      coverage_threshold (float, optional): Coverage ratio (0-1) from which items are skipped. Defaults to COVERAGE_THRESHOLD.
+      feed_docstrings (bool, optional): Generate docstrings first and include them in the test prompts. Defaults to False.
+      resume (bool, optional): Continue the previous interrupted run from its journal. Defaults to False.
+      shard (Optional[Tuple[int, int]], optional): Only process shard i of n and write its results to a JSONL file. Defaults to None.
+      shard_output (Optional[str], optional): The shard results file. Defaults to `.code_index/shards/<kind>-<i>-of-<n>.jsonl`.
+      verify (bool, optional): Run every test file in a sandbox before writing it and report pass rates. Defaults to False.
+      fix_rounds (int, optional): With `verify`, fixer rounds for test files with failing tests. Defaults to 0.
+
+    Raises:
+      ValueError: If the project_path is not provided.
+
+    Returns:
+      None
+    """
+    if not project_path:
+        raise ValueError("`project_path` is required to generate docstrings and tests.")
+    verifier = SandboxRunner(Path(project_path)) if verify and not shard else None
+    writer = UnitTestWriterWithReview(
+        model_name=model_name,
+        review_concurrency=REVIEW_CONCURRENCY,
+        verifier=verifier,
+        fix_rounds=fix_rounds,
+    )
+    try:
+        await execute_in_path(
+            path=path,
+            stream_func=stream_all_from_path,
+            write_func=functools.partial(_combined_writer_wrapper, writer=writer),
+            model_name=model_name,
+            item_name=f"{DOCSTRINGS} and {UNIT_TESTS}",
+            target_names=target_names,
+            project_path=project_path,
+            generate_kwargs={
+                "cascade": cascade,
+                "force": force,
+                "coverage_file": coverage_file,
+                "coverage_threshold": coverage_threshold,
+                "feed_docstrings": feed_docstrings,
+            },
+            resume=resume,
+            shard=shard,
+            shard_output=shard_output,
+            write_concurrency=REVIEW_CONCURRENCY,
+        )
+    finally:
+        if verifier is not None:
+            if verifier.results:
+                print(verifier.summary())
+            verifier.close()
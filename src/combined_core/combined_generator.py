@@ -0,0 +1,268 @@
+import asyncio
+import copy
+import textwrap
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from constants import COVERAGE_THRESHOLD, GENERATION_CONCURRENCY
+from src.core_base.code.code_extractor import get_filtered_code_items
+from src.core_base.code.code_model import CodeItem
+from src.core_base.generate.cascade import ModelCascade
+from src.core_base.generate.generator_manager import BaseGenerationManager
+from src.core_base.indexer.project_indexer import ProjectIndexer
+from src.docstring_core.docstring_generator import DocstringGenerationManager
+from src.docstring_core.docstring_writer import apply_docstrings
+from src.unit_test_core.coverage_targets import CoverageSelector
+from src.unit_test_core.unit_test_generator import UnitTestGenerationManager
+
+DOCSTRINGS = "docstrings"
+UNIT_TESTS = "unit tests"
+
+
+def with_docstrings(items: List[CodeItem], docstrings: List[dict]) -> List[CodeItem]:
+    """
+    Return copies of the items whose source carries their freshly generated docstring, so the
+    test prompts see the documented behaviour. Items without a new docstring are returned as is.
+
+    Args:
+      items (List[CodeItem]): The extracted items (left untouched).
+      docstrings (List[dict]): The generated docstrings of the same file.
+
+    Returns:
+      List[CodeItem]: The items to generate tests for.
+    """
+    by_qualname = {d["qualname"]: d["docstring"] for d in docstrings if d.get("docstring")}
+    documented = []
+    for item in items:
+        docstring = by_qualname.get(item.qualname)
+        if docstring is None:
+            documented.append(item)
+            continue
+        try:
+            source = apply_docstrings(textwrap.dedent(item.source), [{"name": item.name, "docstring": docstring}])
+        except SyntaxError:
+            documented.append(item)
+            continue
+        item = copy.copy(item)
+        item.source, item.docstring = source, docstring
+        documented.append(item)
+    return documented
+
+
+class CombinedGenerationManager(BaseGenerationManager):
+    """
+    Generates docstrings and unit tests in one pass over a path.
+
+    The project is indexed once and the index, and the rendered context snippets, are shared by
+    the docstring and unit test managers and their agents. Each file's items are taken from that
+    index instead of being extracted again, then sent to both agents concurrently (or docstrings
+    first with `feed_docstrings`, so the test prompts include the new docstrings).
+
+    Every output carries a 'kind' key ('docstrings' or 'unit tests') telling which writer it is for.
+
+    Attributes:
+      docstrings (DocstringGenerationManager): Selects and generates the docstrings.
+      unit_tests (UnitTestGenerationManager): Selects and generates the unit tests.
+      feed_docstrings (bool): Generate the docstrings first and show them in the test prompts.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        project_path: Path = None,
+        cascade: Optional[List[str]] = None,
+        force: bool = False,
+        coverage: Optional[CoverageSelector] = None,
+        feed_docstrings: bool = False,
+        concurrency: int = GENERATION_CONCURRENCY,
+    ):
+        """
+        Indexes the project once and builds both managers on that index.
+
+        The base initializer is not called: this manager has no agent of its own.
+
+        Args:
+          model_name (str): The model used by both agents.
+          project_path (Path): The root path of the project to index and mirror.
+          cascade (Optional[List[str]]): A model ladder (cheapest first) used instead of `model_name`.
+          force (bool): Regenerate adequate docstrings and tests for items that already have tests.
+          coverage (Optional[CoverageSelector]): Coverage data; only items below its threshold get tests.
+          feed_docstrings (bool): Generate docstrings before tests and include them in the test prompts.
+          concurrency (int): Maximum number of files generated at the same time, default is GENERATION_CONCURRENCY.
+
+        Raises:
+          ValueError: If project_path is None.
+        """
+        if project_path is None:
+            raise ValueError("❌ 'project_path' is required for CombinedGenerationManager.")
+        self.project_path = project_path
+        self.concurrency = max(1, concurrency)
+        self.feed_docstrings = feed_docstrings
+
+        self.indexer = ProjectIndexer(project_path)
+        self.indexer.load_or_build()
+        self.snippet_cache: Dict = {}
+        shared = {"indexer": self.indexer, "snippet_cache": self.snippet_cache}
+
+        self.docstrings = DocstringGenerationManager(
+            model_name=model_name, project_path=project_path, force=force, cascade=cascade, **shared
+        )
+        self.unit_tests = UnitTestGenerationManager(
+            model_name=model_name, project_path=project_path, cascade=cascade, force=force, coverage=coverage, **shared
+        )
+
+        # Items of every indexed file, so each file is extracted once (by the indexer)
+        self._items_by_file: Dict[str, List[CodeItem]] = {}
+        for item in self.indexer.all_items():
+            self._items_by_file.setdefault(str(Path(item.file_path).resolve()), []).append(item)
+
+    def _order_files(self, files: List[str]) -> List[str]:
+        """
+        Uses the unit test order (least covered files first with coverage data).
+        """
+        return self.unit_tests._order_files(files)
+
+    def _source_hash(self, path_obj: Path) -> Optional[str]:
+        """
+        Returns the hash of an indexed file as indexed, since its items come from the index.
+        """
+        if str(path_obj) in self._items_by_file:
+            return self.indexer.file_hashes.get(str(path_obj))
+        return super()._source_hash(path_obj)
+
+    def _file_items(self, path_obj: Path, target_names: Optional[List[str]]) -> List[CodeItem]:
+        """
+        Returns the items of a file from the index, extracting it only if it is not indexed.
+        """
+        items = self._items_by_file.get(str(path_obj))
+        if items is None:
+            return get_filtered_code_items(path_obj, target_names)
+        if target_names:
+            items = [i for i in items if i.name in target_names or i.qualname in target_names]
+        return items
+
+    async def generate_for_file(self, file_path: str, target_names: Optional[List[str]] = None) -> List[dict]:
+        """
+        Generates the docstrings and unit tests of one file.
+
+        Args:
+          file_path (str): The path to the Python file to process.
+          target_names (Optional[List[str]]): List of function/class names to filter outputs.
+
+        Returns:
+          List[dict]: The docstring outputs followed by the unit test outputs, each with its 'kind'.
+        """
+        path_obj = Path(file_path).resolve()
+        if not path_obj.exists():
+            print(f"[WARN] File not found: {path_obj}")
+            return []
+
+        items = self._file_items(path_obj, target_names)
+        if not items:
+            print(f"[INFO] No code items found in {file_path}")
+            return []
+
+        if self.feed_docstrings:
+            # Select on the original items: the documented copies keep the old line numbers, so
+            # coverage would measure the wrong lines
+            selected = self.unit_tests._select_items(items)
+            docstrings = await self.docstrings.generate_for_items(items)
+            tests = await self.unit_tests._generate_coalesced(with_docstrings(selected, docstrings)) if selected else []
+        else:
+            docstrings, tests = await asyncio.gather(
+                self.docstrings.generate_for_items(items),
+                self.unit_tests.generate_for_items(items),
+            )
+        return [{**d, "kind": DOCSTRINGS} for d in docstrings] + [{**t, "kind": UNIT_TESTS} for t in tests]
+
+    def _report(self, total: int):
+        """
+        Prints the end-of-run summary of both managers.
+        """
+        print(f"[INFO] Total items processed: {total} (docstrings and unit tests)")
+        for manager in (self.docstrings, self.unit_tests):
+            coalescer = manager.coalescer
+            print(
+                f"[INFO] {manager.agent_class.__name__}: "
+                f"coalesced: {coalescer.coalesced}, from response cache: {coalescer.cache_hits}"
+            )
+            if isinstance(manager.agent, ModelCascade):
+                print(manager.agent.summary())
+
+
+def split_by_kind(items: List[dict], default: str = DOCSTRINGS) -> Dict[str, List[dict]]:
+    """
+    Groups combined outputs by the writer they are for.
+
+    Args:
+      items (List[dict]): Outputs with a 'kind' key.
+      default (str, optional): The kind of outputs without one.
+
+    Returns:
+      Dict[str, List[dict]]: The outputs per kind, without the 'kind' key.
+    """
+    groups: Dict[str, List[dict]] = {}
+    for item in items:
+        item = dict(item)
+        groups.setdefault(item.pop("kind", default), []).append(item)
+    return groups
+
+
+async def stream_all_from_path(
+    path: str,
+    model_name: str = "gpt-4o-mini",
+    target_names: Optional[List[str]] = None,
+    project_path: Optional[str] = None,
+    cascade: Optional[List[str]] = None,
+    skip_files: Optional[Set[str]] = None,
+    shard: Optional[Tuple[int, int]] = None,
+    force: bool = False,
+    coverage_file: Optional[str] = None,
+    coverage_threshold: float = COVERAGE_THRESHOLD,
+    feed_docstrings: bool = False,
+) -> AsyncIterator[Tuple[str, List[dict], Optional[str]]]:
+    """
+    Generates docstrings and unit tests file by file, yielding each file's results as soon as they are ready.
+
+    Args:
+      path (str): The path to the file or folder to process.
+      model_name (str, optional): The name of the model to use for generation. Defaults to 'gpt-4o-mini'.
+      target_names (Optional[List[str]], optional): A list of specific target names to process. Defaults to None.
+      project_path (Optional[str], optional): The root path of the project to index and mirror. Defaults to None.
+      cascade (Optional[List[str]], optional): A model ladder (cheapest first) used instead of `model_name`.
+      skip_files (Optional[Set[str]], optional): Resolved paths of files not to process.
+      shard (Optional[Tuple[int, int]], optional): Only process shard i of n (1-based) of the discovered files.
+      force (bool, optional): Regenerate adequate docstrings and tests for items that already have tests. Defaults to False.
+      coverage_file (Optional[str], optional): A coverage.py data file; only items covered below the threshold get tests.
+      coverage_threshold (float, optional): Coverage ratio (0-1) from which items are skipped. Defaults to COVERAGE_THRESHOLD.
+      feed_docstrings (bool, optional): Generate docstrings first and include them in the test prompts. Defaults to False.
+
+    Raises:
+      ValueError: If project_path is not provided or the coverage file cannot be read.
+      FileNotFoundError: If the path does not exist.
+
+    Yields:
+      Tuple[str, List[dict], Optional[str]]: A source file path, its docstrings and unit tests (see
+        CombinedGenerationManager) and the hash of its source.
+    """
+    if not project_path:
+        raise ValueError("[ERROR] 'project_path' is required to generate mirrored test files.")
+
+    path_obj = Path(path)
+    if not path_obj.exists():
+        raise FileNotFoundError(f"[ERROR] Path not found: {path}")
+
+    project_path_obj = Path(project_path)
+    coverage = CoverageSelector(Path(coverage_file), project_path_obj, coverage_threshold) if coverage_file else None
+    manager = CombinedGenerationManager(
+        model_name=model_name,
+        project_path=project_path_obj,
+        cascade=cascade,
+        force=force,
+        coverage=coverage,
+        feed_docstrings=feed_docstrings,
+    )
+    async for file_path, results, source_hash in manager.iter_path(
+        path, target_names=target_names, skip_files=skip_files, shard=shard
+    ):
+        yield file_path, results, source_hash
@@ -1,11 +1,15 @@
 
-from typing import Type
+from dataclasses import dataclass, field
+from typing import Any, List, Type
+from agents import AgentOutputSchema, AgentOutputSchemaBase
+from pydantic import ValidationError
+from src.core_base.code.response_parser import parse_response
 
 def _parse_to_models(OutPutModel: Type, parsed):
     """
     Convert JSON-like data into a list of Pydantic model instances.
     
-    This function takes a Pydantic model type and parsed data, and converts the parsed data into instances of the specified model. It attempts to infer the model's item type from its field annotations. If the inference fails or if the parsed data does not match expected formats, it returns an empty list.
+    This function takes a Pydantic model type and parsed data, and converts the parsed data into instances of the specified model. It attempts to infer the model's item type from its field annotations. If the inference fails or if the parsed data does not match expected formats, it returns an empty list. Items that fail validation are skipped so the valid ones are kept.
     
     Args:
         OutPutModel (Type): The Pydantic model type to instantiate from the parsed data.
@@ -20,8 +24,87 @@ def _parse_to_models(OutPutModel: Type, parsed):
         print("[WARNING] Could not infer item type from OutputModel, returning empty list")
         return []
 
-    if isinstance(parsed, list):
-        return [item_type(**d) for d in parsed if isinstance(d, dict)]
     if isinstance(parsed, dict) and "items" in parsed:
-        return [item_type(**d) for d in parsed["items"] if isinstance(d, dict)]
-    return []
\ No newline at end of file
+        parsed = parsed["items"]
+    if not isinstance(parsed, list):
+        return []
+
+    models = []
+    for d in parsed:
+        if not isinstance(d, dict):
+            continue
+        try:
+            models.append(item_type(**d))
+        except ValidationError as e:
+            print(f"[WARNING] Skipping invalid output item: {e.errors()[0]['msg']}")
+    return models
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text using the ~4 characters per token heuristic.
+    
+    Args:
+        text (str): The text to measure.
+    
+    Returns:
+        int: The approximate token count (at least 1 for non-empty text).
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class ParsedOutput:
+    """
+    Items decoded from a structured model response.
+    
+    Attributes:
+      items (List[Any]): The validated output models.
+      complete (bool): False when the response was truncated and only a prefix was recovered.
+    """
+    items: List[Any] = field(default_factory=list)
+    complete: bool = True
+
+
+class TolerantOutputSchema(AgentOutputSchemaBase):
+    """
+    Output schema that sends the strict JSON schema of a list model to the LLM but parses the
+    response locally with `parse_response`, keeping every valid item of a malformed or
+    truncated payload instead of failing the whole run.
+    """
+
+    def __init__(self, output_model: Type):
+        """
+        Initializes the schema for a Pydantic list model with an `items` field.
+        
+        Args:
+          output_model (Type): The list model, e.g. DocstringOutputList.
+        """
+        self.output_model = output_model
+        self._schema = AgentOutputSchema(output_model)
+
+    def is_plain_text(self) -> bool:
+        return False
+
+    def name(self) -> str:
+        return self._schema.name()
+
+    def json_schema(self) -> dict[str, Any]:
+        return self._schema.json_schema()
+
+    def is_strict_json_schema(self) -> bool:
+        return self._schema.is_strict_json_schema()
+
+    def validate_json(self, json_str: str) -> ParsedOutput:
+        """
+        Parses the response, recovering the valid items of truncated or malformed payloads.
+        
+        Args:
+          json_str (str): The raw model response.
+        
+        Returns:
+          ParsedOutput: The validated items and whether the payload was complete.
+        """
+        parsed = parse_response(json_str)
+        return ParsedOutput(_parse_to_models(self.output_model, parsed.items), parsed.complete)
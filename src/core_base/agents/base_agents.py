@@ -1,12 +1,18 @@
+import re
 from agents import Agent, Runner, OpenAIChatCompletionsModel
-from constants import clients
-from typing import Type, List
+from constants import clients, CONTEXT_TOKEN_BUDGET, CONTEXT_MODE
+from typing import Type, List, Dict, Tuple, Set
 from pathlib import Path
 from src.core_base.code.code_model import CodeItem
-from src.core_base.code.json_utils import safe_json_loads
+from src.core_base.code.response_parser import parse_response
 from src.core_base.indexer.project_indexer import ProjectIndexer
-from src.core_base.code.extractor_utils import extract_symbols_from_import
-from src.core_base.agents.agents_utils import _parse_to_models
+from src.core_base.code.extractor_utils import import_aliases
+from src.core_base.agents.agents_utils import (
+    _parse_to_models,
+    estimate_tokens,
+    ParsedOutput,
+    TolerantOutputSchema,
+)
 ###############################
 # Base Agent
 ###############################
@@ -71,13 +77,25 @@ class BaseCodeGenerationAgent(BaseCodeAgent):
     SYSTEM_PROMPT: str
     PROMPT_TEMPLATE: str
 
-    def __init__(self, model_name: str, project_path: Path | None = None):
+    def __init__(
+        self,
+        model_name: str,
+        project_path: Path | None = None,
+        context_token_budget: int = CONTEXT_TOKEN_BUDGET,
+        context_mode: str = CONTEXT_MODE,
+        indexer: ProjectIndexer | None = None,
+        snippet_cache: Dict[Tuple[str, str, str, str], str] | None = None,
+    ):
         """
         Initializes a BaseCodeGenerationAgent instance.
         
         Args:
           model_name (str): The name of the model to be used.
           project_path (Path | None, optional): The path to the project, defaults to None.
+          context_token_budget (int, optional): Max tokens of context snippets per prompt, defaults to CONTEXT_TOKEN_BUDGET.
+          context_mode (str, optional): 'stub' for signature stubs or 'edges' for head/tail source lines, defaults to CONTEXT_MODE.
+          indexer (ProjectIndexer | None, optional): An already loaded project index to share, defaults to building one from `project_path`.
+          snippet_cache (Dict | None, optional): Rendered context snippets to share with other agents of the run, defaults to a new cache.
         """
         super().__init__(
             name=self.__class__.__name__,
@@ -85,12 +103,20 @@ class BaseCodeGenerationAgent(BaseCodeAgent):
             model_name=model_name,
         )
 
-        self.agent.output_type = self.OutputModel
+        # Structured output parsed locally so partial responses are kept
+        self.agent.output_type = TolerantOutputSchema(self.OutputModel)
+        self.text_agent = self.agent.clone(output_type=str)
         self.project_path = project_path
+        self.context_token_budget = context_token_budget
+        self.context_mode = context_mode
 
-        # Initialize indexer *only if* project_path is provided
-        self.indexer = None
-        if project_path:
+        # Rendered context snippets, reused across the whole run (and shared by agents using the same index)
+        # key: (file_path, type, qualname, file_hash)
+        self._snippet_cache: Dict[Tuple[str, str, str, str], str] = {} if snippet_cache is None else snippet_cache
+
+        # Reuse the caller's indexer, or build one *only if* project_path is provided
+        self.indexer = indexer
+        if self.indexer is None and project_path:
             self.indexer = ProjectIndexer(project_path)
             self.indexer.load_or_build()
 
@@ -118,6 +144,138 @@ class BaseCodeGenerationAgent(BaseCodeAgent):
             + lines[-tail:]
         )
 
+    def _summarize_context(self, match: CodeItem) -> str:
+        """
+        Summarizes an indexed item according to the agent's context mode.
+        
+        Args:
+          match (CodeItem): The indexed item to summarize.
+        
+        Returns:
+          str: The item's stub in 'stub' mode, or its head/tail source lines in 'edges' mode.
+        """
+        if self.context_mode == "edges":
+            return self._summarize_code_edges(match.source)
+        return self.indexer.get_stub(match)
+
+    ##########################################################
+    # Helper: Context snippets (memoized, deduplicated, budgeted)
+    ##########################################################
+    def _context_snippet(self, match: CodeItem) -> str:
+        """
+        Returns the rendered context snippet for an indexed item, memoized per (item, file hash).
+        
+        Args:
+          match (CodeItem): The indexed item to render.
+        
+        Returns:
+          str: The snippet text, including its header comments.
+        """
+        file_hash = self.indexer.file_hashes.get(str(match.file_path), "")
+        key = (str(match.file_path), match.type, match.qualname, file_hash)
+        snippet = self._snippet_cache.get(key)
+        if snippet is None:
+            snippet = (
+                f"# Context snippet from {match.file_path}, DO NOT generate anything for this item\n"
+                f"# {match.type} {match.qualname}\n"
+                f"{self._summarize_context(match)}"
+            )
+            self._snippet_cache[key] = snippet
+        return snippet
+
+    def _build_context_block(
+        self,
+        items: List[CodeItem],
+        symbols: Set[str],
+        local_symbols: Set[Tuple[str, str]],
+    ) -> str:
+        """
+        Builds the project context block for a prompt within the context token budget.
+        
+        Candidates resolved from the used symbols are deduplicated, ranked by relevance (how often
+        the symbol is referenced by the targets, then proximity to the target files, then size)
+        and added greedily until the budget is exhausted.
+        
+        Args:
+          items (List[CodeItem]): The target items of the prompt.
+          symbols (Set[str]): Imported symbols used by the targets.
+          local_symbols (Set[Tuple[str, str]]): (file path, name) of module-level symbols used from the targets' own files.
+        
+        Returns:
+          str: The context block text.
+        """
+        target_keys = {(str(item.file_path), item.qualname) for item in items}
+        target_dirs = {item.file_path.parent for item in items}
+        target_source = "\n".join(item.source for item in items)
+
+        # Imports and module-level references resolve to top-level items only (not same-named methods)
+        matches = [m for sym in symbols for m in self.indexer.query_by_name(sym) if m.qualname == m.name]
+        for file_path, name in local_symbols:
+            matches.extend(
+                m for m in self.indexer.query_by_name(name)
+                if str(m.file_path) == file_path and m.qualname == m.name
+            )
+
+        candidates: Dict[Tuple[str, str, str], CodeItem] = {}
+        for match in matches:
+            if not match or (str(match.file_path), match.qualname) in target_keys:
+                continue
+            candidates.setdefault((str(match.file_path), match.type, match.qualname), match)
+
+        ranked = []
+        for match in candidates.values():
+            snippet = self._context_snippet(match)
+            references = len(re.findall(rf"\b{re.escape(match.name)}\b", target_source))
+            proximity = 0 if match.file_path.parent in target_dirs else 1
+            tokens = estimate_tokens(snippet)
+            ranked.append((-references, proximity, tokens, snippet))
+        ranked.sort(key=lambda r: r[:3])
+
+        selected, used, omitted = [], 0, 0
+        for *_, tokens, snippet in ranked:
+            if used + tokens > self.context_token_budget:
+                omitted += 1
+                continue
+            selected.append(snippet)
+            used += tokens
+
+        if omitted:
+            selected.append(f"# ... {omitted} context snippet(s) omitted (token budget {self.context_token_budget})")
+        return "\n\n".join(selected) if selected else "# No internal import snippets found"
+
+    ##########################################################
+    # Helper: Target labels
+    ##########################################################
+    @staticmethod
+    def item_ids(items: List[CodeItem]) -> Dict[str, CodeItem]:
+        """
+        Assigns the short IDs used to label target items in a prompt ('i1', 'i2', ...).
+        
+        Args:
+          items (List[CodeItem]): The target items, in prompt order.
+        
+        Returns:
+          Dict[str, CodeItem]: The items keyed by their ID.
+        """
+        return {f"i{n}": item for n, item in enumerate(items, start=1)}
+
+    def _display_path(self, file_path: Path) -> str:
+        """
+        Returns the file path relative to the project root when possible, or the path unchanged.
+        
+        Args:
+          file_path (Path): The path of a target file.
+        
+        Returns:
+          str: The path to show in the prompt.
+        """
+        if self.project_path:
+            try:
+                return str(Path(file_path).resolve().relative_to(Path(self.project_path).resolve()))
+            except ValueError:
+                pass
+        return str(file_path)
+
     ##########################################################
     # Prompt Construction
     ##########################################################
@@ -131,42 +289,37 @@ class BaseCodeGenerationAgent(BaseCodeAgent):
         Returns:
           str: The constructed prompt.
         """
-        # === Gather imports
+        # === Gather imports (only those the targets actually reference)
         all_imports = set()
+        symbols: Set[str] = set()
+        local_symbols: Set[Tuple[str, str]] = set()
         for item in items:
-            if getattr(item, "imports", None):
-                all_imports.update(item.imports)
+            references = getattr(item, "references", None)
+            bound_names = set()
+            for imp in item.imports:
+                aliases = import_aliases(imp)
+                bound_names.update(bound for _, bound in aliases)
+                used = [sym for sym, bound in aliases if references is None or bound in references]
+                if used:
+                    all_imports.add(imp)
+                    symbols.update(used)
+            local_symbols.update((str(item.file_path), name) for name in (references or []) if name not in bound_names)
 
         imports_code = "\n".join(sorted(all_imports)) if all_imports else "# No imports detected"
 
         # === Internal context (only if indexer is available)
         own_code_block = "# Context disabled (no project indexer)"
         if self.indexer:
-            own_imports_code = []
-            for imp in all_imports:
-                symbols = extract_symbols_from_import(imp)
-                for sym in symbols:
-                    matches = self.indexer.query_by_name(sym)
-                    for match in matches:
-                        if not match:
-                            continue
-                        snippet = (
-                            f"# Context snippet from {match.file_path}, DO NOT generate anything for this item\n"
-                            f"# {match.type} {match.name}\n"
-                            f"{self._summarize_code_edges(match.source)}"
-                        )
-                        own_imports_code.append(snippet)
-            own_code_block = (
-                "\n\n".join(own_imports_code)
-                if own_imports_code
-                else "# No internal import snippets found"
-            )
+            own_code_block = self._build_context_block(items, symbols, local_symbols)
 
-        # === Target items
-        formatted_items = [
-            f"# File: {item.file_path}\n# {item.type} {item.name}\n{item.source.strip()}"
-            for item in items
-        ]
+        # === Target items (short IDs; each file path is written once)
+        formatted_items = []
+        current_file = None
+        for item_id, item in self.item_ids(items).items():
+            if item.file_path != current_file:
+                current_file = item.file_path
+                formatted_items.append(f"# File: {self._display_path(item.file_path)}")
+            formatted_items.append(f"# [{item_id}] {item.type} {item.qualname}\n{item.source.strip()}")
         items_code = "\n\n".join(formatted_items)
 
         # === Combine prompt
@@ -187,46 +340,92 @@ class BaseCodeGenerationAgent(BaseCodeAgent):
     ##########################################################
     # Run generation
     ##########################################################
-    ##########################################################
-    # Run generation
-    async def generate(self, items: List[CodeItem]):
+    def _to_outputs(self, result) -> Tuple[list, bool]:
         """
-        Generates structured output based on the provided code items.
+        Converts a raw agent result into output models.
         
         Args:
-          items (List[CodeItem]): The code items to process.
+          result: The agent's final output (ParsedOutput, Pydantic list model, JSON string or dict).
         
         Returns:
-          List[BaseModel]: A list of Pydantic objects (e.g., DocstringOutput or UnitTestOutput).
+          Tuple[list, bool]: The output models and whether the response was complete.
         """
-        prompt = self._make_prompt(items)
+        if isinstance(result, ParsedOutput):
+            return result.items, result.complete
 
+        # Pydantic model with .items
+        if hasattr(result, "items") and not isinstance(result, dict):
+            return result.items, True
 
-        try:
-            result = await self.run(prompt)
+        # JSON string (plain text fallback)
+        if isinstance(result, str):
+            parsed = parse_response(result)
+            return _parse_to_models(self.OutputModel, parsed.items), parsed.complete
 
-            # Caso 1: modelo Pydantic con .items
-            if hasattr(result, "items"):
-                return result.items
+        if isinstance(result, dict):
+            return _parse_to_models(self.OutputModel, result), True
 
-            # Caso 2: string JSON
-            if isinstance(result, str):
-                parsed = safe_json_loads(result)
-                return _parse_to_models(self.OutputModel, parsed)
+        print("⚠️ Unexpected result type:", type(result))
+        return [], True
 
-            # Caso 3: dict
-            if isinstance(result, dict):
-                return _parse_to_models(self.OutputModel, result)
+    def validate_output(self, item: CodeItem, output) -> List[str]:
+        """
+        Checks one generated output locally, without calling the model.
+        
+        Subclasses override this with task-specific checks; the model cascade escalates
+        items whose output has problems to the next model.
+        
+        Args:
+          item (CodeItem): The code item the output was generated for.
+          output: The generated Pydantic output (e.g., DocstringOutput or UnitTestOutput).
+        
+        Returns:
+          List[str]: The problems found; an empty list means the output is accepted.
+        """
+        return []
 
-            print("⚠️ Unexpected result type:", type(result))
-            return []
+    async def generate(self, items: List[CodeItem], retry_missing: bool = True):
+        """
+        Generates structured output based on the provided code items.
+        
+        When the response is truncated, the items parsed from it are kept and only the
+        missing items are requested again (once).
+        
+        Args:
+          items (List[CodeItem]): The code items to process.
+          retry_missing (bool, optional): Whether to re-request items lost to a truncated response, defaults to True.
+        
+        Returns:
+          List[BaseModel]: A list of Pydantic objects (e.g., DocstringOutput or UnitTestOutput).
+        """
+        prompt = self._make_prompt(items)
 
+        try:
+            result = await self.run(prompt)
         except Exception as e:
             print(f"⚠️ Error generating {self.__class__.__name__} output — using manual fallback")
             print("Details:", e)
 
-            # Fallback a texto y reparseo
-            self.agent.output_type = str
-            result_text = await self.run(prompt)
-            parsed = safe_json_loads(result_text)
-            return _parse_to_models(self.OutputModel, parsed)
\ No newline at end of file
+            # Fallback to plain text output and local parsing
+            result = (await Runner.run(self.text_agent, prompt)).final_output
+
+        outputs, complete = self._to_outputs(result)
+        if complete or not retry_missing:
+            return outputs
+
+        # Keep what was parsed and only ask again for the missing items
+        item_ids = self.item_ids(items)
+        done = {out.id for out in outputs}
+        missing_ids = [item_id for item_id in item_ids if item_id not in done]
+        if not missing_ids:
+            return outputs
+        print(f"[WARN] Truncated response: kept {len(outputs)} item(s), retrying {len(missing_ids)}")
+
+        # The retry prompt labels the missing items from 'i1' again: map them back
+        missing = [item_ids[item_id] for item_id in missing_ids]
+        remap = dict(zip(self.item_ids(missing), missing_ids))
+        for out in await self.generate(missing, retry_missing=False):
+            if out.id in remap:
+                out.id = remap[out.id]
+                outputs.append(out)
+        return outputs
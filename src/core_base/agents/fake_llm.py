@@ -0,0 +1,392 @@
+import ast
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import textwrap
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import httpx
+from agents import set_tracing_disabled
+from openai import RateLimitError
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.completion_usage import CompletionUsage
+
+from src.core_base.agents.agents_utils import estimate_tokens
+
+FAKE_MODEL_NAME = "fake/deterministic"
+FAKE_BASE_URL = "http://fake-llm.local/v1"
+
+# Headers written by BaseCodeGenerationAgent._make_prompt for target files and items
+_TARGET_HEADER = re.compile(r"^# (?:File: (?P<file_path>.+)|\[(?P<id>\w+)\] (?P<type>\w+) (?P<name>\S+))$", re.M)
+_TARGETS_MARKER = "# === TARGET ITEMS ==="
+_FIXER_MARKER = "Pytest code to fix:"
+_PATCH_MARKER = "Pytest code to patch:"
+
+
+###############################
+# Latency & accounting
+###############################
+@dataclass
+class LatencyModel:
+    """
+    Latency distribution used by the fake backend to simulate response times.
+
+    Attributes:
+      distribution (str): One of 'none', 'fixed', 'uniform', 'normal' or 'lognormal'.
+      mean (float): Fixed value or mean of the distribution, in seconds.
+      spread (float): Half-width for 'uniform', standard deviation for 'normal', sigma for 'lognormal'.
+      per_output_token (float): Extra seconds added per generated token (decode time).
+    """
+    distribution: str = "none"
+    mean: float = 0.0
+    spread: float = 0.0
+    per_output_token: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """
+        Builds a LatencyModel from a compact 'distribution:mean:spread:per_token' string.
+
+        Args:
+          spec (str): The specification, e.g. 'lognormal:0.8:0.4:0.002' or 'fixed:0.5'.
+
+        Returns:
+          LatencyModel: The parsed latency model.
+        """
+        parts = spec.split(":")
+        values = [float(p) for p in parts[1:]]
+        return cls(parts[0], *values)
+
+    def sample(self, rng: random.Random, output_tokens: int = 0) -> float:
+        """
+        Draws a latency value in seconds.
+
+        Args:
+          rng (random.Random): The random generator to draw from.
+          output_tokens (int, optional): Number of generated tokens, defaults to 0.
+
+        Returns:
+          float: The simulated latency (never negative).
+        """
+        if self.distribution == "fixed":
+            base = self.mean
+        elif self.distribution == "uniform":
+            base = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.distribution == "normal":
+            base = rng.gauss(self.mean, self.spread)
+        elif self.distribution == "lognormal":
+            base = rng.lognormvariate(math.log(self.mean), self.spread) if self.mean > 0 else 0.0
+        else:
+            base = 0.0
+        return max(0.0, base) + self.per_output_token * output_tokens
+
+
+@dataclass
+class FakeUsageStats:
+    """
+    Token and call accounting collected by a FakeLLMClient.
+    """
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    rate_limited: int = 0
+    malformed: int = 0
+    simulated_latency: float = 0.0
+
+    def summary(self) -> str:
+        """
+        Returns a one-line human-readable summary of the collected statistics.
+        """
+        return (
+            f"[FakeLLM] requests={self.requests} prompt_tokens={self.prompt_tokens} "
+            f"completion_tokens={self.completion_tokens} 429s={self.rate_limited} "
+            f"malformed={self.malformed} simulated_latency={self.simulated_latency:.2f}s"
+        )
+
+
+###############################
+# Fake client
+###############################
+class FakeLLMClient:
+    """
+    Offline, deterministic stand-in for an AsyncOpenAI client.
+
+    It answers `chat.completions.create` calls with schema-valid JSON built from the
+    target items found in the prompt, so the whole pipeline can run without API keys.
+    Every random decision (latency, injected errors) is derived from the seed, the
+    prompt and the attempt number, which makes runs reproducible regardless of the
+    order in which concurrent requests arrive.
+
+    Attributes:
+      stats (FakeUsageStats): Accumulated call, token, error and latency statistics.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency: Optional[LatencyModel] = None,
+        rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+    ):
+        """
+        Initializes the fake client.
+
+        Args:
+          seed (int, optional): Seed for all random decisions, defaults to 0.
+          latency (Optional[LatencyModel], optional): Latency distribution, defaults to no latency.
+          rate_limit_rate (float, optional): Probability of answering with a 429 error, defaults to 0.
+          malformed_rate (float, optional): Probability of returning truncated JSON, defaults to 0.
+        """
+        self.seed = seed
+        self.latency = latency or LatencyModel()
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.stats = FakeUsageStats()
+        self.base_url = httpx.URL(FAKE_BASE_URL)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self._attempts: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMClient":
+        """
+        Builds a client from the FAKE_LLM_SEED, FAKE_LLM_LATENCY, FAKE_LLM_429_RATE
+        and FAKE_LLM_MALFORMED_RATE environment variables.
+
+        Returns:
+          FakeLLMClient: The configured client.
+        """
+        latency = os.getenv("FAKE_LLM_LATENCY")
+        return cls(
+            seed=int(os.getenv("FAKE_LLM_SEED", "0")),
+            latency=LatencyModel.parse(latency) if latency else None,
+            rate_limit_rate=float(os.getenv("FAKE_LLM_429_RATE", "0")),
+            malformed_rate=float(os.getenv("FAKE_LLM_MALFORMED_RATE", "0")),
+        )
+
+    def _rng_for(self, model: str, prompt: str) -> random.Random:
+        """
+        Returns a random generator seeded by (seed, model, prompt, attempt number).
+        """
+        key = hashlib.sha256(f"{self.seed}|{model}|{prompt}".encode("utf-8")).hexdigest()
+        attempt = self._attempts.get(key, 0)
+        self._attempts[key] = attempt + 1
+        digest = hashlib.sha256(f"{key}|{attempt}".encode("utf-8")).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    async def create(self, *, model: str, messages: List[Dict[str, Any]], response_format: Any = None, **_):
+        """
+        Mimics `AsyncOpenAI.chat.completions.create` for non-streaming calls.
+
+        Args:
+          model (str): The requested model name.
+          messages (List[Dict[str, Any]]): Chat messages (system instructions and user prompt).
+          response_format (Any, optional): The structured output format requested by the agent.
+
+        Returns:
+          ChatCompletion: A completion whose message content is the generated JSON or code.
+
+        Raises:
+          RateLimitError: When a 429 is injected.
+        """
+        prompt = _message_text(messages[-1]) if messages else ""
+        rng = self._rng_for(model, prompt)
+        roll_429, roll_malformed = rng.random(), rng.random()
+
+        prompt_tokens = sum(estimate_tokens(_message_text(m)) for m in messages)
+        self.stats.requests += 1
+        self.stats.prompt_tokens += prompt_tokens
+
+        if roll_429 < self.rate_limit_rate:
+            self.stats.rate_limited += 1
+            await self._sleep(self.latency.sample(rng))
+            raise RateLimitError(
+                "Rate limit reached (injected by FakeLLMClient)",
+                response=httpx.Response(429, request=httpx.Request("POST", f"{FAKE_BASE_URL}/chat/completions")),
+                body=None,
+            )
+
+        content = _respond(prompt, response_format)
+        if roll_malformed < self.malformed_rate:
+            self.stats.malformed += 1
+            content = content[: max(1, len(content) // 2)]
+
+        completion_tokens = estimate_tokens(content)
+        self.stats.completion_tokens += completion_tokens
+        await self._sleep(self.latency.sample(rng, completion_tokens))
+
+        return ChatCompletion(
+            id=f"fake-{self.stats.requests}",
+            object="chat.completion",
+            created=int(time.time()),
+            model=model,
+            choices=[
+                Choice(
+                    index=0,
+                    finish_reason="stop",
+                    message=ChatCompletionMessage(role="assistant", content=content),
+                )
+            ],
+            usage=CompletionUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+    async def _sleep(self, delay: float):
+        """
+        Sleeps for the simulated latency and records it.
+        """
+        self.stats.simulated_latency += delay
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+###############################
+# Registry
+###############################
+def register_fake_model(
+    clients: Dict[str, Any],
+    models: List[str],
+    name: str = FAKE_MODEL_NAME,
+    client: Optional[FakeLLMClient] = None,
+) -> FakeLLMClient:
+    """
+    Registers a fake model in the client registry so it can be selected like any other model.
+
+    Args:
+      clients (Dict[str, Any]): The model -> client registry (usually `constants.clients`).
+      models (List[str]): The list of selectable models (usually `constants.models`).
+      name (str, optional): The model name to register, defaults to FAKE_MODEL_NAME.
+      client (Optional[FakeLLMClient], optional): A preconfigured client, defaults to one built from the environment.
+
+    Returns:
+      FakeLLMClient: The registered client, whose `stats` can be inspected after a run.
+    """
+    client = client or FakeLLMClient.from_env()
+    clients[name] = client
+    if name not in models:
+        models.append(name)
+    # Offline runs must not try to export traces to OpenAI
+    set_tracing_disabled(True)
+    return client
+
+
+###############################
+# Response builders
+###############################
+def _message_text(message: Dict[str, Any]) -> str:
+    """
+    Returns the textual content of a chat message (string or list of content parts).
+    """
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def parse_prompt_targets(prompt: str) -> List[Dict[str, str]]:
+    """
+    Extracts the target items (ID, file path, type, name and source) from a generation prompt.
+
+    Args:
+      prompt (str): The prompt built by BaseCodeGenerationAgent._make_prompt.
+
+    Returns:
+      List[Dict[str, str]]: One dictionary per target item.
+    """
+    section = prompt.split(_TARGETS_MARKER, 1)[-1]
+    matches = list(_TARGET_HEADER.finditer(section))
+    targets, file_path = [], ""
+    for i, match in enumerate(matches):
+        if match["file_path"]:
+            file_path = match["file_path"]
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(section)
+        target = {key: match[key] for key in ("id", "type", "name")}
+        target["file_path"] = file_path
+        target["source"] = section[match.end():end].strip("\n")
+        targets.append(target)
+    return targets
+
+
+def _respond(prompt: str, response_format: Any) -> str:
+    """
+    Builds the response content: schema-valid JSON for structured calls, echoed code otherwise.
+    """
+    schema = None
+    if isinstance(response_format, dict):
+        schema = (response_format.get("json_schema") or {}).get("schema")
+
+    if schema is None:
+        # Free-text calls (e.g. the test fixer) get their input code back unchanged
+        if _PATCH_MARKER in prompt:
+            return json.dumps({"imports": None, "replacements": []})
+        if _FIXER_MARKER in prompt:
+            return textwrap.dedent(prompt.split(_FIXER_MARKER, 1)[1]).strip() + "\n"
+        return prompt
+
+    item_schema = _resolve(schema, schema["properties"]["items"]["items"])
+    items = [
+        {field: _fake_field(field, spec, target) for field, spec in item_schema.get("properties", {}).items()}
+        for target in parse_prompt_targets(prompt)
+    ]
+    return json.dumps({"items": items})
+
+
+def _resolve(root: Dict[str, Any], node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolves a local JSON schema `$ref` (e.g. '#/$defs/DocstringOutput').
+    """
+    ref = node.get("$ref")
+    if not ref:
+        return node
+    for part in ref.lstrip("#/").split("/"):
+        root = root[part]
+    return root
+
+
+def _fake_field(field: str, spec: Dict[str, Any], target: Dict[str, str]) -> Any:
+    """
+    Produces a deterministic value for one output field of a target item.
+    """
+    if field in target:
+        return target[field]
+    if field == "docstring":
+        return _fake_docstring(target)
+    if field == "test_code":
+        safe_name = re.sub(r"\W", "_", target["name"]).lower()
+        return f"def test_{safe_name}_generated():\n    assert True\n"
+    return {"string": "", "array": [], "integer": 0, "number": 0, "boolean": False}.get(spec.get("type"), None)
+
+
+def _fake_docstring(target: Dict[str, str]) -> str:
+    """
+    Builds a Google-style docstring covering the arguments and return value of the target.
+    """
+    try:
+        node = ast.parse(textwrap.dedent(target["source"])).body[0]
+    except (SyntaxError, IndexError):
+        return f"{target['type'].capitalize()} {target['name']}."
+
+    lines = [f"{target['type'].capitalize()} {target['name']}."]
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        args = [a.arg for a in node.args.posonlyargs + node.args.args + node.args.kwonlyargs]
+        args = [a for a in args if a not in ("self", "cls")]
+        if node.args.vararg:
+            args.append("*" + node.args.vararg.arg)
+        if node.args.kwarg:
+            args.append("**" + node.args.kwarg.arg)
+        if args:
+            lines += ["", "Args:"] + [f"  {a}: Description of {a.lstrip('*')}." for a in args]
+        if any(isinstance(n, ast.Return) and n.value is not None for n in ast.walk(node)):
+            lines += ["", "Returns:", "  The computed result."]
+    return "\n".join(lines)
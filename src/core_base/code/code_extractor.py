@@ -1,10 +1,16 @@
 
 import ast
 from pathlib import Path
-from typing import List, Union, Optional
+from typing import List, Union, Optional, Set
 import sys
 from src.core_base.code.code_model import CodeItem
-from src.core_base.code.extractor_utils import _get_signature_from_node
+from src.core_base.code.extractor_utils import (
+    _get_signature_from_node,
+    build_stub,
+    import_aliases,
+    prune_imports,
+    referenced_names,
+)
 
 class CodeExtractorTool:
     """
@@ -21,7 +27,8 @@ class CodeExtractorTool:
         source_lines: List[str],
         file_path: Path,
         imports: List[str],
-        parent: str | None = None
+        parent: str | None = None,
+        known_names: Optional[Set[str]] = None,
     ) -> CodeItem:
         """
         Process an AST node and extract metadata (name, type, docstring, source, etc.).
@@ -30,8 +37,9 @@ class CodeExtractorTool:
             node (ast.AST): The AST node to analyze.
             source_lines (List[str]): List of lines from the file source code.
             file_path (Path): Path to the Python file containing the node.
-            imports (List[str]): List of import statements found in the file.
+            imports (List[str]): List of import statements found in the file (pruned per item).
             parent (str | None): The parent class name if this node is a method.
+            known_names (Optional[Set[str]]): Names bound by imports or module-level definitions in the file.
 
         Returns:
             CodeItem: A structured object containing the extracted information.
@@ -50,6 +58,7 @@ class CodeExtractorTool:
 
         docstring = ast.get_docstring(node) or ""
         signature = _get_signature_from_node(node)
+        used_names = referenced_names(node)
 
         return CodeItem(
             name=node.name,
@@ -57,8 +66,13 @@ class CodeExtractorTool:
             source=code_text,
             docstring=docstring,
             file_path=file_path,
-            imports=imports,
+            imports=prune_imports(imports, used_names),
             signature=signature,
+            stub=build_stub(node),
+            references=sorted(used_names & (known_names or set())),
+            qualname=f"{parent}.{node.name}" if parent else node.name,
+            lineno=node.lineno,
+            end_lineno=end,
         )
 
     def extract_from_file(self, file_path: Path) -> List[CodeItem]:
@@ -94,19 +108,31 @@ class CodeExtractorTool:
                     level_dots = "." * node.level
                     imports.append(f"from {level_dots}{module} import {names}")
 
+        # Names an item can reference: import bindings and module-level definitions
+        known_names: Set[str] = {bound for imp in imports for _, bound in import_aliases(imp)}
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                known_names.add(node.name)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                known_names.update(t.id for t in targets if isinstance(t, ast.Name))
+
         items: List[CodeItem] = []
 
         # --- Extract top-level definitions ---
         for node in tree.body:
             if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-                items.append(self._process_node(node, source_lines, file_path, imports))
+                items.append(self._process_node(node, source_lines, file_path, imports, known_names=known_names))
 
                 # --- If it's a class, extract its methods ---
                 if isinstance(node, ast.ClassDef):
                     for sub_node in node.body:
                         if isinstance(sub_node, (ast.FunctionDef, ast.AsyncFunctionDef)):
                             items.append(
-                                self._process_node(sub_node, source_lines, file_path, imports, parent=node.name)
+                                self._process_node(
+                                    sub_node, source_lines, file_path, imports,
+                                    parent=node.name, known_names=known_names,
+                                )
                             )
 
         print(f"[INFO] Found {len(items)} items in {file_path}")
@@ -164,13 +190,13 @@ def get_filtered_code_items(file_path: Path, target_names: Optional[List[str]] =
     
     Args:
       file_path (Path): Path to the Python file.
-      target_names (Optional[List[str]]): List of function/class names to keep.
+      target_names (Optional[List[str]]): List of function/class names (or qualified names like 'Class.method') to keep.
     Returns:
       List[CodeItem]: Filtered list of CodeItem objects.
     """
     items = extract_functions_and_classes(file_path)
     if target_names:
-        items = [i for i in items if i.name in target_names]
+        items = [i for i in items if i.name in target_names or i.qualname in target_names]
     return items
 
 
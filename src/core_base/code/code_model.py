@@ -8,13 +8,18 @@ class CodeItem:
     
     Attributes:
         name (str): The name of the code item.
+        qualname (str): The qualified name inside its file, e.g. 'Class.method'.
         type (str): The type of the code item; can be 'function', 'method', or 'class'.
         source (str): The source code of the item.
         docstring (str): The documentation string of the code item.
         file_path (Union[str, Path]): The file path where the code item is located.
-        imports (Optional[List[str]]): A list of imported modules or functions used by the code item.
+        imports (Optional[List[str]]): The minimal import statements the item needs (body and annotations).
         signature (Optional[str]): The function or class signature (e.g., 'def foo(x, y):').
         args (Optional[List[str]]): A list of argument names if the item is a function or method.
+        stub (Optional[str]): A `.pyi`-style stub (signature, first docstring line, public methods).
+        references (Optional[List[str]]): Imported names and module-level symbols of its file that the item uses.
+        lineno (Optional[int]): The first line of the item (its `def`/`class` line) in the file.
+        end_lineno (Optional[int]): The last line of the item in the file.
     """
 
     def __init__(
@@ -27,6 +32,11 @@ class CodeItem:
         imports: Optional[List[str]] = None,
         signature: Optional[str] = None,
         args: Optional[List[str]] = None,
+        stub: Optional[str] = None,
+        references: Optional[List[str]] = None,
+        qualname: Optional[str] = None,
+        lineno: Optional[int] = None,
+        end_lineno: Optional[int] = None,
     ):
         """
         Initializes a CodeItem instance with the specified attributes.
@@ -37,11 +47,17 @@ class CodeItem:
           source (str): The source code of the item.
           docstring (Optional[str]): The documentation string of the code item.
           file_path (Union[str, Path]): The file path where the code item is located.
-          imports (Optional[List[str]]): A list of imported modules or functions used by the code item.
+          imports (Optional[List[str]]): The minimal import statements the item needs.
           signature (Optional[str]): The function or class signature.
           args (Optional[List[str]]): A list of argument names if the item is a function or method.
+          stub (Optional[str]): A `.pyi`-style stub of the item used as compact context.
+          references (Optional[List[str]]): Imported names and module-level symbols used by the item.
+          qualname (Optional[str]): The qualified name inside its file, defaults to `name`.
+          lineno (Optional[int]): The first line of the item in the file (1-based).
+          end_lineno (Optional[int]): The last line of the item in the file.
         """
         self.name = name
+        self.qualname = qualname or name
         self.type = type  # "function", "method", or "class"
         self.source = source
         self.docstring = docstring
@@ -49,6 +65,10 @@ class CodeItem:
         self.imports = imports or []
         self.signature = signature
         self.args = args or []
+        self.stub = stub
+        self.references = references  # None when usage was not analyzed
+        self.lineno = lineno
+        self.end_lineno = end_lineno
 
     def __repr__(self):
         """
@@ -56,6 +76,7 @@ class CodeItem:
         """
         attrs = {
             "name": self.name,
+            "qualname": self.qualname,
             "type": self.type,
             "signature": self.signature,
             "args": self.args,
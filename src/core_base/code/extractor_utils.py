@@ -1,5 +1,6 @@
 import re
 import ast
+import copy
 
 def extract_symbols_from_import(import_line: str) -> list[str]:
     """
@@ -22,6 +23,88 @@ def extract_symbols_from_import(import_line: str) -> list[str]:
     names = [n.strip().split(" as ")[0] for n in names_part.split(",") if n.strip()]
     return names
 
+def import_aliases(import_line: str) -> list[tuple[str, str]]:
+    """
+    Return the (imported symbol, bound name) pairs of an import statement.
+    
+    For example 'from m import A as B, C' gives [('A', 'B'), ('C', 'C')] and 'import os.path' gives [('os.path', 'os')].
+    
+    Args:
+      import_line (str): A single import statement.
+    
+    Returns:
+      list[tuple[str, str]]: The symbol and local name for each alias, or an empty list if the line cannot be parsed.
+    """
+    try:
+        node = ast.parse(import_line.strip()).body[0]
+    except (SyntaxError, IndexError):
+        return []
+    if isinstance(node, ast.Import):
+        return [(alias.name, alias.asname or alias.name.split(".")[0]) for alias in node.names]
+    if isinstance(node, ast.ImportFrom):
+        return [(alias.name, alias.asname or alias.name) for alias in node.names]
+    return []
+
+
+def referenced_names(node: ast.AST) -> set[str]:
+    """
+    Return the names read anywhere inside an AST node (body, decorators, defaults and annotations).
+    
+    String annotations such as `x: "Path"` are parsed too, so forward references count as usages.
+    
+    Args:
+      node (ast.AST): The node to analyze.
+    
+    Returns:
+      set[str]: The identifiers loaded inside the node.
+    """
+    names = set()
+    for n in ast.walk(node):
+        if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load):
+            names.add(n.id)
+        for annotation in (getattr(n, "annotation", None), getattr(n, "returns", None)):
+            if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+                try:
+                    names |= referenced_names(ast.parse(annotation.value, mode="eval"))
+                except SyntaxError:
+                    pass
+    return names
+
+
+def prune_imports(import_lines: list[str], used_names: set[str]) -> list[str]:
+    """
+    Reduce import statements to the aliases whose bound names are actually used, dropping repeated aliases.
+    
+    For example, with used names {'a'}, 'from m import a, b as c' becomes 'from m import a' and 'import os' is dropped.
+    
+    Args:
+      import_lines (list[str]): The import statements available in the file.
+      used_names (set[str]): The names read by the code that needs the imports.
+    
+    Returns:
+      list[str]: The minimal import statements, in their original order.
+    """
+    pruned, seen = [], set()
+    for line in import_lines:
+        try:
+            node = ast.parse(line.strip()).body[0]
+        except (SyntaxError, IndexError):
+            continue
+        if not isinstance(node, (ast.Import, ast.ImportFrom)):
+            continue
+        module = (getattr(node, "module", None), getattr(node, "level", 0))
+        aliases = [
+            alias for alias in node.names
+            if (alias.asname or (alias.name.split(".")[0] if isinstance(node, ast.Import) else alias.name)) in used_names
+            and (module, alias.name, alias.asname) not in seen
+        ]
+        seen.update((module, alias.name, alias.asname) for alias in aliases)
+        if aliases:
+            node.names = aliases
+            pruned.append(ast.unparse(node))
+    return pruned
+
+
 def _get_signature_from_node(node: ast.AST) -> str:
     """
     Build a human-readable function or class signature from the AST node.
@@ -55,4 +138,58 @@ def _get_signature_from_node(node: ast.AST) -> str:
         bases = [ast.unparse(base) for base in node.bases] if node.bases else []
         return f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
 
-    return node.name
\ No newline at end of file
+    return node.name
+
+
+def _is_public(name: str) -> bool:
+    """
+    Return True for public names and dunder methods (e.g. '__init__'), False for private ones.
+    """
+    return not name.startswith("_") or (name.startswith("__") and name.endswith("__"))
+
+
+def _stub_body(node: ast.AST) -> list:
+    """
+    Build the body of a stub: the first line of the docstring (if any) followed by '...'.
+    """
+    body = []
+    docstring = ast.get_docstring(node)
+    if docstring:
+        body.append(ast.Expr(ast.Constant(docstring.strip().splitlines()[0])))
+    body.append(ast.Expr(ast.Constant(...)))
+    return body
+
+
+def _stub_node(node: ast.AST) -> ast.AST:
+    """
+    Return a shallow copy of a function or class node whose body is reduced to its stub.
+    """
+    stub = copy.copy(node)
+    if isinstance(node, ast.ClassDef):
+        stub.body = _stub_body(node)[:-1] + [
+            member if isinstance(member, ast.AnnAssign) else _stub_node(member)
+            for member in node.body
+            if isinstance(member, ast.AnnAssign)
+            or (isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)) and _is_public(member.name))
+        ]
+        stub.body = stub.body or [ast.Expr(ast.Constant(...))]
+    else:
+        stub.body = _stub_body(node)
+    return stub
+
+
+def build_stub(node: ast.AST) -> str:
+    """
+    Build a `.pyi`-style stub for a function or class node.
+    
+    Functions keep their decorators, annotated signature and the first line of their docstring. Classes keep their bases, the first docstring line, annotated class attributes and the stubs of their public methods.
+    
+    Args:
+      node (ast.AST): An AST node representing a function or class.
+    
+    Returns:
+      str: The stub source code, or an empty string for other node types.
+    """
+    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return ""
+    return ast.unparse(_stub_node(node))
@@ -0,0 +1,108 @@
+import asyncio
+import functools
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from constants import IO_WORKERS
+
+_io_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _read_umask() -> int:
+    """
+    Returns the process umask (mkstemp creates files as 0o600, regular writes honour the umask).
+    """
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once at import: changing the umask from pool threads would race with other file creation
+_UMASK = _read_umask()
+
+
+def _pool() -> ThreadPoolExecutor:
+    """
+    Returns the shared, bounded thread pool for file I/O and parsing (created on first use).
+    """
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="file-io")
+    return _io_pool
+
+
+async def run_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Runs blocking work (file I/O, parsing) in the I/O thread pool so the event loop keeps
+    serving in-flight model requests.
+
+    Args:
+      func (Callable[..., Any]): The blocking function.
+      *args: Positional arguments for `func`.
+      **kwargs: Keyword arguments for `func`.
+
+    Returns:
+      Any: What `func` returns.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), functools.partial(func, *args, **kwargs))
+
+
+def read_text(path: Path) -> str:
+    """
+    Reads a UTF-8 text file without translating its line endings.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def atomic_write_text(path: Path, text: str):
+    """
+    Writes a UTF-8 text file atomically: the content goes to a temporary file in the same
+    folder, which then replaces the target. Readers see either the old or the new file, never
+    a partial one. Line endings are written as given and existing permissions are kept.
+
+    Args:
+      path (Path): The file to write.
+      text (str): The new content.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp_path, path.stat().st_mode & 0o7777)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def write_text_if_changed(path: Path, text: str) -> bool:
+    """
+    Atomically writes a text file unless it already holds exactly `text`. Skipping no-op
+    writes keeps mtimes and hashes stable, so indexes and caches stay valid.
+
+    Args:
+      path (Path): The file to write.
+      text (str): The new content.
+
+    Returns:
+      bool: True if the file was written, False if it was already up to date.
+    """
+    try:
+        if read_text(path) == text:
+            return False
+    except (OSError, UnicodeDecodeError):
+        pass  # Missing or unreadable: write it
+    atomic_write_text(path, text)
+    return True
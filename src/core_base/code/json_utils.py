@@ -18,7 +18,7 @@ def safe_json_loads(text: str):
     try:
         return json.loads(cleaned)
     except json.JSONDecodeError as e:
-        print("Error al parsear JSON incluso tras limpieza:", e)
-        print("Contenido limpio:")
-        print(cleaned)
+        # Only a short preview: big batches produce megabytes of output
+        preview = cleaned[:200] + ("..." if len(cleaned) > 200 else "")
+        print(f"[WARN] Could not parse JSON ({e}); {len(cleaned)} chars, starts with: {preview!r}")
         return None
\ No newline at end of file
@@ -0,0 +1,145 @@
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, List
+
+try:
+    import orjson  # Optional fast path
+except ImportError:
+    orjson = None
+
+_FENCE = re.compile(r"^\s*```[\w-]*\s*\n?|\n?\s*```\s*$")
+_ITEMS_START = re.compile(r'"items"\s*:\s*\[')
+_SEPARATORS = " \t\r\n,"
+
+
+@dataclass
+class ParsedResponse:
+    """
+    Result of parsing a model response that should contain a list of items.
+
+    Attributes:
+      items (List[Any]): The item objects that could be decoded (dictionaries for valid payloads).
+      complete (bool): False when the payload was cut off and only a valid prefix was recovered.
+    """
+    items: List[Any] = field(default_factory=list)
+    complete: bool = True
+
+
+def _loads(text: str) -> Any:
+    """
+    Decode JSON with orjson when it is installed, falling back to the standard library.
+
+    Raises:
+      ValueError: If the text is not valid JSON (both decoders raise ValueError subclasses).
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """
+    Remove commas directly followed (after whitespace) by a closing bracket, outside string literals.
+
+    A single pass tracks string literals and their escapes, so code in string values (e.g. a
+    generated test containing `[1, 2,]`) is left untouched.
+    """
+    out: List[str] = []
+    in_string = escaped = False
+    comma = None  # Position in `out` of the last comma seen outside strings, if only whitespace followed
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch in "]}" and comma is not None:
+            out[comma] = ""
+            comma = None
+        elif ch == ",":
+            comma = len(out)
+        elif not ch.isspace():
+            comma = None
+            in_string = ch == '"'
+        out.append(ch)
+    return "".join(out)
+
+
+def _items_of(parsed: Any) -> List[Any]:
+    """
+    Return the item list of a decoded payload ({"items": [...]} or a bare list).
+    """
+    if isinstance(parsed, dict):
+        parsed = parsed.get("items", [])
+    return [item for item in parsed if isinstance(item, dict)] if isinstance(parsed, list) else []
+
+
+def strip_markdown_fences(text: str) -> str:
+    """
+    Remove a surrounding ```json ... ``` markdown fence, if present.
+
+    Args:
+      text (str): The raw model response.
+
+    Returns:
+      str: The response without fences and surrounding whitespace.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = _FENCE.sub("", text)
+    return text.strip()
+
+
+def parse_response(text: str, max_items: int = 10_000) -> ParsedResponse:
+    """
+    Parse a model response into its list of items.
+
+    The fast path decodes the whole (unfenced) payload at once. If that fails, the repair path
+    removes trailing commas and then decodes the `items` array one element at a time, keeping
+    the largest valid prefix. This recovers truncated outputs in a single linear pass.
+
+    Args:
+      text (str): The raw model response.
+      max_items (int, optional): Maximum number of items to recover, defaults to 10,000.
+
+    Returns:
+      ParsedResponse: The recovered items and whether the payload was complete.
+    """
+    cleaned = strip_markdown_fences(text or "")
+    try:
+        return ParsedResponse(_items_of(_loads(cleaned)))
+    except ValueError:
+        pass
+
+    # === Repair path
+    cleaned = _strip_trailing_commas(cleaned).replace("\x00", "")
+    try:
+        return ParsedResponse(_items_of(_loads(cleaned)))
+    except ValueError:
+        pass
+
+    match = _ITEMS_START.search(cleaned)
+    pos = match.end() if match else cleaned.find("[") + 1
+    if pos <= 0:
+        return ParsedResponse(complete=False)
+
+    decoder = json.JSONDecoder()
+    items: List[Any] = []
+    while len(items) < max_items:
+        while pos < len(cleaned) and cleaned[pos] in _SEPARATORS:
+            pos += 1
+        if pos >= len(cleaned):
+            break
+        if cleaned[pos] == "]":
+            return ParsedResponse(items)
+        try:
+            value, pos = decoder.raw_decode(cleaned, pos)
+        except json.JSONDecodeError:
+            break
+        if isinstance(value, dict):
+            items.append(value)
+
+    return ParsedResponse(items, complete=False)
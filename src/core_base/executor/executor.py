@@ -1,52 +1,155 @@
+import asyncio
 from pathlib import Path
-from typing import Callable, List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any, Tuple
+from constants import PIPELINE_QUEUE_SIZE
+from src.core_base.executor.run_journal import RunJournal, WRITTEN
+from src.core_base.executor.sharding import ShardResultWriter, default_shard_output
+from src.core_base.indexer.project_indexer import ProjectIndexer
+
+_DONE = object()  # End-of-stream marker for the write queue
 
 async def execute_in_path(
     path: str,
-    generate_func: Callable[..., Any],
+    stream_func: Callable[..., Any],
     write_func: Callable[..., Any],
     model_name: str = "gpt-4o-mini",
     project_path: Optional[str] = None,
     target_names: Optional[List[str]] = None,
     item_name: str = "items",
+    generate_kwargs: Optional[Dict[str, Any]] = None,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    resume: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_output: Optional[str] = None,
+    write_concurrency: int = 1,
 ):
     """
-    Asynchronously executes a function in the specified path and writes the results using another function.
-    
+    Asynchronously generates results in the specified path and writes them file by file as a pipeline.
+
+    A producer task consumes `stream_func` (which yields one file's results at a time) into a bounded
+    queue, while this coroutine writes each file as soon as it arrives (up to `write_concurrency`
+    files at once, for writers that call a model). When writing falls behind, the full queue
+    pauses generation, so memory stays bounded. A file that fails to be written does not stop the
+    others, and files already written are kept.
+
+    Progress is checkpointed in a run journal under `.code_index/runs/` (see RunJournal). With
+    `resume`, files written by the interrupted run are skipped and generated-but-unwritten
+    results are written from the journal without calling the model again.
+
+    With `shard`, only that shard of the files is generated and, instead of calling `write_func`,
+    the results are appended to a JSONL file that `merge-apply` applies later.
+
+    With a `project_path`, writers receive its ProjectIndexer (`indexer=`) and refresh the files
+    they change, so the next run starts from an up-to-date index. A writer returning False made
+    no change (the file already held the generated content).
+
     Args:
       path (str): The filesystem path where the operation will be executed.
-      generate_func (Callable[..., Any]): A callable that generates results based on the execution context.
-      write_func (Callable[..., Any]): A callable that writes the generated results to the specified location.
+      stream_func (Callable[..., Any]): An async generator function yielding (file_path, results, source_hash) per file,
+        where source_hash is the hash of the source read before generation (None if unknown).
+      write_func (Callable[..., Any]): A coroutine writing one file's results: write_func(file_path, items, **kwargs).
+        It may return False when the file was left unchanged.
       model_name (str, optional): The name of the model to use for generation, defaults to 'gpt-4o-mini'.
       project_path (Optional[str], optional): An optional path to the project context.
       target_names (Optional[List[str]], optional): A list of target names to filter results, if any.
       item_name (str, optional): A label for the items being processed, defaults to 'items'.
-    
+      generate_kwargs (Optional[Dict[str, Any]], optional): Extra keyword arguments forwarded to stream_func.
+      queue_size (int, optional): Maximum number of generated files waiting to be written, defaults to PIPELINE_QUEUE_SIZE.
+      resume (bool, optional): Continue the previous interrupted run of the same command and path, defaults to False.
+      shard (Optional[Tuple[int, int]], optional): Only process shard i of n (1-based), requires `project_path`, defaults to None.
+      shard_output (Optional[str], optional): The shard results file, defaults to `.code_index/shards/<kind>-<i>-of-<n>.jsonl`.
+      write_concurrency (int, optional): Maximum number of files being written at the same time, defaults to 1.
+
+    Raises:
+      ValueError: If `shard` is given without a `project_path`.
+
     Returns:
       None: This function does not return any value, it performs actions directly.
     """
+    if shard and not project_path:
+        raise ValueError("`project_path` is required with `shard`: results are stored relative to the project root.")
     path_obj = Path(path).resolve()
     if not path_obj.exists():
         print(f"[WARN] {path} not found.")
         return
 
-    results = await generate_func(str(path_obj), model_name, target_names, project_path)
-    if not results:
-        print(f"[INFO] {item_name} not generated.")
-        return
+    # Checkpoints and shard results live next to the project index (or the scanned folder without a project)
+    run_root = Path(project_path) if project_path else (path_obj if path_obj.is_dir() else path_obj.parent)
+    journal_kind = f"{item_name} {shard[0]}-of-{shard[1]}" if shard else item_name
+    journal = RunJournal(run_root, journal_kind, str(path_obj), target_names)
+    replay: Dict[str, List[dict]] = {}
+    skip_files = set()
+    if resume and journal.load():
+        replay = journal.replayable()
+        done = {f for f, entry in journal.entries.items() if entry["status"] == WRITTEN}
+        skip_files = done | set(replay)
+        print(f"[INFO] Resuming: {len(done)} file(s) already written, {len(replay)} replayed from the journal.")
+    else:
+        journal.reset()
 
-    grouped: Dict[str, List[dict]] = {}
-    for item in results:
-        grouped.setdefault(item["file_path"], []).append(item)
+    if shard:
+        output = Path(shard_output) if shard_output else default_shard_output(run_root, item_name, *shard)
+        write_func = ShardResultWriter(output, item_name, run_root, append=resume)
+        print(f"[INFO] Shard {shard[0]}/{shard[1]} results go to {output}")
 
-    # Detecta tipo de writer según su firma
-    for file_path, items in grouped.items():
+    # Only the hash table is loaded here; writers refresh single files in place
+    indexer = ProjectIndexer(Path(project_path)) if project_path and not shard else None
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+
+    async def produce():
+        try:
+            for file_path, results in replay.items():
+                await queue.put((file_path, results))
+            async for file_path, results, source_hash in stream_func(
+                str(path_obj), model_name, target_names, project_path,
+                skip_files=skip_files, shard=shard, **(generate_kwargs or {})
+            ):
+                journal.record_generated(file_path, results, source_hash)
+                await queue.put((file_path, results))  # Waits while the queue is full
+        finally:
+            await queue.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    written, unchanged, failed = 0, 0, 0
+
+    async def write(file_path: str, items: List[dict]):
+        nonlocal written, unchanged, failed
         try:
-            await write_func(Path(file_path), items, model_name=model_name, project_path=project_path)
-        except TypeError:
-            # Caso: writer que agrupa internamente (como UnitTestWriterWithReview)
-            await write_func(results, project_path=project_path, model_name=model_name)
-            break  # Ya procesa todo de una vez
+            changed = await write_func(
+                Path(file_path), items, model_name=model_name, project_path=project_path, indexer=indexer
+            )
+        except Exception as e:
+            failed += 1
+            print(f"[WARN] Could not write {item_name} in {file_path}: {e}")
+            return
+        journal.record_written(file_path)
+        if changed is False:
+            unchanged += 1
+            print(f"[INFO] {item_name.capitalize()} already up to date in {file_path}")
+            return
+        written += 1
         print(f"✅ {item_name.capitalize()} writen in {file_path}")
 
-    print(f"[OK] {item_name.capitalize()} successfuly actualized.")
\ No newline at end of file
+    writing = set()
+    while True:
+        # Only take the next file when a write slot is free, so the queue keeps its backpressure
+        if len(writing) >= max(1, write_concurrency):
+            _, writing = await asyncio.wait(writing, return_when=asyncio.FIRST_COMPLETED)
+        batch = await queue.get()
+        if batch is _DONE:
+            break
+        writing.add(asyncio.create_task(write(*batch)))
+    if writing:
+        await asyncio.wait(writing)
+
+    await producer  # Re-raises generation errors after everything ready was written
+
+    if not written and not unchanged and not failed:
+        print(f"[INFO] {item_name} not generated.")
+        return
+    if unchanged:
+        print(f"[INFO] {unchanged} file(s) skipped: nothing changed.")
+    if failed:
+        print(f"[WARN] {item_name.capitalize()} not written in {failed} file(s).")
+    print(f"[OK] {item_name.capitalize()} successfuly actualized.")
@@ -0,0 +1,128 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PENDING = "pending"
+GENERATED = "generated"
+WRITTEN = "written"
+
+
+def file_hash(file_path: Path) -> Optional[str]:
+    """
+    Returns the SHA1 of a file's content, or None if it cannot be read.
+    """
+    try:
+        return hashlib.sha1(Path(file_path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+class RunJournal:
+    """
+    Append-only checkpoint log of a generation run, stored under `.code_index/runs/`.
+
+    Each line records one event for a source file: 'generated' (with the parsed outputs and
+    the hash of the file they were generated from) or 'written'. Files without events are
+    'pending'. Appending keeps checkpoints cheap, and a crash loses at most the current line.
+    A new (non-resumed) run of the same command and path starts the journal over.
+
+    Attributes:
+      path (Path): The journal file (.jsonl).
+      entries (Dict[str, dict]): The latest event of each file, keyed by resolved file path.
+    """
+
+    def __init__(self, root: Path, kind: str, target: str, target_names: Optional[List[str]] = None):
+        """
+        Initializes the journal of one run, identified by what is generated, the target path and the name filter.
+
+        Args:
+          root (Path): The folder holding `.code_index` (the project root).
+          kind (str): What is generated (e.g. 'docstrings' or 'unit tests').
+          target (str): The file or folder the run processes.
+          target_names (Optional[List[str]]): The function/class name filter of the run, if any.
+        """
+        run_id = f"{kind}|{Path(target).resolve()}|{','.join(sorted(target_names or []))}"
+        digest = hashlib.sha1(run_id.encode("utf-8")).hexdigest()[:12]
+        self.path = Path(root) / ".code_index" / "runs" / f"{kind.replace(' ', '_')}-{digest}.jsonl"
+        self.entries: Dict[str, dict] = {}
+
+    def load(self) -> int:
+        """
+        Loads the events of a previous run (a truncated last line is ignored).
+
+        Returns:
+          int: The number of files with recorded progress.
+        """
+        self.entries = {}
+        if not self.path.exists():
+            return 0
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            self.entries[event["file"]] = event
+        return len(self.entries)
+
+    def reset(self):
+        """
+        Starts a fresh journal, discarding previous progress.
+        """
+        self.entries = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("", encoding="utf-8")
+
+    def status(self, file_path: str) -> str:
+        """
+        Returns the status of a file: 'pending', 'generated' or 'written'.
+        """
+        entry = self.entries.get(str(Path(file_path).resolve()))
+        return entry["status"] if entry else PENDING
+
+    def replayable(self) -> Dict[str, List[dict]]:
+        """
+        Returns the generated-but-unwritten outputs whose source file is unchanged since generation
+        (outputs recorded without a source hash are regenerated).
+
+        Returns:
+          Dict[str, List[dict]]: The outputs to write, keyed by source file path.
+        """
+        return {
+            file: entry["outputs"]
+            for file, entry in self.entries.items()
+            if entry["status"] == GENERATED and entry.get("hash") is not None and file_hash(Path(file)) == entry["hash"]
+        }
+
+    def record_generated(self, file_path: str, outputs: List[dict], source_hash: Optional[str] = None):
+        """
+        Checkpoints the parsed outputs of a file before they are written.
+
+        Args:
+          file_path (str): The source file.
+          outputs (List[dict]): Its generated outputs.
+          source_hash (Optional[str]): The hash of the source they were generated from, read before
+            generation. Without it the outputs are never replayed.
+        """
+        file = str(Path(file_path).resolve())
+        self._append({
+            "file": file,
+            "status": GENERATED,
+            "hash": source_hash,
+            "outputs": outputs,
+        })
+
+    def record_written(self, file_path: str):
+        """
+        Marks a file as written.
+        """
+        self._append({"file": str(Path(file_path).resolve()), "status": WRITTEN})
+
+    def _append(self, event: dict):
+        """
+        Appends one event and updates the in-memory state.
+        """
+        self.entries[event["file"]] = event
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(event, default=str) + "\n")
@@ -0,0 +1,181 @@
+import ast
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+from src.core_base.code.file_io import run_io
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parses a shard specification such as '2/4' (shard 2 of 4, 1-based).
+
+    Args:
+      spec (str): The 'i/n' specification.
+
+    Returns:
+      Tuple[int, int]: The shard index (1-based) and the number of shards.
+
+    Raises:
+      ValueError: If the specification is malformed or out of range.
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected 'i/n' (e.g. '1/4').")
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}': i must be between 1 and n.")
+    return index, count
+
+
+def _item_weight(file_path: str) -> int:
+    """
+    Estimates the work of a file as 1 + its number of functions, methods and classes.
+    """
+    try:
+        tree = ast.parse(Path(file_path).read_text(encoding="utf-8"))
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return 1
+    return 1 + sum(isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) for n in ast.walk(tree))
+
+
+def _stable_key(file_path: str, root: Path) -> str:
+    """
+    Returns a machine-independent hash of a file: its path relative to the scanned root.
+    """
+    try:
+        rel = Path(file_path).resolve().relative_to(root.resolve()).as_posix()
+    except ValueError:
+        rel = Path(file_path).name
+    return hashlib.sha1(rel.encode("utf-8")).hexdigest()
+
+
+def select_shard(files: Iterable[str], root: Path, index: int, count: int) -> List[str]:
+    """
+    Deterministically selects the files of one shard, balanced by item count.
+
+    Files are sorted by weight (largest first, ties broken by the hash of their relative path)
+    and each goes to the currently lightest shard (longest-processing-time first). Every machine
+    running on the same checkout computes the same assignment, whatever its directory layout.
+
+    Args:
+      files (Iterable[str]): The discovered Python files.
+      root (Path): The scanned folder, used to make paths machine-independent.
+      index (int): The shard to select (1-based).
+      count (int): The number of shards.
+
+    Returns:
+      List[str]: The files of the shard, in their original order.
+    """
+    files = list(files)
+    if count <= 1:
+        return files
+
+    weighted = sorted(((-_item_weight(f), _stable_key(f, Path(root)), f) for f in files))
+    loads = [0] * count
+    selected = set()
+    for negative_weight, _, file_path in weighted:
+        shard = min(range(count), key=lambda s: (loads[s], s))
+        loads[shard] -= negative_weight
+        if shard == index - 1:
+            selected.add(file_path)
+    return [f for f in files if f in selected]
+
+
+def default_shard_output(root: Path, kind: str, index: int, count: int) -> Path:
+    """
+    Returns the default results file of a shard: `<root>/.code_index/shards/<kind>-<i>-of-<n>.jsonl`.
+    """
+    return Path(root) / ".code_index" / "shards" / f"{kind.replace(' ', '_')}-{index}-of-{count}.jsonl"
+
+
+class ShardResultWriter:
+    """
+    Write function for sharded runs: instead of editing files, appends each file's results to a
+    JSONL file (one line per source file) that `merge-apply` applies later.
+
+    Paths are stored relative to `root`, so results produced on one machine apply on another.
+
+    Attributes:
+      output (Path): The JSONL results file.
+      kind (str): What was generated (e.g. 'docstrings' or 'unit tests').
+      root (Path): The project root the stored paths are relative to.
+    """
+
+    def __init__(self, output: Path, kind: str, root: Path, append: bool = False):
+        """
+        Initializes the writer, truncating the results file unless `append` is set.
+
+        Args:
+          output (Path): The JSONL results file.
+          kind (str): What is generated.
+          root (Path): The project root the stored paths are relative to.
+          append (bool, optional): Keep existing results (e.g. when resuming), defaults to False.
+        """
+        self.output = Path(output)
+        self.kind = kind
+        self.root = Path(root).resolve()
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        if not append:
+            self.output.write_text("", encoding="utf-8")
+
+    def _relative(self, file_path) -> str:
+        """
+        Returns a path relative to the root (unchanged when outside of it).
+        """
+        try:
+            return Path(file_path).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return str(file_path)
+
+    async def __call__(self, file_path: Path, items: List[dict], **_):
+        """
+        Appends the results of one source file.
+
+        Args:
+          file_path (Path): The source file.
+          items (List[dict]): Its generated outputs.
+        """
+        record = {
+            "kind": self.kind,
+            "file": self._relative(file_path),
+            "items": [{**item, "file_path": self._relative(item["file_path"])} for item in items],
+        }
+        await run_io(self._append, json.dumps(record, default=str) + "\n")
+
+    def _append(self, line: str):
+        """
+        Appends one line to the results file.
+        """
+        with self.output.open("a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def load_shard_results(paths: Iterable[Path], root: Path) -> Dict[str, Dict[str, List[dict]]]:
+    """
+    Loads and merges shard results files, rebasing their paths on `root`.
+
+    A file recorded more than once (e.g. a shard that was re-run) keeps its last record.
+
+    Args:
+      paths (Iterable[Path]): The JSONL results files of all shards.
+      root (Path): The project root to apply the results to.
+
+    Returns:
+      Dict[str, Dict[str, List[dict]]]: The items per kind and absolute source file path.
+    """
+    root = Path(root).resolve()
+    merged: Dict[str, Dict[str, List[dict]]] = {}
+    for path in paths:
+        for line_number, line in enumerate(Path(path).read_text(encoding="utf-8").splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"[WARN] Skipping malformed line {line_number} of {path}")
+                continue
+            file_path = str(root / record["file"])
+            items = [{**item, "file_path": str(root / item["file_path"])} for item in record["items"]]
+            merged.setdefault(record["kind"], {})[file_path] = items
+    return merged
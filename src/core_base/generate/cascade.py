@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+from src.core_base.agents.base_agents import BaseCodeGenerationAgent
+from src.core_base.code.code_model import CodeItem
+from src.core_base.indexer.project_indexer import ProjectIndexer
+
+
+@dataclass
+class TierStats:
+    """
+    Counters for one model of the cascade.
+
+    Attributes:
+      model_name (str): The model of this tier.
+      sent (int): Items sent to the model.
+      accepted (int): Items whose output passed local validation.
+      errors (int): Batches that failed with an exception (all their items escalate).
+    """
+    model_name: str
+    sent: int = 0
+    accepted: int = 0
+    errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Returns:
+          float: The fraction of sent items accepted at this tier (0.0 when nothing was sent).
+        """
+        return self.accepted / self.sent if self.sent else 0.0
+
+
+class ModelCascade:
+    """
+    Sends each batch to the cheapest model first and escalates only the items whose output
+    fails local validation (`agent.validate_output`) to the next model of the ladder.
+
+    It exposes the same `generate` / `item_ids` interface as a BaseCodeGenerationAgent, so
+    it can replace the agent of a generation manager.
+
+    Attributes:
+      models (List[str]): The model ladder, cheapest first.
+      stats (List[TierStats]): Per-tier counters.
+      unresolved (int): Items that failed validation at every tier (the last output is kept).
+    """
+
+    def __init__(
+        self,
+        agent_class: Type[BaseCodeGenerationAgent],
+        models: List[str],
+        project_path: Optional[Path] = None,
+        indexer: Optional[ProjectIndexer] = None,
+        snippet_cache: Optional[dict] = None,
+    ):
+        """
+        Initializes the cascade. Tier agents are created on first use.
+
+        Args:
+          agent_class (Type[BaseCodeGenerationAgent]): The agent class used at every tier.
+          models (List[str]): The model ladder, cheapest first.
+          project_path (Optional[Path]): The project root passed to the tier agents.
+          indexer (Optional[ProjectIndexer]): A loaded project index shared by the tier agents.
+          snippet_cache (Optional[dict]): Rendered context snippets shared by the tier agents.
+
+        Raises:
+          ValueError: If the ladder is empty.
+        """
+        if not models:
+            raise ValueError("The model cascade needs at least one model.")
+        self.agent_class = agent_class
+        self.models = list(models)
+        self.project_path = project_path
+        self.indexer = indexer
+        self.snippet_cache = snippet_cache
+        self.stats = [TierStats(model) for model in self.models]
+        self.unresolved = 0
+        self._agents: Dict[int, BaseCodeGenerationAgent] = {}
+
+    item_ids = staticmethod(BaseCodeGenerationAgent.item_ids)
+
+    def _agent(self, tier: int) -> BaseCodeGenerationAgent:
+        """
+        Returns the agent of a tier, creating it the first time.
+        """
+        if tier not in self._agents:
+            self._agents[tier] = self.agent_class(
+                model_name=self.models[tier],
+                project_path=self.project_path,
+                indexer=self.indexer,
+                snippet_cache=self.snippet_cache,
+            )
+        return self._agents[tier]
+
+    async def generate(self, items: List[CodeItem]):
+        """
+        Generates outputs for the items, escalating failures through the ladder.
+
+        Args:
+          items (List[CodeItem]): The code items to process.
+
+        Returns:
+          List[BaseModel]: One output per item that any tier produced, labelled with the IDs of `item_ids(items)`.
+        """
+        pending = self.item_ids(items)
+        accepted: Dict[str, object] = {}
+        rejected: Dict[str, object] = {}
+
+        for tier, stats in enumerate(self.stats):
+            agent = self._agent(tier)
+            batch_ids = list(pending)
+            batch = [pending[item_id] for item_id in batch_ids]
+            remap = dict(zip(agent.item_ids(batch), batch_ids))
+            stats.sent += len(batch)
+
+            try:
+                outputs = await agent.generate(batch)
+            except Exception as e:
+                stats.errors += 1
+                print(f"[WARN] Cascade tier {stats.model_name} failed: {e}")
+                outputs = []
+
+            failures = []
+            for out in outputs:
+                item_id = remap.get(out.id)
+                if item_id not in pending:
+                    continue
+                out.id = item_id
+                problems = agent.validate_output(pending[item_id], out)
+                if problems:
+                    rejected[item_id] = out
+                    failures.append(f"{pending[item_id].qualname}: {'; '.join(problems)}")
+                    continue
+                accepted[item_id] = out
+                del pending[item_id]
+                stats.accepted += 1
+
+            if not pending:
+                break
+            if tier + 1 < len(self.models):
+                print(f"[INFO] Cascade: escalating {len(pending)} item(s) from {stats.model_name} to {self.models[tier + 1]}")
+                for failure in failures:
+                    print(f"  - {failure}")
+
+        # Best effort: keep the last rejected output of items no tier got right
+        self.unresolved += len(pending)
+        accepted.update({item_id: rejected[item_id] for item_id in pending if item_id in rejected})
+        return [accepted[item_id] for item_id in self.item_ids(items) if item_id in accepted]
+
+    def summary(self) -> str:
+        """
+        Returns:
+          str: The per-tier hit rates, for tuning cost against latency.
+        """
+        lines = ["[INFO] Cascade hit rates:"]
+        for stats in self.stats:
+            errors = f", {stats.errors} failed batch(es)" if stats.errors else ""
+            lines.append(
+                f"  {stats.model_name}: {stats.accepted}/{stats.sent} accepted ({stats.hit_rate:.0%}){errors}"
+            )
+        lines.append(f"  unresolved: {self.unresolved}")
+        return "\n".join(lines)
@@ -0,0 +1,193 @@
+import ast
+import asyncio
+import hashlib
+import json
+import textwrap
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.core_base.code.code_model import CodeItem
+from src.core_base.indexer.project_indexer import ProjectIndexer
+
+
+def normalized_source(source: str) -> str:
+    """
+    Normalize an item's source so copies that differ only in formatting, comments or
+    their own docstring compare equal.
+
+    Args:
+      source (str): The item source code.
+
+    Returns:
+      str: The unparsed AST without the item's docstring (the dedented source if it does not parse).
+    """
+    source = textwrap.dedent(source)
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return source.strip()
+
+    node = tree.body[0] if tree.body else None
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and ast.get_docstring(node) is not None:
+        node.body = node.body[1:] or [ast.Pass()]
+    return ast.unparse(tree)
+
+
+def module_name(file_path: Path, project_path: Optional[Path] = None) -> str:
+    """
+    Dotted module path of a file relative to the project root (the file stem outside a project).
+
+    Args:
+      file_path (Path): The Python file.
+      project_path (Optional[Path]): The project root.
+
+    Returns:
+      str: The module path, e.g. 'pkg.utils' for 'pkg/utils.py' or 'pkg' for 'pkg/__init__.py'.
+    """
+    file_path = Path(file_path).resolve()
+    try:
+        parts = list(file_path.relative_to(Path(project_path).resolve()).with_suffix("").parts)
+    except (TypeError, ValueError):
+        parts = [file_path.stem]
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+class ResponseCoalescer:
+    """
+    Coalesces generation requests for identical code items.
+
+    Items with the same normalized source share one content hash. The first item of a hash
+    owns the request; every other copy awaits the same future and receives its result.
+    Completed results are also written to a response cache under
+    `<project>/.code_index/responses/<kind>/`, so copies seen in later runs reuse them.
+
+    Attributes:
+      kind (str): What is generated (e.g. 'docstring' or 'unit_test'); part of the cache path.
+      model (str): The model (or cascade) generating the outputs; part of the hash.
+      indexer (Optional[ProjectIndexer]): Resolves the stubs of referenced names, which are part of the hash.
+      cache_dir (Optional[Path]): The response cache directory, None for in-memory only.
+      read_cache (bool): Whether cached responses from previous runs may be reused.
+      coalesced (int): Items served from another item's result during this run.
+      cache_hits (int): Of those, items served from the response cache of a previous run.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        model: str,
+        project_path: Optional[Path] = None,
+        read_cache: bool = True,
+        indexer: Optional[ProjectIndexer] = None,
+    ):
+        """
+        Initializes the coalescer.
+
+        Args:
+          kind (str): What is generated; part of the cache path.
+          model (str): The model (or cascade) generating the outputs.
+          project_path (Optional[Path]): The project root holding `.code_index`, None to disable the disk cache.
+          read_cache (bool, optional): Reuse responses cached by previous runs, defaults to True.
+          indexer (Optional[ProjectIndexer]): The project index used to hash the prompt context, defaults to None.
+        """
+        self.kind = kind
+        self.model = model
+        self.indexer = indexer
+        self.cache_dir = Path(project_path) / ".code_index" / "responses" / kind if project_path else None
+        self.read_cache = read_cache
+        self.coalesced = 0
+        self.cache_hits = 0
+        self._futures: Dict[str, asyncio.Future] = {}
+
+    def _context(self, item: CodeItem) -> str:
+        """
+        Returns the prompt context an item's output depends on besides its source: its pruned
+        imports and the stubs of the project symbols it references. A changed callee signature or
+        an import pointing to another module then changes the key.
+        """
+        parts = sorted(item.imports or [])
+        if self.indexer is not None:
+            for name in sorted(getattr(item, "references", None) or []):
+                stubs = sorted(
+                    self.indexer.get_stub(m) for m in self.indexer.query_by_name(name) if m.qualname == m.name
+                )
+                parts.extend(f"{name}: {stub}" for stub in stubs)
+        return "\n".join(parts)
+
+    def key(self, item: CodeItem) -> str:
+        """
+        Returns the content hash of an item: model, type, qualified name, normalized source and prompt context.
+        """
+        payload = f"{self.model}|{item.type}|{item.qualname}|{normalized_source(item.source)}|{self._context(item)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def claim(self, key: str) -> Optional[asyncio.Future]:
+        """
+        Claims a hash for generation.
+
+        Args:
+          key (str): The item's content hash.
+
+        Returns:
+          Optional[asyncio.Future]: None if the caller now owns the request (and must `resolve` it),
+          otherwise the future of the request (or cached response) to share.
+        """
+        if key in self._futures:
+            self.coalesced += 1
+            return self._futures[key]
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+
+        cached = self._read(key)
+        if cached is None:
+            return None
+        future.set_result(cached)
+        self.coalesced += 1
+        self.cache_hits += 1
+        return future
+
+    def resolve(self, key: str, entry: Optional[Dict[str, Any]]):
+        """
+        Publishes the result of an owned request to every waiting copy and to the cache.
+
+        Args:
+          key (str): The item's content hash.
+          entry (Optional[Dict[str, Any]]): {'fields': generated fields, 'module': source module},
+            or None if generation failed for the item.
+        """
+        future = self._futures.get(key)
+        if future is not None and not future.done():
+            future.set_result(entry)
+        if entry is None:
+            # Let a later copy try again instead of sharing the failure
+            self._futures.pop(key, None)
+        else:
+            self._write(key, entry)
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached entry of a hash, or None.
+        """
+        if not (self.read_cache and self.cache_dir):
+            return None
+        path = self.cache_dir / f"{key}.json"
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, entry: Dict[str, Any]):
+        """
+        Stores an entry in the response cache (best effort).
+        """
+        if not self.cache_dir:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / f"{key}.json").write_text(json.dumps(entry), encoding="utf-8")
+        except OSError as e:
+            print(f"[WARN] Could not write response cache: {e}")
@@ -2,6 +2,30 @@ from typing import List, Dict, Any
 from src.core_base.code.code_model import CodeItem
 from src.core_base.agents.base_agents import BaseCodeGenerationAgent
 
+# Keys added to every output dictionary from its CodeItem (everything else is generated)
+ITEM_METADATA_KEYS = ("name", "qualname", "file_path", "source", "original_docstring", "source_imports")
+
+
+def item_output_dict(fields: Dict[str, Any], item: CodeItem) -> Dict[str, Any]:
+    """
+    Merge generated fields with the metadata of the CodeItem they belong to.
+
+    Args:
+        fields (Dict[str, Any]): The generated attributes (e.g. 'docstring' or 'test_code').
+        item (CodeItem): The item the fields were generated for.
+
+    Returns:
+        Dict[str, Any]: The generated fields plus the item's metadata (see ITEM_METADATA_KEYS).
+    """
+    out_item_dict = dict(fields)
+    out_item_dict["name"] = item.name
+    out_item_dict["qualname"] = item.qualname
+    out_item_dict["file_path"] = str(item.file_path)
+    out_item_dict["source"] = item.source
+    out_item_dict["original_docstring"] = item.docstring
+    out_item_dict["source_imports"] = item.imports
+    return out_item_dict
+
 async def generate_outputs_for_items(
     agent: BaseCodeGenerationAgent,
     items: List[CodeItem]
@@ -10,9 +34,12 @@ async def generate_outputs_for_items(
     Generate structured outputs (e.g., docstrings, unit tests) for a list of CodeItem objects
     using the provided BaseCodeGenerationAgent.
 
+    Outputs are matched back to their CodeItem through the short ID assigned in the prompt
+    (a dict lookup). Duplicate and unknown IDs are reported as warnings and ignored.
     Each resulting dictionary includes:
-      - All generated attributes from the agent
-      - Original fields of the CodeItem 'name', 'file_path', and 'source'
+      - All generated attributes from the agent (except the ID)
+      - Original fields of the CodeItem 'name', 'qualname', 'file_path', and 'source'
+      - 'source_imports': the minimal import statements the CodeItem needs
 
     Args:
         agent (BaseCodeGenerationAgent): The agent responsible for generating structured outputs.
@@ -24,19 +51,23 @@ async def generate_outputs_for_items(
     """
 
     generated = await agent.generate(items)
+    items_by_id = agent.item_ids(items)
+    seen_ids = set()
     results = []
 
     for out_item in generated:
         # Find matching generated item
-        match = next((item for item in items if item.name == out_item.name), None)
-        if match:
-            out_item_dict = out_item.__dict__.copy()
-
-            # Add or override key metadata
-            out_item_dict["file_path"] = str(match.file_path)
-            out_item_dict["source"] = match.source
-            out_item_dict["original_docstring"] = match.docstring
+        match = items_by_id.get(out_item.id)
+        if match is None:
+            print(f"[WARN] Unknown output id '{out_item.id}' ignored")
+            continue
+        if out_item.id in seen_ids:
+            print(f"[WARN] Duplicate output for '{out_item.id}' ({match.qualname}) ignored")
+            continue
+        seen_ids.add(out_item.id)
 
-            results.append(out_item_dict)
+        fields = out_item.__dict__.copy()
+        fields.pop("id", None)
+        results.append(item_output_dict(fields, match))
 
     return results
@@ -1,9 +1,20 @@
+import asyncio
 from pathlib import Path
-from typing import List, Optional, Type
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Type
 from src.core_base.agents.base_agents import BaseCodeGenerationAgent
 from src.core_base.indexer.project_indexer import ProjectIndexer
-from src.core_base.generate.generate_utils import generate_outputs_for_items
+from src.core_base.generate.generate_utils import (
+    generate_outputs_for_items,
+    item_output_dict,
+    ITEM_METADATA_KEYS,
+)
+from src.core_base.generate.cascade import ModelCascade
+from src.core_base.generate.coalescing import ResponseCoalescer, module_name
 from src.core_base.code.code_extractor import get_filtered_code_items
+from src.core_base.code.code_model import CodeItem
+from src.core_base.executor.run_journal import file_hash
+from src.core_base.executor.sharding import select_shard
+from constants import GENERATION_CONCURRENCY
 import os
 
 class BaseGenerationManager:
@@ -11,6 +22,7 @@ class BaseGenerationManager:
     Manager for generating structured code outputs using a specific code generation agent.
     
     This class supports generation per file to control token usage in large projects, ensuring efficient processing of multiple code items.
+    Identical items (e.g. copy-pasted helpers) are generated once and the result is shared by every copy.
     
     Attributes:
       agent_class (Type[BaseCodeGenerationAgent]): The class of the agent used for code generation.
@@ -18,24 +30,141 @@ class BaseGenerationManager:
 
     agent_class: Type[BaseCodeGenerationAgent]
 
-    def __init__(self, model_name: str = "gpt-4o-mini", project_path: Optional[Path] = None):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        project_path: Optional[Path] = None,
+        cascade: Optional[List[str]] = None,
+        concurrency: int = GENERATION_CONCURRENCY,
+        indexer: Optional[ProjectIndexer] = None,
+        snippet_cache: Optional[dict] = None,
+    ):
         """
         Initialize the BaseGenerationManager with a specified model name and project path.
         
         Args:
           model_name (str): The name of the model to use for code generation, default is 'gpt-4o-mini'.
           project_path (Optional[Path]): The path to the project for which code items will be indexed.
+          cascade (Optional[List[str]]): A model ladder (cheapest first) used instead of `model_name`.
+            Items whose output fails local validation are escalated to the next model.
+          concurrency (int): Maximum number of files generated at the same time, default is GENERATION_CONCURRENCY.
+          indexer (Optional[ProjectIndexer]): An already loaded project index (e.g. shared by a combined run), built from `project_path` if None.
+          snippet_cache (Optional[dict]): Rendered context snippets shared with other managers of the run, a new cache if None.
         """
         self.project_path = project_path
-        self.indexer = None
+        self.concurrency = max(1, concurrency)
+        self.indexer = indexer
 
-        # Initialize project indexer if path provided
-        if project_path:
+        # Initialize project indexer if path provided; the agents reuse it instead of indexing again
+        if self.indexer is None and project_path:
             self.indexer = ProjectIndexer(project_path)
             self.indexer.load_or_build()
+        self.snippet_cache = {} if snippet_cache is None else snippet_cache
+
+        # Initialize agent (or a cascade of agents)
+        shared = {"project_path": project_path, "indexer": self.indexer, "snippet_cache": self.snippet_cache}
+        if cascade:
+            self.agent = ModelCascade(self.agent_class, cascade, **shared)
+        else:
+            self.agent = self.agent_class(model_name=model_name, **shared)
+
+        # One request per distinct item, shared within the run and cached across runs
+        self.coalescer = ResponseCoalescer(
+            kind=self.agent_class.__name__,
+            model="+".join(cascade) if cascade else model_name,
+            project_path=project_path,
+            indexer=self.indexer,
+        )
+
+    def _select_items(self, items: List[CodeItem]) -> List[CodeItem]:
+        """
+        Choose which extracted items actually need generation.
+
+        Subclasses override this to skip items locally, before any model call.
+
+        Args:
+          items (List[CodeItem]): The items extracted from a file.
+
+        Returns:
+          List[CodeItem]: The items to send to the agent (all of them by default).
+        """
+        return items
+
+    def _order_files(self, files: List[str]) -> List[str]:
+        """
+        Choose the order in which files are generated.
 
-        # Initialize agent
-        self.agent = self.agent_class(model_name=model_name, project_path=project_path)
+        Subclasses override this to spend the budget on the most valuable files first.
+
+        Args:
+          files (List[str]): The files to process.
+
+        Returns:
+          List[str]: The same files, in processing order (unchanged by default).
+        """
+        return files
+
+    def _adapt_fields(self, fields: Dict[str, Any], source_module: str, item: CodeItem) -> Dict[str, Any]:
+        """
+        Adapt generated fields shared from an identical item in another module.
+
+        Args:
+          fields (Dict[str, Any]): The generated fields of the original item.
+          source_module (str): The dotted module of the original item.
+          item (CodeItem): The copy receiving the fields.
+
+        Returns:
+          Dict[str, Any]: The fields to use for `item` (unchanged by default).
+        """
+        return fields
+
+    async def _generate_coalesced(self, items: List[CodeItem]) -> List[dict]:
+        """
+        Generate outputs for the items, requesting each distinct item only once.
+
+        Items whose content hash is already claimed (earlier in the run, or in the response
+        cache) wait for that result instead of being sent to the agent.
+
+        Args:
+          items (List[CodeItem]): The items of one file.
+
+        Returns:
+          List[dict]: The output dictionaries, in item order.
+        """
+        owned, shared = [], []
+        for item in items:
+            key = self.coalescer.key(item)
+            future = self.coalescer.claim(key)
+            if future is None:
+                owned.append((item, key))
+            else:
+                shared.append((item, future))
+
+        outputs: Dict[int, dict] = {}
+        try:
+            if owned:
+                results = await generate_outputs_for_items(self.agent, [item for item, _ in owned])
+                by_item = {(r["qualname"], r["source"]): r for r in results}
+                for item, _ in owned:
+                    if (item.qualname, item.source) in by_item:
+                        outputs[id(item)] = by_item[(item.qualname, item.source)]
+        finally:
+            # Always release the claims, so copies never wait forever
+            for item, key in owned:
+                result = outputs.get(id(item))
+                self.coalescer.resolve(key, None if result is None else {
+                    "fields": {k: v for k, v in result.items() if k not in ITEM_METADATA_KEYS},
+                    "module": module_name(item.file_path, self.project_path),
+                })
+
+        for item, future in shared:
+            entry = await future
+            if entry is None:
+                continue
+            fields = self._adapt_fields(dict(entry["fields"]), entry["module"], item)
+            outputs[id(item)] = item_output_dict(fields, item)
+
+        return [outputs[id(item)] for item in items if id(item) in outputs]
 
     async def generate_for_file(
         self,
@@ -62,8 +191,132 @@ class BaseGenerationManager:
             print(f"[INFO] No code items found in {file_path}")
             return []
 
-        results = await generate_outputs_for_items(self.agent, items)
-        return results
+        return await self.generate_for_items(items)
+
+    async def generate_for_items(self, items: List[CodeItem]) -> List[dict]:
+        """
+        Generate structured outputs for items already extracted from one file.
+        
+        Args:
+          items (List[CodeItem]): The items of the file.
+        
+        Returns:
+          List[dict]: The outputs of the selected items.
+        """
+        items = self._select_items(items)
+        if not items:
+            return []
+        return await self._generate_coalesced(items)
+
+    @staticmethod
+    def _python_files(path_obj: Path) -> List[str]:
+        """
+        List the Python files to process: the file itself, or every .py file under a folder.
+        """
+        if path_obj.is_file():
+            return [str(path_obj)] if path_obj.suffix == ".py" else []
+        return [
+            os.path.join(root, f)
+            for root, _, files in os.walk(path_obj)
+            for f in files
+            if f.endswith(".py")
+        ]
+
+    def _source_hash(self, path_obj: Path) -> Optional[str]:
+        """
+        Return the hash of the source the items of a file are extracted from (None if unreadable).
+        """
+        return file_hash(path_obj)
+
+    async def _generate_file_safe(
+        self, file_path: str, target_names: Optional[List[str]]
+    ) -> Tuple[str, List[dict], Optional[str]]:
+        """
+        Generate outputs for one file, reporting (instead of raising) its errors so other files go on.
+
+        The source is hashed before it is extracted and sent to the model, so an edit made during
+        generation is not mistaken for the source of the outputs.
+        """
+        source_hash = self._source_hash(Path(file_path).resolve())
+        try:
+            return file_path, await self.generate_for_file(file_path, target_names), source_hash
+        except Exception as e:
+            print(f"[WARN] Generation failed for {file_path}: {e}")
+            return file_path, [], source_hash
+
+    async def iter_path(
+        self,
+        path: str,
+        target_names: Optional[List[str]] = None,
+        skip_files: Optional[Set[str]] = None,
+        shard: Optional[Tuple[int, int]] = None,
+    ) -> AsyncIterator[Tuple[str, List[dict], Optional[str]]]:
+        """
+        Generate structured outputs file by file, yielding each file's results as soon as they are ready.
+        
+        Up to `concurrency` files are generated at the same time. A new file is only started once
+        the consumer has taken a finished one, so at most `concurrency` results are held in memory.
+        A file that fails is reported and yields no results; the other files go on.
+        
+        Args:
+          path (str): The path to a Python file or a folder containing Python files.
+          target_names (Optional[List[str]]): List of function/class names to filter outputs.
+          skip_files (Optional[Set[str]]): Resolved paths of files not to process (e.g. finished in a resumed run).
+          shard (Optional[Tuple[int, int]]): Only process shard i of n (1-based) of the discovered files.
+        
+        Yields:
+          Tuple[str, List[dict], Optional[str]]: The file path, its generated outputs (files without outputs
+            are skipped) and the hash of the source they were generated from.
+        """
+        path_obj = Path(path).resolve()
+        if not path_obj.exists():
+            print(f"[WARN] Path not found: {path_obj}")
+            return
+
+        files = self._python_files(path_obj)
+        if shard:
+            files = select_shard(files, path_obj, *shard)
+            print(f"[INFO] Shard {shard[0]}/{shard[1]}: {len(files)} file(s)")
+        skip_files = skip_files or set()
+        files = self._order_files([f for f in files if str(Path(f).resolve()) not in skip_files])
+        pending_files = iter(files)
+        running = set()
+        total = 0
+
+        try:
+            while True:
+                for file_path in pending_files:
+                    running.add(asyncio.ensure_future(self._generate_file_safe(file_path, target_names)))
+                    if len(running) >= self.concurrency:
+                        break
+                if not running:
+                    break
+
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    file_path, results, source_hash = task.result()
+                    if results:
+                        total += len(results)
+                        yield file_path, results, source_hash
+        finally:
+            for task in running:
+                task.cancel()
+
+        self._report(total)
+
+    def _report(self, total: int):
+        """
+        Print the end-of-run summary: items processed, coalescing counters and cascade statistics.
+
+        Args:
+          total (int): The number of generated outputs.
+        """
+        print(
+            f"[INFO] Total items processed: {total} "
+            f"(coalesced: {self.coalescer.coalesced}, from response cache: {self.coalescer.cache_hits})"
+        )
+        if isinstance(self.agent, ModelCascade):
+            print(self.agent.summary())
 
     async def generate_for_path(
         self,
@@ -73,7 +326,7 @@ class BaseGenerationManager:
         """
         Generate structured outputs for all Python files under the specified folder path.
         
-        This method iterates through each file to control token usage during the generation process.
+        This method generates file by file (see `iter_path`) to control token usage and collects everything.
         
         Args:
           path (str): The path to the folder containing Python files.
@@ -82,25 +335,7 @@ class BaseGenerationManager:
         Returns:
           List[dict]: A list of dictionaries containing generated outputs from all processed files.
         """
-        path_obj = Path(path).resolve()
-        if not path_obj.exists():
-            print(f"[WARN] Path not found: {path_obj}")
-            return []
-
         all_results: List[dict] = []
-
-        if path_obj.is_file() and path_obj.suffix == ".py":
-            # Single file
-            results = await self.generate_for_file(str(path_obj), target_names)
+        async for _, results, _ in self.iter_path(path, target_names):
             all_results.extend(results)
-        else:
-            # Folder: iterate over all .py files
-            for root, _, files in os.walk(path_obj):
-                for f in files:
-                    if f.endswith(".py"):
-                        file_path = os.path.join(root, f)
-                        results = await self.generate_for_file(file_path, target_names)
-                        all_results.extend(results)
-
-        print(f"[INFO] Total items processed: {len(all_results)}")
-        return all_results
\ No newline at end of file
+        return all_results
@@ -1,8 +1,15 @@
 from pathlib import Path
+import ast
 import pickle
 import hashlib
+import textwrap
+import threading
 from typing import List, Dict
 from src.core_base.code.code_extractor import CodeExtractorTool, CodeItem
+from src.core_base.code.extractor_utils import build_stub
+
+# Bump when CodeItem gains fields so stale pickles are re-extracted
+INDEX_VERSION = "7"
 
 
 class ProjectIndexer:
@@ -11,6 +18,7 @@ class ProjectIndexer:
     Stores each file's CodeItems separately in `.code_index/indexes/`.
     File hashes are stored in `.code_index/hashes/file_hashes.pkl`.
     Automatically rebuilds only changed files and provides a summary.
+    Writers call `refresh_file` after editing a file, so the next run finds it already indexed.
     """
 
     def __init__(self, project_path: Path):
@@ -30,14 +38,69 @@ class ProjectIndexer:
         self.hashes_dir = self.index_dir / "hashes"
         self.hashes_dir.mkdir(exist_ok=True)
         self.hash_file = self.hashes_dir / "file_hashes.pkl"
+        self.version_file = self.hashes_dir / "version"
 
         self.index: List[CodeItem] = []
         self.file_hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()  # refresh_file runs in I/O worker threads
+
+        # Load hashes if exist (and were written by the current index format)
+        version = self.version_file.read_text().strip() if self.version_file.exists() else None
+        if version == INDEX_VERSION:
+            self.file_hashes = self._load_hashes()
+        else:
+            # Older formats used other pickle names: drop them so they cannot go stale
+            for stale in self.indexes_dir.glob("*.pkl"):
+                stale.unlink()
 
-        # Load hashes if exist
-        if self.hash_file.exists():
+    def _load_hashes(self) -> Dict[str, str]:
+        """
+        Loads the stored file hashes (empty if missing or unreadable, which forces a rebuild).
+        
+        Returns:
+          Dict[str, str]: The SHA1 of each indexed file, keyed by path.
+        """
+        if not self.hash_file.exists():
+            return {}
+        try:
             with open(self.hash_file, "rb") as f:
-                self.file_hashes = pickle.load(f)
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return {}
+
+    def _pickle_path(self, py_file: Path) -> Path:
+        """
+        Returns the pickle holding a file's CodeItems.
+        
+        The name is built from the path relative to the project, plus a short hash of it, so
+        files sharing a name in different packages (e.g. several `utils.py`) never collide.
+        
+        Args:
+          py_file (Path): The indexed Python file.
+        
+        Returns:
+          Path: The pickle path inside `.code_index/indexes/`.
+        """
+        try:
+            rel = Path(py_file).resolve().relative_to(self.project_path).with_suffix("").as_posix()
+        except ValueError:
+            rel = Path(py_file).resolve().with_suffix("").as_posix()
+        digest = hashlib.sha1(rel.encode("utf-8")).hexdigest()[:8]
+        return self.indexes_dir / f"{rel.replace('/', '.')}-{digest}.pkl"
+
+    def _is_indexed(self, py_file: Path) -> bool:
+        """
+        Tells whether a file belongs to the index (a project .py file outside hidden folders and caches).
+        """
+        try:
+            rel = py_file.relative_to(self.project_path)
+        except ValueError:
+            return False
+        return (
+            py_file.suffix == ".py"
+            and not any(part.startswith(".") for part in rel.parts)
+            and "__pycache__" not in rel.parts
+        )
 
     def _compute_file_hash(self, file_path: Path) -> str:
         """
@@ -68,16 +131,12 @@ class ProjectIndexer:
         new_file_hashes: Dict[str, str] = {}
 
         # Solo archivos propios, no carpetas ocultas ni __pycache__
-        py_files = [
-            f for f in self.project_path.rglob("*.py")
-            if not any(part.startswith(".") for part in f.parts)
-            and "__pycache__" not in f.parts
-        ]
+        py_files = [f for f in self.project_path.rglob("*.py") if self._is_indexed(f)]
 
         for py_file in py_files:
             file_hash = self._compute_file_hash(py_file)
             new_file_hashes[str(py_file)] = file_hash
-            pickle_path = self.indexes_dir / (py_file.name.replace(".py", ".pkl"))
+            pickle_path = self._pickle_path(py_file)
 
             if str(py_file) not in self.file_hashes:
                 # Nuevo archivo
@@ -110,18 +169,58 @@ class ProjectIndexer:
         # Detect deleted files
         deleted_files = set(self.file_hashes.keys()) - set(new_file_hashes.keys())
         for f in deleted_files:
-            pkl_path = self.indexes_dir / (Path(f).name.replace(".py", ".pkl"))
+            pkl_path = self._pickle_path(Path(f))
             if pkl_path.exists():
                 pkl_path.unlink()
             deleted += 1
 
         # Guardar hashes actualizados
-        with open(self.hash_file, "wb") as f:
-            pickle.dump(new_file_hashes, f)
+        self.file_hashes = new_file_hashes
+        self._save_hashes()
 
         print(f"[ProjectIndexer] Index loaded/built. Total items: {len(self.index)}")
         print(f"[INFO] New items: {created}, Updated items: {updated}, Deleted files: {deleted}")
 
+    def _save_hashes(self):
+        """
+        Stores the file hashes and the index format version.
+        """
+        with open(self.hash_file, "wb") as f:
+            pickle.dump(self.file_hashes, f)
+        self.version_file.write_text(INDEX_VERSION)
+
+    def refresh_file(self, file_path: Path) -> bool:
+        """
+        Updates the index in place after a file was written: re-extracts its items, replaces
+        them in memory, and stores the new pickle and hash. The next `load_or_build` then loads
+        the file from its pickle instead of extracting it again.
+        
+        Hashes recorded meanwhile by other indexers of the same project are merged, not overwritten.
+        Blocking: call it from the I/O thread pool inside async code.
+        
+        Args:
+          file_path (Path): The file that was written.
+        
+        Returns:
+          bool: True if the file is part of the index and was refreshed, False otherwise.
+        """
+        file_path = Path(file_path).resolve()
+        if not file_path.is_file() or not self._is_indexed(file_path):
+            return False
+
+        file_hash = self._compute_file_hash(file_path)
+        code_items = CodeExtractorTool(self.project_path).extract_from_file(file_path)
+        with self._lock:
+            with open(self._pickle_path(file_path), "wb") as f:
+                pickle.dump(code_items, f)
+            self.index = [item for item in self.index if Path(item.file_path).resolve() != file_path]
+            self.index.extend(code_items)
+            version = self.version_file.read_text().strip() if self.version_file.exists() else None
+            stored = self._load_hashes() if version == INDEX_VERSION else {}
+            self.file_hashes = {**self.file_hashes, **stored, str(file_path): file_hash}
+            self._save_hashes()
+        return True
+
     # ------------------------
     # Query methods
     # ------------------------
@@ -161,6 +260,24 @@ class ProjectIndexer:
         """
         return [item for item in self.index if item.file_path == file_path.resolve()]
 
+    def get_stub(self, item: CodeItem) -> str:
+        """
+        Returns the cached `.pyi`-style stub of an item, building and caching it if missing.
+        
+        Args:
+          item (CodeItem): The indexed item.
+        
+        Returns:
+          str: The stub source, or the item source if it cannot be parsed.
+        """
+        if not getattr(item, "stub", None):
+            try:
+                node = ast.parse(textwrap.dedent(item.source)).body[0]
+                item.stub = build_stub(node) or item.source
+            except (SyntaxError, IndexError):
+                item.stub = item.source
+        return item.stub
+
     def all_items(self) -> List[CodeItem]:
         """
         Returns all CodeItems in the current index.
@@ -1,7 +1,12 @@
 from src.docstring_core.docstring_models import DocstringOutputList
 from src.docstring_core.docstring_prompts import SYSTEM_PROMPT_DOCSTRINGS, PROMPT_TEMPLATE_DOCSTRINGS
+from src.docstring_core.docstring_quality import docstring_issues
 from src.core_base.agents.base_agents import BaseCodeGenerationAgent
+from src.core_base.code.code_model import CodeItem
+from src.core_base.indexer.project_indexer import ProjectIndexer
 from pathlib import Path
+from typing import List, Optional
+import copy
 
 class DocstringAgent(BaseCodeGenerationAgent):
     """
@@ -18,12 +23,35 @@ class DocstringAgent(BaseCodeGenerationAgent):
     PROMPT_TEMPLATE = PROMPT_TEMPLATE_DOCSTRINGS
     OutputModel = DocstringOutputList
 
-    def __init__(self, model_name: str, project_path: Path = None):
+    def __init__(
+        self,
+        model_name: str,
+        project_path: Path = None,
+        indexer: Optional[ProjectIndexer] = None,
+        snippet_cache: Optional[dict] = None,
+    ):
         """
         Initializes a DocstringAgent instance with a specified model name and an optional project path.
         
         Args:
           model_name (str): The name of the language model to be used for generation.
           project_path (Path, optional): The path to the project directory, defaults to None.
+          indexer (Optional[ProjectIndexer]): A loaded project index shared with the rest of the run, defaults to None (built from `project_path`).
+          snippet_cache (Optional[dict]): Rendered context snippets shared with other agents, defaults to None.
         """
-        super().__init__(model_name=model_name, project_path=project_path)
\ No newline at end of file
+        super().__init__(model_name=model_name, project_path=project_path, indexer=indexer, snippet_cache=snippet_cache)
+
+    def validate_output(self, item: CodeItem, output) -> List[str]:
+        """
+        Checks that a generated docstring documents the item's arguments, return value and raised exceptions.
+        
+        Args:
+          item (CodeItem): The code item the docstring was generated for.
+          output (DocstringOutput): The generated docstring output.
+        
+        Returns:
+          List[str]: The problems found; an empty list means the docstring is accepted.
+        """
+        candidate = copy.copy(item)
+        candidate.docstring = output.docstring
+        return docstring_issues(candidate)
@@ -1,29 +1,36 @@
 from pathlib import Path
 import asyncio
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from src.core_base.executor.executor import execute_in_path
-from src.docstring_core.docstring_generator import generate_docstring_from_path_dict
+from src.docstring_core.docstring_generator import stream_docstring_from_path
 from src.docstring_core.docstring_writer import write_docstrings
+from src.core_base.indexer.project_indexer import ProjectIndexer
 
-async def _docstring_writer_wrapper(file_path: Path, items: List[dict], **_):
+async def _docstring_writer_wrapper(file_path: Path, items: List[dict], indexer: Optional[ProjectIndexer] = None, **_) -> bool:
     """
     Wrapper function to write docstrings asynchronously to a specified file.
     
     Args:
       file_path (Path): The path to the Python file where docstrings will be written.
       items (List[dict]): A list of dictionaries containing docstring information to be written.
+      indexer (Optional[ProjectIndexer]): Project index refreshed after the file changes.
     
     Returns:
-      None
+      bool: True if the file changed, False if its docstrings were already up to date.
     """
-    await write_docstrings(file_path, items)
+    return await write_docstrings(file_path, items, indexer=indexer)
 
 def execute_docstring_in_path(
     path: str,
     model_name: str = "gpt-4o-mini",
     target_names: Optional[List[str]] = None,
-    project_path: Optional[str] = None
+    project_path: Optional[str] = None,
+    force: bool = False,
+    cascade: Optional[List[str]] = None,
+    resume: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_output: Optional[str] = None,
 ):
     """
     Executes the generation and writing of docstrings in a specified path.
@@ -35,6 +42,11 @@ def execute_docstring_in_path(
       model_name (str, optional): The name of the model to use for generation. Defaults to 'gpt-4o-mini'.
       target_names (Optional[List[str]], optional): Specific targets for which docstrings should be generated. Defaults to None.
       project_path (Optional[str], optional): Optional path to the project. Defaults to None.
+      force (bool, optional): Regenerate docstrings that are already adequate. Defaults to False.
+      cascade (Optional[List[str]], optional): A model ladder (cheapest first) used instead of `model_name`. Defaults to None.
+      resume (bool, optional): Continue the previous interrupted run from its journal. Defaults to False.
+      shard (Optional[Tuple[int, int]], optional): Only process shard i of n and write its results to a JSONL file. Defaults to None.
+      shard_output (Optional[str], optional): The shard results file. Defaults to `.code_index/shards/<kind>-<i>-of-<n>.jsonl`.
     
     Returns:
       None
@@ -42,11 +54,15 @@ def execute_docstring_in_path(
     asyncio.run(
         execute_in_path(
             path=path,
-            generate_func=generate_docstring_from_path_dict,
+            stream_func=stream_docstring_from_path,
             write_func=_docstring_writer_wrapper,
             model_name=model_name,
             item_name="docstrings",
             target_names=target_names,
-            project_path=project_path
+            project_path=project_path,
+            generate_kwargs={"force": force, "cascade": cascade},
+            resume=resume,
+            shard=shard,
+            shard_output=shard_output
         )
     )
\ No newline at end of file
@@ -1,38 +1,119 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Set, Tuple
 from pathlib import Path
 from src.core_base.generate.generator_manager import BaseGenerationManager
+from src.core_base.code.code_model import CodeItem
+from src.core_base.indexer.project_indexer import ProjectIndexer
 from src.docstring_core.docstring_agent import DocstringAgent
+from src.docstring_core.docstring_quality import docstring_issues
 
 class DocstringGenerationManager(BaseGenerationManager):
     """
     Manager for generating docstrings using the specified agent.
     
     This class extends the BaseGenerationManager and is responsible for setting up the agent used for docstring generation.
+    Items whose existing docstrings already match their signature are skipped unless `force` is set.
     
     Attributes:
       agent_class (Type[DocstringAgent]): The class of the agent used for generation.
     """
     agent_class = DocstringAgent
 
-    def __init__(self, model_name: str = "gpt-4o-mini", project_path: Optional[Path] = None):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        project_path: Optional[Path] = None,
+        force: bool = False,
+        cascade: Optional[List[str]] = None,
+        indexer: Optional[ProjectIndexer] = None,
+        snippet_cache: Optional[dict] = None,
+    ):
         """
         Initializes the DocstringGenerationManager with the specified model name and project path.
         
         Args:
           model_name (str): The name of the model to use, default is 'gpt-4o-mini'.
           project_path (Optional[Path]): The path to the project, if provided.
+          force (bool): Regenerate every docstring, even the ones that are already adequate. Defaults to False.
+          cascade (Optional[List[str]]): A model ladder (cheapest first) used instead of `model_name`.
+          indexer (Optional[ProjectIndexer]): A loaded project index shared with the rest of the run, built if None.
+          snippet_cache (Optional[dict]): Rendered context snippets shared with other managers, a new cache if None.
         """
-        super().__init__(model_name=model_name, project_path=project_path)
+        super().__init__(
+            model_name=model_name,
+            project_path=project_path,
+            cascade=cascade,
+            indexer=indexer,
+            snippet_cache=snippet_cache,
+        )
+        self.force = force
+        self.coalescer.read_cache = not force  # Forced runs ask for fresh docstrings
+
+    def _select_items(self, items: List[CodeItem]) -> List[CodeItem]:
+        """
+        Keep only the items whose docstrings are missing or out of date with their signature.
+
+        Args:
+          items (List[CodeItem]): The items extracted from a file.
+
+        Returns:
+          List[CodeItem]: The items that need a new docstring (all of them when `force` is set).
+        """
+        if self.force:
+            return items
+
+        selected = [item for item in items if docstring_issues(item)]
+        skipped = len(items) - len(selected)
+        if skipped:
+            print(f"[INFO] Skipping {skipped} item(s) with adequate docstrings in {items[0].file_path}")
+        return selected
 
 
 # -----------------------------
-# Wrapper function (CLI/Gradio)
+# Wrapper functions (CLI/Gradio)
 # -----------------------------
+async def stream_docstring_from_path(
+    path: str,
+    model_name: str = "gpt-4o-mini",
+    target_names: Optional[List[str]] = None,
+    project_path: Optional[str] = None,
+    force: bool = False,
+    cascade: Optional[List[str]] = None,
+    skip_files: Optional[Set[str]] = None,
+    shard: Optional[Tuple[int, int]] = None
+) -> AsyncIterator[Tuple[str, List[dict], Optional[str]]]:
+    """
+    Generates docstrings file by file, yielding each file's results as soon as they are ready.
+    
+    Args:
+      path (str): The file or folder path to generate docstrings for.
+      model_name (str): The name of the model to use, default is 'gpt-4o-mini'.
+      target_names (Optional[List[str]]): A list of target names for which docstrings should be generated.
+      project_path (Optional[str]): An optional project path to use for the generation.
+      force (bool): Regenerate docstrings that are already adequate. Defaults to False.
+      cascade (Optional[List[str]]): A model ladder (cheapest first) used instead of `model_name`.
+      skip_files (Optional[Set[str]]): Resolved paths of files not to process.
+      shard (Optional[Tuple[int, int]]): Only process shard i of n (1-based) of the discovered files.
+    
+    Yields:
+      Tuple[str, List[dict], Optional[str]]: A file path, the generated docstrings of its items and the hash of its source.
+    """
+    project_path_obj = Path(project_path) if project_path else None
+    manager = DocstringGenerationManager(
+        model_name=model_name, project_path=project_path_obj, force=force, cascade=cascade
+    )
+    async for file_path, results, source_hash in manager.iter_path(
+        path, target_names=target_names, skip_files=skip_files, shard=shard
+    ):
+        yield file_path, results, source_hash
+
+
 async def generate_docstring_from_path_dict(
     path: str,
     model_name: str = "gpt-4o-mini",
     target_names: Optional[List[str]] = None,
-    project_path: Optional[str] = None
+    project_path: Optional[str] = None,
+    force: bool = False,
+    cascade: Optional[List[str]] = None
 ) -> List[dict]:
     """
     Generates docstrings from a given path dictionary asynchronously.
@@ -42,10 +123,15 @@ async def generate_docstring_from_path_dict(
       model_name (str): The name of the model to use, default is 'gpt-4o-mini'.
       target_names (Optional[List[str]]): A list of target names for which docstrings should be generated.
       project_path (Optional[str]): An optional project path to use for the generation.
+      force (bool): Regenerate docstrings that are already adequate. Defaults to False.
+      cascade (Optional[List[str]]): A model ladder (cheapest first) used instead of `model_name`.
     
     Returns:
       List[dict]: A list of dictionaries containing the generated docstrings.
     """
-    project_path_obj = Path(project_path) if project_path else None
-    manager = DocstringGenerationManager(model_name=model_name, project_path=project_path_obj)
-    return await manager.generate_for_path(path, target_names=target_names)
\ No newline at end of file
+    results: List[dict] = []
+    async for _, file_results, _ in stream_docstring_from_path(
+        path, model_name, target_names, project_path, force=force, cascade=cascade
+    ):
+        results.extend(file_results)
+    return results
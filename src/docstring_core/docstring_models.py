@@ -5,16 +5,14 @@ class DocstringOutput(BaseModel):
     """
     A model representing the output from the LLM for Python functions and classes.
     
-    This model includes the name of the function or class, the suggested docstring text, and the path to the file for unique identification.
+    This model only carries the short run-local ID of the target item (as labelled in the prompt) and the suggested docstring, so the model does not echo names or file paths.
     
     Attributes:
-      name (str): The name of the function or class.
+      id (str): The short ID of the function or class, e.g. 'i3'.
       docstring (str): The suggested docstring text for the function or class.
-      file_path (str): The path of the file containing the function or class.
     """
-    name: str
+    id: str
     docstring: str
-    file_path: str
 
 class DocstringOutputList(BaseModel):
   items: List[DocstringOutput]
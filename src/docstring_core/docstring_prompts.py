@@ -11,8 +11,7 @@ Return a **JSON object** matching this Pydantic model:
 {
   "items": [
     {
-      "name": "string",        # function or class name
-      "file_path": "string",   # path to the file
+      "id": "string",          # item ID from the prompt header, e.g. "i3"
       "docstring": "string"    # improved or generated docstring
     }
   ]
@@ -30,9 +29,9 @@ PROMPT_TEMPLATE_DOCSTRINGS = """
 Analyze the following Python functions and classes.
 Generate improved docstrings only for those that need changes.
 
+Each target is labelled "# [<id>] <type> <name>".
 Each output should be a JSON object matching the pydantic object:
-- "name": the function or class name
-- "file_path": the path to the file containing the item
+- "id": the ID of the item (e.g. "i3")
 - "docstring": the suggested docstring text
 
 Items:
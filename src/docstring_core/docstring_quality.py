@@ -0,0 +1,175 @@
+import ast
+import re
+import textwrap
+from typing import Dict, List, Set
+
+from src.core_base.code.code_model import CodeItem
+
+# Google-style section headers ("Args:") and numpy-style headers (underlined with dashes)
+_SECTION_ALIASES = {
+    "args": "params", "arguments": "params", "parameters": "params", "params": "params",
+    "keyword args": "params", "keyword arguments": "params", "kwargs": "params", "other parameters": "params",
+    "returns": "returns", "return": "returns", "yields": "returns", "yield": "returns",
+    "raises": "raises", "raise": "raises", "exceptions": "raises", "except": "raises",
+}
+_GOOGLE_HEADER = re.compile(r"^\s*([A-Za-z ]+):\s*$")
+_NUMPY_UNDERLINE = re.compile(r"^\s*-{3,}\s*$")
+_ENTRY_NAME = re.compile(r"^\s*\**(\w+)")
+_REST_PARAM = re.compile(r":(?:param|parameter|arg|argument|key|keyword)\s+(?:[^:]*\s)?\**(\w+)\s*:")
+_REST_RETURNS = re.compile(r":(?:returns?|yields?|rtype)\s*:")
+_REST_RAISES = re.compile(r":raises?\s+([\w.]+)\s*:")
+_EXCEPTION_NAME = re.compile(r"[A-Za-z_][\w.]*")
+
+
+def _parse_sections(docstring: str) -> Dict[str, List[str]]:
+    """
+    Split a Google- or numpy-style docstring into its params/returns/raises sections.
+
+    Args:
+      docstring (str): The cleaned docstring text.
+
+    Returns:
+      Dict[str, List[str]]: The entry lines (first indentation level) of each recognized section.
+    """
+    lines = docstring.splitlines()
+    sections: Dict[str, List[str]] = {}
+    current, entry_indent = None, None
+
+    for i, line in enumerate(lines):
+        header = None
+        google = _GOOGLE_HEADER.match(line)
+        if google and google.group(1).strip().lower() in _SECTION_ALIASES:
+            header = google.group(1)
+        elif i + 1 < len(lines) and _NUMPY_UNDERLINE.match(lines[i + 1]) and line.strip().lower() in _SECTION_ALIASES:
+            header = line
+        if header is not None:
+            current, entry_indent = _SECTION_ALIASES[header.strip().lower()], None
+            sections.setdefault(current, [])
+            continue
+        if current is None or not line.strip() or _NUMPY_UNDERLINE.match(line):
+            continue
+
+        indent = len(line) - len(line.lstrip())
+        if entry_indent is None:
+            entry_indent = indent
+        if indent == entry_indent:
+            sections[current].append(line.strip())
+        elif indent < entry_indent:
+            current = None
+    return sections
+
+
+def _documented_raises(entries: List[str], docstring: str) -> Set[str]:
+    """
+    Return the exception names documented in the Raises entries and the reST `:raises X:` fields.
+
+    Only the text before an entry's colon names exceptions ('ValueError, KeyError: If ...');
+    dotted names are reduced to their last part, as raised names are.
+    """
+    names = [n for entry in entries for n in _EXCEPTION_NAME.findall(entry.split(":", 1)[0])]
+    names += _REST_RAISES.findall(docstring)
+    return {name.split(".")[-1] for name in names}
+
+
+def _walk_own(node: ast.AST):
+    """
+    Walk a function body without descending into nested functions, classes or lambdas.
+    """
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        yield child
+        if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            stack.extend(ast.iter_child_nodes(child))
+
+
+def _is_stub_body(node: ast.AST) -> bool:
+    """
+    Return True for abstract-looking bodies (pass, ..., or a single raise after the docstring).
+    """
+    body = node.body[1:] if ast.get_docstring(node) is not None else node.body
+    return len(body) <= 1 and all(
+        isinstance(stmt, (ast.Pass, ast.Raise))
+        or (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant) and stmt.value.value is Ellipsis)
+        for stmt in body
+    )
+
+
+def docstring_issues(item: CodeItem) -> List[str]:
+    """
+    Check an item's existing docstring against its signature, without calling any model.
+
+    Functions and methods must document every argument (and no argument they do not have),
+    their return value when they return or yield one, and the exceptions they raise. Classes
+    only need a docstring.
+
+    Args:
+      item (CodeItem): The code item to check.
+
+    Returns:
+      List[str]: The problems found; an empty list means the docstring is adequate.
+    """
+    docstring = (item.docstring or "").strip()
+    if not docstring:
+        return ["missing docstring"]
+    if item.type == "class":
+        return []
+
+    try:
+        node = ast.parse(textwrap.dedent(item.source)).body[0]
+    except (SyntaxError, IndexError):
+        return ["source could not be parsed"]
+    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return []
+
+    sections = _parse_sections(docstring)
+    issues: List[str] = []
+
+    # --- Arguments
+    args = node.args
+    params = [a.arg for a in args.posonlyargs + args.args + args.kwonlyargs]
+    params += [a.arg for a in (args.vararg, args.kwarg) if a]
+    params = [p for p in params if p not in ("self", "cls") and not p.startswith("_")]
+    documented: Set[str] = {
+        m.group(1) for entry in sections.get("params", []) if (m := _ENTRY_NAME.match(entry))
+    } | set(_REST_PARAM.findall(docstring))
+
+    undocumented = [p for p in params if p not in documented]
+    stale = sorted(documented - set(params))
+    if undocumented:
+        issues.append(f"undocumented params: {', '.join(undocumented)}")
+    if stale:
+        issues.append(f"documents unknown params: {', '.join(stale)}")
+
+    # --- Return value
+    own_nodes = list(_walk_own(node))
+    returns_value = any(
+        isinstance(n, ast.Return) and n.value is not None
+        and not (isinstance(n.value, ast.Constant) and n.value.value is None)
+        for n in own_nodes
+    ) or any(isinstance(n, (ast.Yield, ast.YieldFrom)) for n in own_nodes)
+    annotated = node.returns is not None and not (
+        isinstance(node.returns, ast.Constant) and node.returns.value is None
+    )
+    # "Returns: None" is how procedures are documented in this style, not a return value
+    return_entries = [e for e in sections.get("returns", []) if not e.lower().startswith("none")]
+    documents_return = bool(return_entries) or bool(_REST_RETURNS.search(docstring))
+
+    if (returns_value or (annotated and not _is_stub_body(node))) and not documents_return:
+        issues.append("undocumented return value")
+    elif documents_return and not returns_value and not annotated and not _is_stub_body(node):
+        issues.append("documents a return value but returns nothing")
+
+    # --- Raised exceptions
+    raised = set()
+    for n in own_nodes:
+        if isinstance(n, ast.Raise) and n.exc is not None:
+            exc = n.exc.func if isinstance(n.exc, ast.Call) else n.exc
+            name = ast.unparse(exc).split(".")[-1]
+            if name[:1].isupper() and name != "NotImplementedError":
+                raised.add(name)
+    missing_raises = sorted(raised - _documented_raises(sections.get("raises", []), docstring))
+    if missing_raises:
+        issues.append(f"undocumented raises: {', '.join(missing_raises)}")
+
+    return issues
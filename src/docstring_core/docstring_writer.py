@@ -1,60 +1,155 @@
 import ast
+import inspect
+import re
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from src.core_base.code.file_io import atomic_write_text, read_text, run_io
+from src.core_base.indexer.project_indexer import ProjectIndexer
 
-async def write_docstrings(file_path: Path, items: List[Dict]):
+_NEWLINE = re.compile(r"\r\n|\r|\n")
+
+def _iter_definitions(nodes: List[ast.AST], prefix: str = ""):
     """
-    Update multiple docstrings in a Python file based on provided dictionary entries.
+    Yield (qualified name, node) for every function, method and class, including nested ones.
+    
+    Args:
+      nodes (List[ast.AST]): The statements to scan (e.g. a module or class body).
+      prefix (str, optional): The qualified name of the enclosing definition followed by a dot.
+    
+    Yields:
+      Tuple[str, ast.AST]: The qualified name (e.g. 'Class.method') and its node.
+    """
+    for node in nodes:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            qualname = f"{prefix}{node.name}"
+            yield qualname, node
+            yield from _iter_definitions(node.body, f"{qualname}.")
+
+
+def _line_starts(text: str) -> List[int]:
+    """
+    Return the character offset where each line starts (index 0 is line 1), using Python's line breaks.
+    """
+    return [0] + [m.end() for m in _NEWLINE.finditer(text)]
+
+
+def _offset(text: str, line_starts: List[int], lineno: int, col_offset: int) -> int:
+    """
+    Convert an AST position (1-based line, UTF-8 byte column) to a character offset in `text`.
+    """
+    start = line_starts[lineno - 1]
+    line = text[start:start + col_offset]  # A byte column is never shorter in characters
+    return start + len(line.encode("utf-8")[:col_offset].decode("utf-8", errors="ignore"))
+
+
+def _docstring_literal(docstring: str, indent: str, newline: str) -> str:
+    """
+    Render a docstring as a triple-quoted block whose lines are indented with `indent`.
+    """
+    doc_lines = docstring.strip().replace('"""', '\\"\\"\\"').split("\n")
+    body = newline.join((indent + line).rstrip() for line in doc_lines)
+    return f'"""{newline}{body}{newline}{indent}"""'
+
+
+def apply_docstrings(source: str, items: List[Dict]) -> str:
+    """
+    Return `source` with the docstrings of the given items replaced or inserted.
     
-    This function handles functions, methods, and classes, including nested ones.
+    The source is parsed once, every edit is computed as a (start, end) character span, and the
+    new text is built in a single join, so the cost is linear in the file size whatever the number
+    of edits. Text outside the edited spans (line endings, trailing newline, code sharing a line
+    with a docstring) is preserved. A docstring whose cleaned text already matches is not
+    edited, whatever its layout.
     
     Args:
-      file_path (Path): The path to the Python file whose docstrings need to be updated.
-      items (List[Dict]): A list of dictionaries containing 'name' and 'docstring' keys for the items to update.
+      source (str): The Python source code.
+      items (List[Dict]): Dictionaries with 'qualname' (or 'name') and 'docstring' keys.
     
     Returns:
-      None: This function does not return a value, but modifies the specified file in place.
-    """
-    lines = file_path.read_text(encoding="utf-8").splitlines()
-    text = "\n".join(lines)
-    tree = ast.parse(text)
-
-    items_map = {item["name"]: item for item in items}
-
-    # Order by descendent line to avoid errors
-    target_nodes = [
-        node for node in ast.walk(tree)
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
-        and node.name in items_map
-    ]
-    target_nodes.sort(key=lambda n: n.lineno, reverse=True)
-
-    for node in target_nodes:
-        item = items_map[node.name]
-        docstring = item["docstring"].strip()
-
-        # Correct indentation
-        if node.body:
-            first_body_node = node.body[0]
-            indent_level = getattr(first_body_node, "col_offset", node.col_offset + 4)
-        else:
-            indent_level = node.col_offset + 4
-            lines.insert(node.lineno, " " * indent_level + "pass")  # garantiza cuerpo
-
-        indent_str = " " * indent_level
-        doc_lines = docstring.split("\n")
-        new_doc_block = [indent_str + '"""'] + [indent_str + line for line in doc_lines] + [indent_str + '"""']
-
-        existing_doc = ast.get_docstring(node, clean=False)
-        if existing_doc:
-            # Replace existent docstring
-            doc_node = node.body[0]
-            start = doc_node.lineno - 1
-            end = getattr(getattr(doc_node, "value", None), "end_lineno", start + 1)
-            lines[start:end] = new_doc_block
+      str: The updated source code.
+    """
+    tree = ast.parse(source)
+    line_starts = _line_starts(source)
+    match = _NEWLINE.search(source)
+    newline = match.group(0) if match else "\n"
+
+    items_map = {item.get("qualname") or item["name"]: item for item in items}
+    edits: List[Tuple[int, int, str]] = []
+
+    for qualname, node in _iter_definitions(tree.body):
+        if qualname not in items_map:
+            continue
+        docstring = items_map[qualname]["docstring"]
+        if ast.get_docstring(node) == inspect.cleandoc(docstring):
+            continue  # Same text in another layout (e.g. one line): leave the file as it is
+        first = node.body[0]
+        start = _offset(source, line_starts, first.lineno, first.col_offset)
+        line_start = line_starts[first.lineno - 1]
+        own_line = not source[line_start:start].strip()
+
+        # Body on its own lines: reuse its indentation; inline body (def f(): ...): one level deeper
+        indent = source[line_start:start] if own_line else " " * (node.col_offset + 4)
+        literal = _docstring_literal(docstring, indent, newline)
+
+        if ast.get_docstring(node, clean=False) is not None:
+            # Replace the existing string literal only
+            end = _offset(source, line_starts, first.end_lineno, first.end_col_offset)
+            edits.append((start, end, literal))
+        elif own_line:
+            # Insert a new docstring line block before the first statement
+            edits.append((line_start, line_start, indent + literal + newline))
         else:
-            # Insert new doscsting after definition
-            insert_idx = node.body[0].lineno - 1 if node.body else node.lineno
-            lines[insert_idx:insert_idx] = new_doc_block
+            # Move the inline body to the next line, after the new docstring
+            header_end = line_start + len(source[line_start:start].rstrip())
+            edits.append((header_end, start, newline + indent + literal + newline + indent))
+
+    edits.sort()
+    pieces, cursor = [], 0
+    for start, end, text in edits:
+        pieces.append(source[cursor:start])
+        pieces.append(text)
+        cursor = end
+    pieces.append(source[cursor:])
+    return "".join(pieces)
+
+
+def rewrite_docstrings(file_path: Path, items: List[Dict], indexer: Optional[ProjectIndexer] = None) -> bool:
+    """
+    Blocking part of write_docstrings: read, parse, edit and atomically write one file.
+    
+    Args:
+      file_path (Path): The path to the Python file whose docstrings need to be updated.
+      items (List[Dict]): Dictionaries with 'qualname' (or 'name') and 'docstring' keys.
+      indexer (Optional[ProjectIndexer]): Project index to refresh after a real edit.
+    
+    Returns:
+      bool: True if the file changed, False if every docstring was already up to date.
+    """
+    source = read_text(file_path)
+    updated = apply_docstrings(source, items)
+    if updated == source:
+        return False
+    atomic_write_text(file_path, updated)
+    if indexer is not None:
+        indexer.refresh_file(file_path)
+    return True
+
 
-    file_path.write_text("\n".join(lines), encoding="utf-8")
\ No newline at end of file
+async def write_docstrings(file_path: Path, items: List[Dict], indexer: Optional[ProjectIndexer] = None) -> bool:
+    """
+    Update multiple docstrings in a Python file based on provided dictionary entries.
+    
+    This function handles functions, methods, and classes, including nested ones. The file is
+    read, parsed and written once, whatever the number of items (see apply_docstrings). That
+    work runs in the I/O thread pool, and the file is replaced atomically. A file whose
+    docstrings are already up to date is left untouched (same mtime and hash).
+    
+    Args:
+      file_path (Path): The path to the Python file whose docstrings need to be updated.
+      items (List[Dict]): A list of dictionaries containing 'qualname' (or 'name') and 'docstring' keys for the items to update.
+      indexer (Optional[ProjectIndexer]): Project index updated in place after the file changes, so the next run does not re-extract it.
+    
+    Returns:
+      bool: True if the file was rewritten, False if nothing changed.
+    """
+    return await run_io(rewrite_docstrings, Path(file_path), items, indexer)
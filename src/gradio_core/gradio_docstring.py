@@ -6,7 +6,7 @@ from src.docstring_core.docstring_writer import write_docstrings
 # Docstring Generation Core
 # ============================================================
 
-async def gradio_scan_and_generate(folder_path, model, names="", project_path=None):
+async def gradio_scan_and_generate(folder_path, model, names="", project_path=None, force=False):
     """
     Scan a folder and generate docstrings for the files found within.
     
@@ -15,6 +15,7 @@ async def gradio_scan_and_generate(folder_path, model, names="", project_path=No
       model (str): The model name to use for generating docstrings.
       names (str, optional): Comma-separated string of names to filter generated docstrings. Defaults to an empty string.
       project_path (str, optional): The path to the project directory. If None, defaults to the current path.
+      force (bool, optional): Regenerate docstrings that are already adequate. Defaults to False.
     
     Returns:
       tuple: A tuple containing the original docstring, generated docstring, source path, index, results list, and a status message.
@@ -26,6 +27,7 @@ async def gradio_scan_and_generate(folder_path, model, names="", project_path=No
         model_name=model,
         target_names=target_names,
         project_path=project_path,
+        force=force,
     )
 
     if not results:
@@ -58,10 +60,30 @@ async def async_write_docstrings(file_path: Path, items: list[dict]):
     """
     await write_docstrings(file_path, items)
 
+async def _flush_accepted(results: list[dict], file_path: str):
+    """
+    Write every accepted, not yet written docstring of one file in a single pass.
+    
+    Args:
+      results (list[dict]): The review results; accepted items are flagged with 'accepted'.
+      file_path (str): The file whose accepted items should be written.
+    
+    Returns:
+      None
+    """
+    pending = [r for r in results if r["file_path"] == file_path and r.get("accepted") and not r.get("written")]
+    if not pending:
+        return
+    await async_write_docstrings(Path(file_path), pending)
+    for r in pending:
+        r["written"] = True
+
 async def next_item(action: str, edited_text: str, results: list[dict], index: int):
     """
     Handle Accept or Skip actions and navigate to the next item in the results list.
     
+    Accepted items are buffered and each file is written once, when the review moves past its last item.
+    
     Args:
       action (str): The action to take, either 'Accept' or 'Skip'.
       edited_text (str): The edited text for the current item, unused in this function.
@@ -74,11 +96,13 @@ async def next_item(action: str, edited_text: str, results: list[dict], index: i
     if not results or index >= len(results):
         return "", "", "", index, results, "❌ No items to process."
 
+    current = results[index]
     if action == "Accept":
-        item = results[index]
-        await async_write_docstrings(Path(item["file_path"]), [item])
+        current["accepted"] = True
 
     next_index = index + 1
+    if not any(r["file_path"] == current["file_path"] for r in results[next_index:]):
+        await _flush_accepted(results, current["file_path"])
     if next_index >= len(results):
         return "", "", "", next_index, results, "✅ All items processed!"
 
@@ -102,6 +126,8 @@ async def accept_all(_, results: list[dict], index: int):
     """
     Accept all remaining docstrings in the results list starting from the current index.
     
+    Each file is written once, together with the items accepted earlier in the review.
+    
     Args:
       _ (str): An unused parameter.
       results (list[dict]): A list of dictionaries containing items with their respective data.
@@ -113,8 +139,10 @@ async def accept_all(_, results: list[dict], index: int):
     if not results or index >= len(results):
         return "", "", "", index, results, "❌ No items to process."
 
-    for i in range(index, len(results)):
-        item = results[i]
-        await async_write_docstrings(Path(item["file_path"]), [item])
+    for item in results[index:]:
+        item["accepted"] = True
+
+    for file_path in dict.fromkeys(r["file_path"] for r in results):
+        await _flush_accepted(results, file_path)
 
     return "", "", "", len(results), results, "✅ All items accepted!"
\ No newline at end of file
@@ -0,0 +1,212 @@
+import ast
+import sqlite3
+import textwrap
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from constants import COVERAGE_THRESHOLD
+from src.core_base.code.code_model import CodeItem
+
+_NO_COVER = "pragma: no cover"
+
+
+def numbits_to_lines(numbits: bytes) -> Set[int]:
+    """
+    Decode a coverage.py "numbits" blob: bit `i` of byte `j` set means line `j * 8 + i` ran.
+
+    Args:
+      numbits (bytes): The blob stored in the `line_bits` table.
+
+    Returns:
+      Set[int]: The executed line numbers.
+    """
+    return {
+        byte_index * 8 + bit
+        for byte_index, byte in enumerate(numbits)
+        if byte
+        for bit in range(8)
+        if byte & (1 << bit)
+    }
+
+
+def load_line_coverage(data_file: Path, project_path: Optional[Path] = None) -> Dict[str, Set[int]]:
+    """
+    Read the executed lines of every measured file from a coverage.py data file (SQLite).
+
+    Line data (`line_bits`) and branch data (`arc`) are both supported; all contexts are merged.
+    Relative paths (`relative_files = true`) are resolved against `project_path`.
+
+    Args:
+      data_file (Path): The `.coverage` database.
+      project_path (Optional[Path]): The project root, for relative paths.
+
+    Returns:
+      Dict[str, Set[int]]: The executed lines, keyed by resolved file path.
+
+    Raises:
+      ValueError: If the file is not a coverage.py database.
+    """
+    base = Path(project_path or Path(data_file).parent).resolve()
+    try:
+        connection = sqlite3.connect(f"file:{Path(data_file).resolve()}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        raise ValueError(f"Cannot open coverage data {data_file}: {e}")
+
+    executed: Dict[str, Set[int]] = {}
+    try:
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "file" not in tables:
+            raise ValueError(f"{data_file} is not a coverage.py data file")
+        paths = {
+            file_id: str((Path(path) if Path(path).is_absolute() else base / path).resolve())
+            for file_id, path in connection.execute("SELECT id, path FROM file")
+        }
+        if "line_bits" in tables:
+            for file_id, numbits in connection.execute("SELECT file_id, numbits FROM line_bits"):
+                executed.setdefault(paths[file_id], set()).update(numbits_to_lines(numbits))
+        if "arc" in tables:
+            for file_id, from_line, to_line in connection.execute("SELECT file_id, fromno, tono FROM arc"):
+                lines = executed.setdefault(paths[file_id], set())
+                lines.update(n for n in (from_line, to_line) if n > 0)
+    except sqlite3.Error as e:
+        raise ValueError(f"Cannot read coverage data {data_file}: {e}")
+    finally:
+        connection.close()
+    return executed
+
+
+def _is_docstring(statement: ast.stmt) -> bool:
+    """
+    Tell whether a statement is a string-literal expression (a docstring when it comes first).
+    """
+    return isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant) and isinstance(statement.value.value, str)
+
+
+def _collect(body: List[ast.stmt], source_lines: List[str], in_class: bool, lines: Set[int], definition: bool = False):
+    """
+    Add the lines of the statements of `body` that run when the code is called.
+
+    Class bodies run at import time, so inside them only method bodies are collected. The
+    docstring of a definition body and statements marked `# pragma: no cover` are skipped.
+    """
+    if definition and body and _is_docstring(body[0]):
+        body = body[1:]
+    for statement in body:
+        is_definition = isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        if in_class:
+            if is_definition:
+                _collect(statement.body, source_lines, isinstance(statement, ast.ClassDef), lines, definition=True)
+            continue
+        if _NO_COVER in source_lines[statement.lineno - 1]:
+            continue
+        lines.add(statement.lineno)
+        for name in ("body", "orelse", "finalbody"):
+            nested = getattr(statement, name, None)
+            if isinstance(nested, list):
+                _collect(nested, source_lines, False, lines, definition=is_definition and name == "body")
+        for block in getattr(statement, "handlers", []) + getattr(statement, "cases", []):
+            _collect(block.body, source_lines, False, lines)
+
+
+def statement_lines(item: CodeItem) -> Set[int]:
+    """
+    Return the file lines of the statements an item executes when called: a function's body
+    without its docstring, or the bodies of a class's methods. The `def`/`class` lines and
+    class-level statements are left out (they run at import time).
+
+    Args:
+      item (CodeItem): An item with `lineno` set.
+
+    Returns:
+      Set[int]: The statement lines (empty if the item cannot be parsed or has no position).
+    """
+    if not getattr(item, "lineno", None):
+        return set()
+    try:
+        node = ast.parse(textwrap.dedent(item.source)).body[0]
+    except (SyntaxError, IndexError):
+        return set()
+
+    lines: Set[int] = set()
+    _collect(node.body, item.source.splitlines(), isinstance(node, ast.ClassDef), lines, definition=True)
+    return {line + item.lineno - 1 for line in lines}
+
+
+@dataclass
+class ItemCoverage:
+    """
+    Coverage of one code item.
+
+    Attributes:
+      item (CodeItem): The item.
+      statements (Set[int]): Its statement lines.
+      missing (Set[int]): The statement lines that never ran.
+    """
+    item: CodeItem
+    statements: Set[int] = field(default_factory=set)
+    missing: Set[int] = field(default_factory=set)
+
+    @property
+    def ratio(self) -> float:
+        """
+        Returns:
+          float: The fraction of statements that ran (1.0 for items without statements).
+        """
+        if not self.statements:
+            return 1.0
+        return 1 - len(self.missing) / len(self.statements)
+
+
+class CoverageSelector:
+    """
+    Chooses the items worth generating tests for from a coverage.py data file.
+
+    Only items whose statement coverage is below `threshold` are kept, the least covered
+    (most missing lines) first. Files absent from the data were never imported by the tests,
+    so all their items count as uncovered.
+
+    Attributes:
+      threshold (float): Items at or above this coverage ratio are skipped.
+      executed (Dict[str, Set[int]]): The executed lines per resolved file path.
+    """
+
+    def __init__(self, data_file: Path, project_path: Optional[Path] = None, threshold: float = COVERAGE_THRESHOLD):
+        """
+        Loads the coverage data.
+
+        Args:
+          data_file (Path): The `.coverage` database.
+          project_path (Optional[Path]): The project root, for relative paths in the data.
+          threshold (float, optional): Coverage ratio (0-1) from which items are skipped, defaults to COVERAGE_THRESHOLD.
+        """
+        self.threshold = threshold
+        self.executed = load_line_coverage(Path(data_file), project_path)
+
+    def measure(self, item: CodeItem) -> ItemCoverage:
+        """
+        Returns the coverage of one item.
+        """
+        statements = statement_lines(item)
+        executed = self.executed.get(str(Path(item.file_path).resolve()), set())
+        return ItemCoverage(item, statements, statements - executed)
+
+    def select(self, items: Iterable[CodeItem]) -> List[ItemCoverage]:
+        """
+        Returns the items below the threshold, most uncovered lines first.
+
+        Args:
+          items (Iterable[CodeItem]): The candidate items.
+
+        Returns:
+          List[ItemCoverage]: The selected items with their coverage.
+        """
+        measured = [self.measure(item) for item in items]
+        below = [m for m in measured if m.ratio < self.threshold]
+        return sorted(below, key=lambda m: (-len(m.missing), m.ratio))
+
+    def missing_lines(self, items: Iterable[CodeItem]) -> int:
+        """
+        Returns the number of uncovered lines of the items below the threshold (used to order files).
+        """
+        return sum(len(m.missing) for m in self.select(items))
@@ -0,0 +1,243 @@
+import ast
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.core_base.code.json_utils import safe_json_loads
+from src.core_base.code.response_parser import strip_markdown_fences
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+_PREFIX_LINE = re.compile(r"^line (\d+):")  # validate_test_file diagnostics
+_FRAME_LINE = re.compile(r'File "([^"]+)", line (\d+)|([\w./\\-]+\.py):(\d+)(?=:)')  # traceback frames
+
+
+@dataclass
+class FixPatch:
+    """
+    A structured edit of a test file returned by the fixer agent.
+
+    Attributes:
+      imports (Optional[List[str]]): The new import block, replacing every top-level import; None keeps them.
+      replacements (Dict[str, str]): New source per top-level name (test, fixture, helper); unknown names are appended.
+    """
+    imports: Optional[List[str]] = None
+    replacements: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_response(cls, response: str) -> "FixPatch":
+        """
+        Decodes a fixer response: `{"imports": [...] | null, "replacements": [{"name": ..., "code": ...}]}`.
+
+        Raises:
+          ValueError: If the response is not a patch of that shape.
+        """
+        data = safe_json_loads(strip_markdown_fences(response or ""))
+        if not isinstance(data, dict):
+            raise ValueError("the fixer response is not a JSON patch object")
+
+        imports = data.get("imports")
+        if imports is not None and not (isinstance(imports, list) and all(isinstance(i, str) for i in imports)):
+            raise ValueError("'imports' must be a list of import statements or null")
+        replacements = {}
+        for entry in data.get("replacements") or []:
+            if not (isinstance(entry, dict) and isinstance(entry.get("name"), str) and isinstance(entry.get("code"), str)):
+                raise ValueError("each replacement needs a 'name' and a 'code'")
+            replacements[entry["name"]] = entry["code"]
+        return cls(imports, replacements)
+
+    @property
+    def empty(self) -> bool:
+        """
+        Returns:
+          bool: True if the patch changes nothing.
+        """
+        return self.imports is None and not self.replacements
+
+
+def _block_name(node: ast.stmt) -> Optional[str]:
+    """
+    Return the name a top-level statement is patched by: the definition name or the first assigned name.
+    """
+    if isinstance(node, _DEFINITIONS):
+        return node.name
+    targets = node.targets if isinstance(node, ast.Assign) else [getattr(node, "target", None)]
+    for target in targets:
+        if isinstance(target, ast.Name):
+            return target.id
+    return None
+
+
+def _blocks(tree: ast.Module) -> Dict[str, Tuple[int, int]]:
+    """
+    Return the 1-based first and last line of each named top-level block (decorators included).
+    """
+    blocks = {}
+    for node in tree.body:
+        name = _block_name(node)
+        if name is not None:
+            start = min([d.lineno for d in getattr(node, "decorator_list", [])] + [node.lineno])
+            blocks[name] = (start, node.end_lineno)
+    return blocks
+
+
+def _imports(tree: ast.Module) -> List[ast.stmt]:
+    """
+    Return the top-level import statements.
+    """
+    return [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def _same_file(reported: str, test_file: str) -> bool:
+    """
+    Tell whether a path from a traceback is the test file (tracebacks may use absolute or relative paths).
+    """
+    reported, test_file = Path(reported).as_posix(), Path(test_file).as_posix()
+    return reported == test_file or reported.endswith("/" + test_file) or test_file.endswith("/" + reported)
+
+
+def _diagnostic_lines(diagnostic: str, test_file: Optional[str]) -> List[int]:
+    """
+    Return the test file lines a diagnostic points at: the `line N:` prefix of the local validation,
+    or traceback frames of the test file itself (frames of other files are ignored).
+    """
+    match = _PREFIX_LINE.match(diagnostic)
+    if match:
+        return [int(match.group(1))]
+    if test_file is None:
+        return []
+    lines = []
+    for match in _FRAME_LINE.finditer(diagnostic):
+        path, line = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+        if _same_file(path, test_file):
+            lines.append(int(line))
+    return lines
+
+
+def failing_regions(code: str, diagnostics: List[str], test_file: Optional[str] = None) -> Optional[Set[str]]:
+    """
+    Map diagnostics to the top-level blocks they are about: blocks containing a reported line
+    of the test file, and blocks whose name a diagnostic mentions (pytest node ids, tracebacks).
+
+    Args:
+      code (str): The test file.
+      diagnostics (List[str]): Problems from the local validation or the sandbox run.
+      test_file (Optional[str]): The test file path, to recognise its own traceback frames.
+
+    Returns:
+      Optional[Set[str]]: The names of the failing blocks, or None when a diagnostic cannot be
+      located (the whole file is then sent to the fixer).
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    blocks = _blocks(tree)
+    import_lines = {line for node in _imports(tree) for line in range(node.lineno, node.end_lineno + 1)}
+
+    regions: Set[str] = set()
+    for diagnostic in diagnostics:
+        found = False
+        for line in _diagnostic_lines(diagnostic, test_file):
+            if line in import_lines:
+                found = True  # The import block is always part of the patch
+            for name, (start, end) in blocks.items():
+                if start <= line <= end:
+                    regions.add(name)
+                    found = True
+        mentioned = {name for name in blocks if re.search(rf"(?<!\w){re.escape(name)}\b", diagnostic)}
+        regions |= mentioned
+        # Undefined names and bad imports are fixed in the import block
+        if not (found or mentioned) and not re.search(r"undefined name|import|module", diagnostic, re.IGNORECASE):
+            return None
+    return regions
+
+
+def render_regions(code: str, regions: Set[str]) -> str:
+    """
+    Return the part of a test file the fixer needs: the import block and the failing blocks.
+    """
+    tree = ast.parse(code)
+    lines = code.splitlines()
+    parts = ["\n".join(lines[node.lineno - 1:node.end_lineno]) for node in _imports(tree)]
+    chunks = ["\n".join(parts)] if parts else []
+    for name, (start, end) in _blocks(tree).items():
+        if name in regions:
+            chunks.append("\n".join(lines[start - 1:end]))
+    return "\n\n\n".join(chunks)
+
+
+def other_blocks(code: str, regions: Set[str]) -> List[str]:
+    """
+    Return the names of the top-level blocks left out of the fixer prompt.
+    """
+    return [name for name in _blocks(ast.parse(code)) if name not in regions]
+
+
+def apply_patch(code: str, patch: FixPatch) -> str:
+    """
+    Apply a fixer patch to a test file: replace the import block and/or whole top-level blocks.
+
+    Args:
+      code (str): The test file.
+      patch (FixPatch): The edits.
+
+    Returns:
+      str: The patched file.
+
+    Raises:
+      ValueError: If an edit does not parse or the patched file does not parse.
+    """
+    tree = ast.parse(code)
+    lines = code.splitlines()
+    blocks = _blocks(tree)
+    edits: List[Tuple[int, int, List[str]]] = []  # (0-based start, 0-based end exclusive, new lines)
+    appended: List[str] = []
+
+    for name, source in patch.replacements.items():
+        source = source.strip("\n")
+        try:
+            ast.parse(source)
+        except SyntaxError as e:
+            raise ValueError(f"replacement of '{name}' does not parse: {e.msg}")
+        if name in blocks:
+            start, end = blocks[name]
+            edits.append((start - 1, end, source.splitlines()))
+        else:
+            appended.append(source)
+
+    if patch.imports is not None:
+        block = "\n".join(i.strip() for i in patch.imports if i.strip())
+        try:
+            nodes = ast.parse(block).body
+        except SyntaxError as e:
+            raise ValueError(f"the import block does not parse: {e.msg}")
+        if not all(isinstance(n, (ast.Import, ast.ImportFrom)) for n in nodes):
+            raise ValueError("the import block contains other statements")
+        old = _imports(tree)
+        if old:
+            # The new block replaces the first import; the others are removed with the blank lines before them
+            edits.append((old[0].lineno - 1, old[0].end_lineno, block.splitlines()))
+            for previous, node in zip(old, old[1:]):
+                start = node.lineno - 1
+                while start > previous.end_lineno and not lines[start - 1].strip():
+                    start -= 1
+                edits.append((start, node.end_lineno, []))
+        else:
+            edits.append((0, 0, block.splitlines() + [""]))
+
+    edits.sort(key=lambda e: (e[0], e[1]))
+    for (_, previous_end, _), (start, _, _) in zip(edits, edits[1:]):
+        if start < previous_end:
+            raise ValueError("the patch edits overlapping regions")
+    for start, end, new_lines in reversed(edits):
+        lines[start:end] = new_lines
+
+    patched = "\n".join(lines).rstrip() + "\n"
+    for source in appended:
+        patched += "\n\n" + source + "\n"
+    try:
+        ast.parse(patched)
+    except SyntaxError as e:
+        raise ValueError(f"the patched file does not parse: {e.msg} (line {e.lineno})")
+    return patched
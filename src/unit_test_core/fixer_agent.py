@@ -1,3 +1,4 @@
+from typing import List, Optional
 from src.core_base.agents.base_agents import BaseCodeAgent
 
 class UnitTestFixerAgent(BaseCodeAgent):
@@ -5,7 +6,13 @@ class UnitTestFixerAgent(BaseCodeAgent):
     Agent that takes generated pytest code and fixes any syntax errors, missing imports, or other issues, returning corrected, runnable code.
     """
 
-    async def fix_tests(self, test_code: str, project_path: str, original_path: str) -> str:
+    async def fix_tests(
+        self,
+        test_code: str,
+        project_path: str,
+        original_path: str,
+        diagnostics: Optional[List[str]] = None,
+    ) -> str:
         """
         Review and correct the generated pytest code.
         
@@ -15,10 +22,15 @@ class UnitTestFixerAgent(BaseCodeAgent):
           test_code (str): The generated pytest code to review/fix.
           project_path (str): The absolute path to the project, used for inferring correct import statements.
           original_path (str): The absolute path to the original test file, used for context.
+          diagnostics (Optional[List[str]]): Problems found by local static checks, to fix first.
         
         Returns:
           str: The corrected pytest code.
         """
+        problems = ""
+        if diagnostics:
+            problems = "Problems found by static checks (fix these first):\n" + "\n".join(f"- {d}" for d in diagnostics)
+
         prompt = f"""
                     You are an expert Python developer.
 
@@ -39,10 +51,72 @@ class UnitTestFixerAgent(BaseCodeAgent):
 
                     Test made for the file in the path: {original_path}
 
+                    {problems}
+
                     Pytest code to fix:
                     {test_code}
                     """
 
 
         fixed_code = await self.run(prompt)
-        return fixed_code
\ No newline at end of file
+        return fixed_code
+
+    async def fix_tests_patch(
+        self,
+        regions: str,
+        unchanged: List[str],
+        project_path: str,
+        original_path: str,
+        diagnostics: List[str],
+    ) -> str:
+        """
+        Ask for a structured patch of the failing parts of a test file instead of the whole file.
+        
+        Only the import block and the failing top-level blocks are sent; the answer is a JSON
+        patch (see `FixPatch`) that the writer applies locally, so output tokens scale with the
+        size of the fix rather than the size of the file.
+        
+        Args:
+          regions (str): The import block followed by the failing blocks.
+          unchanged (List[str]): The names of the other top-level blocks of the file (fixtures, helpers, tests).
+          project_path (str): The absolute path to the project, used for inferring correct import statements.
+          original_path (str): The absolute path to the source file the tests were made for.
+          diagnostics (List[str]): The problems to fix.
+        
+        Returns:
+          str: The raw patch response.
+        """
+        problems = "\n".join(f"- {d}" for d in diagnostics)
+        others = ", ".join(unchanged) or "none"
+
+        prompt = f"""
+                    You are an expert Python developer.
+
+                    The pytest file below has problems. Only its import block and the failing
+                    top-level blocks are shown. Fix the problems and answer with a JSON patch only:
+
+                    {{"imports": ["import x", "from y import z"] or null,
+                      "replacements": [{{"name": "<top-level function, class or variable name>", "code": "<its full new source>"}}]}}
+
+                    ⚠️ Important constraints:
+                    - "imports" replaces the whole import block; use null to keep it unchanged.
+                    - Each replacement replaces the whole block of that name; a new name is appended to the file.
+                    - Only include the blocks you change. Do NOT remove or rename any test functions.
+                    - Do NOT use sys.path manipulations or relative path hacks with `Path(__file__)`.
+                    - Imports must be runnable from the project root (DON'T include the project path in the imports).
+                    - No markdown, no explanations.
+
+                    Project path: {project_path}
+
+                    Test made for the file in the path: {original_path}
+
+                    Other blocks of the file (unchanged, available to the tests): {others}
+
+                    Problems to fix:
+                    {problems}
+
+                    Pytest code to patch:
+                    {regions}
+                    """
+
+        return await self.run(prompt)
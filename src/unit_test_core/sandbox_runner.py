@@ -0,0 +1,314 @@
+import asyncio
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from constants import TEST_TIMEOUT, TEST_WORKERS
+from src.core_base.code.file_io import atomic_write_text, run_io
+
+# Folders never copied into the scratch project
+_IGNORED = (".git", ".code_index", "__pycache__", ".venv", "venv", "node_modules", ".pytest_cache", ".mypy_cache")
+
+# Environment variables passed to the tests; everything else (API keys, tokens) is left out
+_ENV_ALLOWLIST = (
+    "PATH", "HOME", "USERPROFILE", "LANG", "LC_ALL", "LC_CTYPE", "TZ", "TMPDIR", "TEMP", "TMP",
+    "SYSTEMROOT", "SYSTEMDRIVE", "WINDIR", "COMSPEC", "PATHEXT", "VIRTUAL_ENV",
+)
+
+# Loaded by every sandboxed interpreter (via PYTHONPATH). Best-effort only: it patches Python
+# sockets, so C extensions and subprocesses started by the tests can still reach the network
+_NO_NETWORK = '''
+import socket
+
+
+def _blocked(*args, **kwargs):
+    raise OSError("network access is disabled while verifying generated tests")
+
+
+class _NoNetworkSocket(socket.socket):
+    def connect(self, *args, **kwargs):
+        _blocked()
+
+    def connect_ex(self, *args, **kwargs):
+        _blocked()
+
+    def sendto(self, *args, **kwargs):
+        _blocked()
+
+
+socket.socket = _NoNetworkSocket
+socket.create_connection = _blocked
+socket.getaddrinfo = _blocked
+'''
+
+
+@dataclass
+class FailedCase:
+    """
+    One failing test of a verified file.
+
+    Attributes:
+      name (str): The test (or the file, for collection errors and timeouts).
+      kind (str): 'failure', 'error' or 'timeout'.
+      message (str): The short failure message.
+      details (str): The end of the traceback.
+    """
+    name: str
+    kind: str
+    message: str
+    details: str = ""
+
+    def diagnostic(self) -> str:
+        """
+        Returns:
+          str: A one-line description, as passed to the fixer agent.
+        """
+        details = " | ".join(line.strip() for line in self.details.strip().splitlines()[-6:] if line.strip())
+        message = " ".join(self.message.split())
+        return f"{self.name} ({self.kind}): {message}" + (f" -- {details}" if details else "")
+
+
+@dataclass
+class FileVerification:
+    """
+    The outcome of running one test file in the sandbox.
+
+    Attributes:
+      test_file (str): The verified test file.
+      passed (int): Tests that passed.
+      skipped (int): Tests that were skipped.
+      failures (List[FailedCase]): Failing tests, collection errors or a timeout.
+      duration (float): Wall time of the run, in seconds.
+    """
+    test_file: str
+    passed: int = 0
+    skipped: int = 0
+    failures: List[FailedCase] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def total(self) -> int:
+        """
+        Returns:
+          int: The number of tests that ran (passed or failed).
+        """
+        return self.passed + len(self.failures)
+
+    @property
+    def pass_rate(self) -> float:
+        """
+        Returns:
+          float: The fraction of tests that passed (0.0 when nothing ran).
+        """
+        return self.passed / self.total if self.total else 0.0
+
+    @property
+    def ok(self) -> bool:
+        """
+        Returns:
+          bool: True if no test failed and at least one ran.
+        """
+        return not self.failures and self.passed > 0
+
+
+class SandboxRunner:
+    """
+    Runs generated test files with pytest in isolated subprocesses.
+
+    The project is copied once into a scratch folder, so tests cannot modify the real tree.
+    Each test file then runs in its own interpreter and process group inside that copy, with an
+    allowlisted environment (no API keys), Python sockets blocked, its own pytest temp folder and
+    a timeout that kills the whole group. At most `workers` files run at once.
+
+    Attributes:
+      project_path (Path): The project the tests belong to.
+      workers (int): Maximum number of pytest processes at the same time.
+      timeout (float): Seconds after which a test file run is killed.
+      results (Dict[str, FileVerification]): The latest result of each verified file.
+    """
+
+    def __init__(self, project_path: Path, workers: int = TEST_WORKERS, timeout: float = TEST_TIMEOUT):
+        """
+        Initializes the runner. The scratch copy is made on the first run.
+
+        Args:
+          project_path (Path): The project the tests belong to.
+          workers (int, optional): Maximum number of pytest processes at the same time, defaults to TEST_WORKERS.
+          timeout (float, optional): Per-file timeout in seconds, defaults to TEST_TIMEOUT.
+        """
+        self.project_path = Path(project_path).resolve()
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.results: Dict[str, FileVerification] = {}
+        self._slots = asyncio.Semaphore(self.workers)
+        self._prepare_lock = asyncio.Lock()
+        self._scratch: Optional[Path] = None
+
+    def _copy_project(self) -> Path:
+        """
+        Copies the project into a new scratch folder and installs the network blocker.
+
+        Returns:
+          Path: The scratch folder (project copy under `project/`, blocker under `sandbox/`).
+        """
+        scratch = Path(tempfile.mkdtemp(prefix="unit-test-verify-"))
+        shutil.copytree(self.project_path, scratch / "project", ignore=shutil.ignore_patterns(*_IGNORED), symlinks=True)
+        (scratch / "sandbox").mkdir()
+        (scratch / "sandbox" / "sitecustomize.py").write_text(_NO_NETWORK, encoding="utf-8")
+        return scratch
+
+    async def _prepare(self) -> Path:
+        """
+        Returns the scratch folder, creating it on first use.
+        """
+        async with self._prepare_lock:
+            if self._scratch is None:
+                self._scratch = await run_io(self._copy_project)
+        return self._scratch
+
+    def _relative(self, test_file: Path) -> Path:
+        """
+        Returns where a test file lives inside the project copy.
+
+        Relative paths (as returned by mirrored_test_path) are already relative to the project
+        root, whatever the current directory, so their package folders are kept.
+        """
+        test_file = Path(test_file)
+        if not test_file.is_absolute():
+            return test_file
+        try:
+            return test_file.resolve().relative_to(self.project_path)
+        except ValueError:
+            return Path("tests") / test_file.name
+
+    async def run(self, test_file: Path, code: Optional[str] = None) -> FileVerification:
+        """
+        Runs one test file in the sandbox.
+
+        Args:
+          test_file (Path): The test file (its current content is used unless `code` is given).
+          code (Optional[str]): The test file content to verify.
+
+        Returns:
+          FileVerification: Passed and failed tests, and the duration.
+        """
+        scratch = await self._prepare()
+        rel = self._relative(test_file)
+        if code is None:
+            code = Path(test_file).read_text(encoding="utf-8")
+
+        await run_io(atomic_write_text, scratch / "project" / rel, code)
+        run_dir = Path(tempfile.mkdtemp(prefix="run-", dir=scratch))
+        report = run_dir / "report.xml"
+
+        env = {
+            **{name: os.environ[name] for name in _ENV_ALLOWLIST if name in os.environ},
+            "PYTHONPATH": os.pathsep.join([str(scratch / "sandbox"), str(scratch / "project")]),
+            "PYTHONDONTWRITEBYTECODE": "1",
+            "NO_PROXY": "*",
+        }
+        command = [
+            sys.executable, "-m", "pytest", rel.as_posix(), "-q", "-p", "no:cacheprovider",
+            f"--junitxml={report}", f"--basetemp={run_dir / 'tmp'}",
+        ]
+
+        async with self._slots:
+            started = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=scratch / "project",
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,  # Own process group, so a timeout also kills what the tests started
+            )
+            try:
+                output, _ = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+                timed_out = False
+            except asyncio.TimeoutError:
+                self._kill(process)
+                output, _ = await process.communicate()
+                timed_out = True
+            duration = time.perf_counter() - started
+
+        result = FileVerification(test_file=str(test_file), duration=duration)
+        if timed_out:
+            result.failures.append(FailedCase(str(rel), "timeout", f"timed out after {self.timeout:g}s"))
+        elif report.exists():
+            self._read_report(report, result)
+        if not timed_out and process.returncode not in (0, 5) and not result.failures:
+            # pytest failed before writing any test outcome (usage or internal error)
+            text = output.decode("utf-8", errors="replace")
+            result.failures.append(FailedCase(str(rel), "error", f"pytest exited with code {process.returncode}", text[-2000:]))
+
+        shutil.rmtree(run_dir, ignore_errors=True)
+        self.results[str(test_file)] = result
+        return result
+
+    @staticmethod
+    def _kill(process: asyncio.subprocess.Process):
+        """
+        Kills a pytest process and every process of its group (POSIX), or the process alone.
+        """
+        if not hasattr(os, "killpg"):
+            process.kill()
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    def _read_report(report: Path, result: FileVerification):
+        """
+        Fills a result from a pytest JUnit XML report.
+        """
+        try:
+            root = ET.parse(report).getroot()
+        except ET.ParseError:
+            return
+        for case in root.iter("testcase"):
+            name = f"{case.get('classname', '')}::{case.get('name', '')}".strip(":")
+            problem = case.find("failure")
+            kind = "failure"
+            if problem is None:
+                problem, kind = case.find("error"), "error"
+            if problem is not None:
+                result.failures.append(
+                    FailedCase(name, kind, (problem.get("message") or "").strip()[:500], (problem.text or "")[-2000:])
+                )
+            elif case.find("skipped") is not None:
+                result.skipped += 1
+            else:
+                result.passed += 1
+
+    def summary(self) -> str:
+        """
+        Returns:
+          str: Per-file pass rates and durations of the latest runs.
+        """
+        lines = ["[INFO] Test verification:"]
+        for test_file, result in sorted(self.results.items()):
+            status = "✅" if result.ok else "❌"
+            skipped = f", {result.skipped} skipped" if result.skipped else ""
+            lines.append(
+                f"  {status} {test_file}: {result.passed}/{result.total} passed ({result.pass_rate:.0%}){skipped} in {result.duration:.2f}s"
+            )
+        passing = sum(r.ok for r in self.results.values())
+        lines.append(f"  files passing: {passing}/{len(self.results)}")
+        return "\n".join(lines)
+
+    def close(self):
+        """
+        Removes the scratch project copy.
+        """
+        if self._scratch is not None:
+            shutil.rmtree(self._scratch, ignore_errors=True)
+            self._scratch = None
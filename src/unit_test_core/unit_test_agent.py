@@ -1,7 +1,11 @@
 from src.unit_test_core.unit_test_models import UnitTestOutputList
 from src.unit_test_core.unit_test_prompts import SYSTEM_PROMPT_TESTS, PROMPT_TEMPLATE_TESTS
+from src.unit_test_core.unit_test_validation import validate_test_code
 from src.core_base.agents.base_agents import BaseCodeGenerationAgent
+from src.core_base.code.code_model import CodeItem
+from src.core_base.indexer.project_indexer import ProjectIndexer
 from pathlib import Path
+from typing import List, Optional
 
 class UnitTestAgent(BaseCodeGenerationAgent):
     """
@@ -16,12 +20,33 @@ class UnitTestAgent(BaseCodeGenerationAgent):
     PROMPT_TEMPLATE = PROMPT_TEMPLATE_TESTS
     OutputModel = UnitTestOutputList
 
-    def __init__(self, model_name: str, project_path: Path = None):
+    def __init__(
+        self,
+        model_name: str,
+        project_path: Path = None,
+        indexer: Optional[ProjectIndexer] = None,
+        snippet_cache: Optional[dict] = None,
+    ):
         """
         Initializes a UnitTestAgent instance.
         
         Args:
           model_name (str): The name of the model to be used for code generation.
           project_path (Path | None, optional): The path to the project where the generated tests will be stored. Defaults to None.
+          indexer (Optional[ProjectIndexer]): A loaded project index shared with the rest of the run. Defaults to None (built from `project_path`).
+          snippet_cache (Optional[dict]): Rendered context snippets shared with other agents. Defaults to None.
         """
-        super().__init__(model_name=model_name, project_path=project_path)
\ No newline at end of file
+        super().__init__(model_name=model_name, project_path=project_path, indexer=indexer, snippet_cache=snippet_cache)
+
+    def validate_output(self, item: CodeItem, output) -> List[str]:
+        """
+        Checks that the generated test code parses, defines a test and only imports existing modules.
+        
+        Args:
+          item (CodeItem): The code item the test was generated for.
+          output (UnitTestOutput): The generated unit test output.
+        
+        Returns:
+          List[str]: The problems found; an empty list means the test is accepted.
+        """
+        return validate_test_code(output.test_code, output.imports, self.project_path)
@@ -1,28 +1,49 @@
-from typing import Optional, List
+import functools
+from pathlib import Path
+from typing import Optional, List, Tuple
+from constants import COVERAGE_THRESHOLD, REVIEW_CONCURRENCY
 from src.core_base.executor.executor import execute_in_path
-from src.unit_test_core.unit_test_generator import generate_unit_test_from_path_dict
+from src.unit_test_core.unit_test_generator import stream_unit_test_from_path
 from src.unit_test_core.unit_test_writer import UnitTestWriterWithReview
+from src.unit_test_core.sandbox_runner import SandboxRunner
 
-async def _unit_test_writer_wrapper(results: List[dict], project_path: str, **kwargs):
+async def _unit_test_writer_wrapper(
+    file_path: Path,
+    items: List[dict],
+    project_path: str,
+    writer: Optional[UnitTestWriterWithReview] = None,
+    **kwargs,
+):
     """
-    Wrapper function that manages the writing of unit tests using the UnitTestWriterWithReview class.
+    Wrapper function that writes the unit tests of one source file using the UnitTestWriterWithReview class.
     
     Args:
-      results (List[dict]): The list of generated unit test dictionaries.
+      file_path (Path): The source file the tests were generated for.
+      items (List[dict]): The generated unit test dictionaries of that file.
       project_path (str): The path where the unit tests will be written.
-      **kwargs: Additional keyword arguments that may include model_name.
+      writer (Optional[UnitTestWriterWithReview]): The writer shared by the whole run (a new one if omitted).
+      **kwargs: Additional keyword arguments that may include model_name and indexer.
     
     Returns:
-      None
+      bool: True if a test file changed, False if it was already up to date.
     """
-    writer = UnitTestWriterWithReview(model_name=kwargs.get("model_name", "gpt-4o-mini"))
-    await writer.write_unit_tests(results, project_path=project_path)
+    writer = writer or UnitTestWriterWithReview(model_name=kwargs.get("model_name", "gpt-4o-mini"))
+    return bool(await writer.write_unit_tests(items, project_path=project_path, indexer=kwargs.get("indexer")))
 
 async def execute_unit_test_in_path(
     path: str,
     model_name: str = "gpt-4o-mini",
     project_path: str = "",
     target_names: Optional[List[str]] = None,
+    cascade: Optional[List[str]] = None,
+    force: bool = False,
+    coverage_file: Optional[str] = None,
+    coverage_threshold: float = COVERAGE_THRESHOLD,
+    resume: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_output: Optional[str] = None,
+    verify: bool = False,
+    fix_rounds: int = 0,
 ):
     """
     Executes unit test generation and writing in a specified path.
@@ -34,6 +55,15 @@ async def execute_unit_test_in_path(
       model_name (str, optional): The model name to use for generation. Defaults to 'gpt-4o-mini'.
       project_path (str): The base path for the project, which cannot be empty.
       target_names (Optional[List[str]], optional): Specific names of targets to generate tests for.
+      cascade (Optional[List[str]], optional): A model ladder (cheapest first) used instead of `model_name`.
+      force (bool, optional): Generate tests for items that already have tests in their test file. Defaults to False.
+      coverage_file (Optional[str], optional): A coverage.py data file; only items covered below `coverage_threshold` get tests. Defaults to None.
+      coverage_threshold (float, optional): Coverage ratio (0-1) from which items are skipped. Defaults to COVERAGE_THRESHOLD.
+      resume (bool, optional): Continue the previous interrupted run from its journal. Defaults to False.
+      shard (Optional[Tuple[int, int]], optional): Only process shard i of n and write its results to a JSONL file. Defaults to None.
+      shard_output (Optional[str], optional): The shard results file. Defaults to `.code_index/shards/<kind>-<i>-of-<n>.jsonl`.
+      verify (bool, optional): Run every test file in a sandbox before writing it and report pass rates. Defaults to False.
+      fix_rounds (int, optional): With `verify`, fixer rounds for test files with failing tests. Defaults to 0.
     
     Raises:
       ValueError: If the project_path is not provided.
@@ -43,12 +73,36 @@ async def execute_unit_test_in_path(
     """
     if not project_path:
         raise ValueError("Debes proporcionar `project_path` para generar tests.")
-    await execute_in_path(
-        path=path,
-        generate_func=generate_unit_test_from_path_dict,
-        write_func=_unit_test_writer_wrapper,
+    # One writer (and fixer agent) for the whole run; its semaphore bounds concurrent reviews
+    verifier = SandboxRunner(Path(project_path)) if verify and not shard else None
+    writer = UnitTestWriterWithReview(
         model_name=model_name,
-        item_name="unit tests",
-        target_names=target_names,
-        project_path=project_path,
-    )
\ No newline at end of file
+        review_concurrency=REVIEW_CONCURRENCY,
+        verifier=verifier,
+        fix_rounds=fix_rounds,
+    )
+    try:
+        await execute_in_path(
+            path=path,
+            stream_func=stream_unit_test_from_path,
+            write_func=functools.partial(_unit_test_writer_wrapper, writer=writer),
+            model_name=model_name,
+            item_name="unit tests",
+            target_names=target_names,
+            project_path=project_path,
+            generate_kwargs={
+                "cascade": cascade,
+                "force": force,
+                "coverage_file": coverage_file,
+                "coverage_threshold": coverage_threshold,
+            },
+            resume=resume,
+            shard=shard,
+            shard_output=shard_output,
+            write_concurrency=REVIEW_CONCURRENCY,
+        )
+    finally:
+        if verifier is not None:
+            if verifier.results:
+                print(verifier.summary())
+            verifier.close()
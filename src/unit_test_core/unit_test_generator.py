@@ -1,7 +1,14 @@
-from typing import List, Optional
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 from pathlib import Path
+from src.core_base.code.code_model import CodeItem
+from src.core_base.indexer.project_indexer import ProjectIndexer
+from src.core_base.generate.coalescing import module_name
 from src.core_base.generate.generator_manager import BaseGenerationManager
 from src.unit_test_core.unit_test_agent import UnitTestAgent
+from src.unit_test_core.unit_test_merge import covered_items, mirrored_test_path
+from src.unit_test_core.coverage_targets import CoverageSelector
+from constants import COVERAGE_THRESHOLD
 
 
 class UnitTestGenerationManager(BaseGenerationManager):
@@ -9,6 +16,9 @@ class UnitTestGenerationManager(BaseGenerationManager):
     Manager for generating unit tests from files or folders using a UnitTestAgent.
     
     This manager requires a project_path to mirror the structure of the source code inside the /tests directory.
+    Items that their mirrored test file already exercises are skipped unless `force` is set, so
+    refreshing tests after a small change only generates tests for what is new. With coverage
+    data, items are selected by measured coverage instead, least covered first.
     
     Attributes:
       agent_class (Type[UnitTestAgent]): The agent used for generating unit tests.
@@ -16,42 +26,149 @@ class UnitTestGenerationManager(BaseGenerationManager):
 
     agent_class = UnitTestAgent
 
-    def __init__(self, model_name: str = "gpt-4o-mini", project_path: Path = None):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        project_path: Path = None,
+        cascade: Optional[List[str]] = None,
+        force: bool = False,
+        coverage: Optional[CoverageSelector] = None,
+        indexer: Optional[ProjectIndexer] = None,
+        snippet_cache: Optional[dict] = None,
+    ):
         """
         Initializes the UnitTestGenerationManager with the specified model and project path.
         
         Args:
             model_name (str): The model to be used for code generation.
             project_path (Path): The root path of the project to index and mirror.
+            cascade (Optional[List[str]]): A model ladder (cheapest first) used instead of `model_name`.
+            force (bool): Generate tests for every item, even the ones that already have tests.
+            coverage (Optional[CoverageSelector]): Coverage data; only items below its threshold get tests.
+            indexer (Optional[ProjectIndexer]): A loaded project index shared with the rest of the run, built if None.
+            snippet_cache (Optional[dict]): Rendered context snippets shared with other managers, a new cache if None.
         
         Raises:
             ValueError: If project_path is None, a ValueError is raised.
         """
         if project_path is None:
             raise ValueError("❌ 'project_path' is required for UnitTestGenerationManager.")
-        super().__init__(model_name=model_name, project_path=project_path)
+        super().__init__(
+            model_name=model_name,
+            project_path=project_path,
+            cascade=cascade,
+            indexer=indexer,
+            snippet_cache=snippet_cache,
+        )
+        self.force = force
+        self.coverage = coverage
+        self.coalescer.read_cache = not force  # Forced runs ask for fresh tests
 
+    def _order_files(self, files: List[str]) -> List[str]:
+        """
+        With coverage data, processes the files with the most uncovered lines first.
+        
+        Args:
+            files (List[str]): The files to process.
+        
+        Returns:
+            List[str]: The files in processing order.
+        """
+        if self.force or self.coverage is None or self.indexer is None:
+            return files
 
+        by_file: Dict[str, List[CodeItem]] = {}
+        for item in self.indexer.all_items():
+            by_file.setdefault(str(Path(item.file_path).resolve()), []).append(item)
+        missing = {f: self.coverage.missing_lines(by_file.get(str(Path(f).resolve()), [])) for f in files}
+        return sorted(files, key=lambda f: -missing[f])
 
-async def generate_unit_test_from_path_dict(
+    def _select_items(self, items: List[CodeItem]) -> List[CodeItem]:
+        """
+        Keep only the items that have no matching test in their mirrored test file or, with
+        coverage data, the items covered below the threshold (least covered first).
+        
+        Args:
+            items (List[CodeItem]): The items extracted from a file.
+        
+        Returns:
+            List[CodeItem]: The items that need tests (all of them when `force` is set or there is no test file yet).
+        """
+        if self.force:
+            return items
+
+        if self.coverage is not None:
+            selected = self.coverage.select(items)
+            skipped = len(items) - len(selected)
+            if skipped:
+                print(
+                    f"[INFO] Skipping {skipped} item(s) covered at {self.coverage.threshold:.0%} or more in {items[0].file_path}"
+                )
+            return [m.item for m in selected]
+
+        covered = covered_items(items, mirrored_test_path(items[0].file_path, self.project_path))
+        if not covered:
+            return items
+        covered_ids = {id(item) for item in covered}
+        print(f"[INFO] Skipping {len(covered)} item(s) that already have tests in {items[0].file_path}")
+        return [item for item in items if id(item) not in covered_ids]
+
+    def _adapt_fields(self, fields: Dict[str, Any], source_module: str, item: CodeItem) -> Dict[str, Any]:
+        """
+        Points a test shared from an identical item in another module at the copy's own module.
+        
+        Args:
+            fields (Dict[str, Any]): The generated 'test_code' and 'imports' of the original item.
+            source_module (str): The dotted module of the original item.
+            item (CodeItem): The copy receiving the test.
+        
+        Returns:
+            Dict[str, Any]: The fields with imports (and patch targets) rewritten to the copy's module.
+        """
+        target_module = module_name(item.file_path, self.project_path)
+        if target_module == source_module:
+            return fields
+
+        pattern = re.compile(rf"(?<![\w.]){re.escape(source_module)}(?!\w)")
+        fields["test_code"] = pattern.sub(target_module, fields.get("test_code", ""))
+        fields["imports"] = [pattern.sub(target_module, imp) for imp in fields.get("imports", [])]
+        return fields
+
+
+
+async def stream_unit_test_from_path(
     path: str,
     model_name: str = "gpt-4o-mini",
     target_names: Optional[List[str]] = None,
-    project_path: Optional[str] = None
-) -> List[dict]:
+    project_path: Optional[str] = None,
+    cascade: Optional[List[str]] = None,
+    skip_files: Optional[Set[str]] = None,
+    shard: Optional[Tuple[int, int]] = None,
+    force: bool = False,
+    coverage_file: Optional[str] = None,
+    coverage_threshold: float = COVERAGE_THRESHOLD,
+) -> AsyncIterator[Tuple[str, List[dict], Optional[str]]]:
     """
-    Generates unit tests from a specified file or folder path.
-    
-    This function requires a valid project_path to correctly mirror the directory structure in the /tests directory.
+    Generates unit tests file by file, yielding each file's results as soon as they are ready.
     
     Args:
       path (str): The path to the file or folder from which to generate unit tests.
       model_name (str, optional): The name of the model to use for generation. Defaults to 'gpt-4o-mini'.
       target_names (Optional[List[str]], optional): A list of specific target names to generate tests for. Defaults to None.
       project_path (Optional[str], optional): The root path of the project to index and mirror. Defaults to None.
+      cascade (Optional[List[str]], optional): A model ladder (cheapest first) used instead of `model_name`.
+      skip_files (Optional[Set[str]], optional): Resolved paths of files not to process.
+      shard (Optional[Tuple[int, int]], optional): Only process shard i of n (1-based) of the discovered files.
+      force (bool, optional): Generate tests for items that already have tests. Defaults to False.
+      coverage_file (Optional[str], optional): A coverage.py data file; only items covered below the threshold get tests.
+      coverage_threshold (float, optional): Coverage ratio (0-1) from which items are skipped. Defaults to COVERAGE_THRESHOLD.
     
-    Returns:
-      List[dict]: A list of generated unit test definitions.
+    Raises:
+      ValueError: If project_path is not provided or the coverage file cannot be read.
+      FileNotFoundError: If the path does not exist.
+    
+    Yields:
+      Tuple[str, List[dict], Optional[str]]: A source file path, the generated unit tests of its items and the hash of its source.
     """
     if not project_path:
         raise ValueError("[ERROR] 'project_path' is required to generate mirrored test files.")
@@ -61,6 +178,47 @@ async def generate_unit_test_from_path_dict(
         raise FileNotFoundError(f"[ERROR] Path not found: {path}")
 
     project_path_obj = Path(project_path)
-    manager = UnitTestGenerationManager(model_name=model_name, project_path=project_path_obj)
-    results = await manager.generate_for_path(path, target_names=target_names)
-    return results
\ No newline at end of file
+    coverage = CoverageSelector(Path(coverage_file), project_path_obj, coverage_threshold) if coverage_file else None
+    manager = UnitTestGenerationManager(
+        model_name=model_name, project_path=project_path_obj, cascade=cascade, force=force, coverage=coverage
+    )
+    async for file_path, results, source_hash in manager.iter_path(
+        path, target_names=target_names, skip_files=skip_files, shard=shard
+    ):
+        yield file_path, results, source_hash
+
+
+async def generate_unit_test_from_path_dict(
+    path: str,
+    model_name: str = "gpt-4o-mini",
+    target_names: Optional[List[str]] = None,
+    project_path: Optional[str] = None,
+    cascade: Optional[List[str]] = None,
+    force: bool = False,
+) -> List[dict]:
+    """
+    Generates unit tests from a specified file or folder path.
+    
+    This function requires a valid project_path to correctly mirror the directory structure in the /tests directory.
+    
+    Args:
+      path (str): The path to the file or folder from which to generate unit tests.
+      model_name (str, optional): The name of the model to use for generation. Defaults to 'gpt-4o-mini'.
+      target_names (Optional[List[str]], optional): A list of specific target names to generate tests for. Defaults to None.
+      project_path (Optional[str], optional): The root path of the project to index and mirror. Defaults to None.
+      cascade (Optional[List[str]], optional): A model ladder (cheapest first) used instead of `model_name`.
+      force (bool, optional): Generate tests for items that already have tests. Defaults to False.
+    
+    Raises:
+      ValueError: If project_path is not provided.
+      FileNotFoundError: If the path does not exist.
+    
+    Returns:
+      List[dict]: A list of generated unit test definitions.
+    """
+    results: List[dict] = []
+    async for _, file_results, _ in stream_unit_test_from_path(
+        path, model_name, target_names, project_path, cascade=cascade, force=force
+    ):
+        results.extend(file_results)
+    return results
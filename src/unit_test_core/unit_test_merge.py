@@ -0,0 +1,250 @@
+import ast
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from src.core_base.code.code_model import CodeItem
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def mirrored_test_path(source_file: Path, project_path: Path, tests_root: str = "tests") -> Path:
+    """
+    Return the mirrored test file of a source file: `<tests_root>/<package path>/test_<module>.py`.
+
+    Args:
+      source_file (Path): The source file the tests are for.
+      project_path (Path): The project root the mirrored path is relative to.
+      tests_root (str, optional): The root directory for test files, defaulting to 'tests'.
+
+    Returns:
+      Path: The test file path.
+    """
+    src_path = Path(source_file).resolve()
+    try:
+        rel_path = src_path.relative_to(Path(project_path).resolve())
+    except ValueError:
+        rel_path = Path(src_path.name)
+    return Path(tests_root) / rel_path.parent / f"test_{rel_path.stem}.py"
+
+
+def referenced_symbols(tree: ast.AST) -> Set[str]:
+    """
+    Collect what test code refers to: loaded names, attribute names and the dotted segments
+    of string constants (patch targets such as 'pkg.mod.func').
+    """
+    symbols: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            symbols.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            symbols.add(node.attr)
+        elif isinstance(node, ast.alias):
+            symbols.add((node.asname or node.name).split(".")[0])
+            symbols.add(node.name.split(".")[-1])
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str) and node.value.isascii():
+            symbols.update(part for part in node.value.split(".") if part.isidentifier())
+    return symbols
+
+
+def is_covered(item: CodeItem, symbols: Set[str]) -> bool:
+    """
+    Tell whether existing tests already exercise an item.
+
+    Functions and classes must be referenced by name; methods need their class and their own
+    name (dunder methods such as `__init__` only need the class, they run implicitly).
+
+    Args:
+      item (CodeItem): The code item.
+      symbols (Set[str]): The symbols referenced by the existing test file (see referenced_symbols).
+
+    Returns:
+      bool: True if a matching test exists.
+    """
+    if item.type != "method":
+        return item.name in symbols
+    class_name = item.qualname.split(".")[0]
+    if item.name.startswith("__") and item.name.endswith("__"):
+        return class_name in symbols
+    return class_name in symbols and item.name in symbols
+
+
+def _bound_names(node: ast.stmt) -> Set[str]:
+    """
+    Return the names a top-level statement binds (definitions, assignment targets, imports).
+    """
+    if isinstance(node, _DEFINITIONS):
+        return {node.name}
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return {(a.asname or a.name).split(".")[0] for a in node.names}
+    targets = node.targets if isinstance(node, ast.Assign) else [getattr(node, "target", None)]
+    return {n.id for t in targets if t is not None for n in ast.walk(t) if isinstance(n, ast.Name)}
+
+
+def _is_test(node: ast.stmt) -> bool:
+    """
+    Tell whether a top-level statement is a test function or test class.
+    """
+    return isinstance(node, _DEFINITIONS) and node.name.startswith(("test", "Test"))
+
+
+def _fingerprint(node: ast.stmt) -> str:
+    """
+    Return a formatting-independent dump of a definition, to recognise a test that is already present.
+    """
+    return ast.dump(ast.parse(ast.unparse(node)).body[0])
+
+
+def _unique_name(name: str, taken: Set[str]) -> str:
+    """
+    Return `name`, or `name_2`, `name_3`, ... if it is taken.
+    """
+    candidate, counter = name, 2
+    while candidate in taken:
+        candidate, counter = f"{name}_{counter}", counter + 1
+    return candidate
+
+
+def merge_test_file(existing: str, generated: str) -> str:
+    """
+    Merge newly generated tests into an existing test file without touching what is there.
+
+    Existing code (including hand edits and comments) is kept verbatim. From the generated file:
+      - imports are merged structurally: aliases already bound are dropped and the others are added
+        to an existing `from <module> import ...` of the same module, or after the last import;
+      - test functions and classes are appended (renamed `<name>_2`, ... if their name is taken);
+      - helpers, fixtures and constants are appended only if their names are not bound yet.
+
+    Args:
+      existing (str): The current test file.
+      generated (str): The generated test file (imports followed by tests).
+
+    Returns:
+      str: The merged file (equal to `existing` when nothing new was generated).
+
+    Raises:
+      SyntaxError: If either file does not parse (the caller then falls back to overwriting).
+    """
+    old_tree = ast.parse(existing)
+    new_tree = ast.parse(generated)
+
+    bound: Set[str] = set()
+    for node in old_tree.body:
+        bound |= _bound_names(node)
+    existing_tests = {_fingerprint(node) for node in old_tree.body if _is_test(node)}
+
+    # --- Imports: only the aliases that bind something new ---
+    new_imports: List[ast.stmt] = []
+    for node in new_tree.body:
+        if not isinstance(node, (ast.Import, ast.ImportFrom)):
+            continue
+        aliases = [a for a in node.names if (a.asname or a.name).split(".")[0] not in bound]
+        if aliases:
+            bound |= {(a.asname or a.name).split(".")[0] for a in aliases}
+            node.names = aliases
+            new_imports.append(node)
+
+    # --- Definitions and other statements, copied with their decorators and comments ---
+    generated_lines = generated.splitlines()
+    appended: List[str] = []
+    for node in new_tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)) or (
+            isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)
+        ):
+            continue  # Imports are merged above; module docstrings are dropped
+        names = _bound_names(node)
+        if not names or (names & bound and not _is_test(node)):
+            continue  # Helper, fixture or constant the file already defines
+        if _is_test(node) and _fingerprint(node) in existing_tests:
+            continue  # The same test is already there
+        start = min([d.lineno for d in getattr(node, "decorator_list", [])] + [node.lineno])
+        block = "\n".join(generated_lines[start - 1:node.end_lineno])
+        if _is_test(node) and node.name in bound:
+            unique = _unique_name(node.name, bound)
+            block = re.sub(rf"\b(def|class)(\s+){re.escape(node.name)}\b", rf"\g<1>\g<2>{unique}", block, count=1)
+            names = {unique}
+        bound |= names
+        appended.append(block)
+
+    if not new_imports and not appended:
+        return existing
+
+    lines = existing.splitlines(keepends=True)
+    newline = "\r\n" if existing.count("\r\n") * 2 > existing.count("\n") else "\n"
+    replacements: Dict[int, str] = {}  # 0-based first line -> new text of a merged import
+    removed: Set[int] = set()
+    inserted: List[str] = []
+
+    old_from: Dict[str, ast.ImportFrom] = {
+        node.module: node
+        for node in old_tree.body
+        if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module
+    }
+    for node in new_imports:
+        target = old_from.get(node.module) if isinstance(node, ast.ImportFrom) and node.level == 0 else None
+        if target is None:
+            inserted.append(ast.unparse(node))
+            continue
+        target.names = target.names + node.names
+        # Keep a trailing comment of a single-line import
+        first = lines[target.lineno - 1]
+        comment = first[target.end_col_offset:].rstrip("\r\n") if target.end_lineno == target.lineno and first.isascii() else ""
+        replacements[target.lineno - 1] = ast.unparse(target) + comment + newline
+        removed.update(range(target.lineno, target.end_lineno))
+
+    last_import = max(
+        (node.end_lineno for node in old_tree.body if isinstance(node, (ast.Import, ast.ImportFrom))),
+        default=_header_end(old_tree),
+    )
+
+    out: List[str] = []
+    for index, line in enumerate(lines):
+        if index in removed:
+            continue
+        out.append(replacements.get(index, line))
+        if index == last_import - 1 and inserted:
+            if not out[-1].endswith(("\n", "\r")):
+                out[-1] += newline
+            out.extend(text + newline for text in inserted)
+            inserted = []
+    if inserted:  # Empty file or no line after the header
+        out = [text + newline for text in inserted] + out
+
+    merged = "".join(out).rstrip() + newline
+    for block in appended:
+        merged += newline + newline + newline.join(block.splitlines()) + newline
+    return merged
+
+
+def _header_end(tree: ast.Module) -> int:
+    """
+    Return the last line of the module docstring and `__future__` imports (0 if none).
+    """
+    end = 0
+    for node in tree.body:
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str) and not end:
+            end = node.end_lineno
+        elif isinstance(node, ast.ImportFrom) and node.module == "__future__":
+            end = node.end_lineno
+        else:
+            break
+    return end
+
+
+def covered_items(items: List[CodeItem], test_file: Path) -> Optional[List[CodeItem]]:
+    """
+    Return the items that already have tests in a test file.
+
+    Args:
+      items (List[CodeItem]): The items of the source file.
+      test_file (Path): Its mirrored test file.
+
+    Returns:
+      Optional[List[CodeItem]]: The covered items, or None if the test file is missing or does not parse.
+    """
+    try:
+        tree = ast.parse(Path(test_file).read_text(encoding="utf-8"))
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return None
+    symbols = referenced_symbols(tree)
+    return [item for item in items if is_covered(item, symbols)]
@@ -6,14 +6,12 @@ class UnitTestOutput(BaseModel):
     A model representing the output from the LLM for generating pytest unit tests.
 
     Attributes:
-        name (str): The name of the function to be tested.
+        id (str): The short ID of the tested function, as labelled in the prompt (e.g. 'i3').
         test_code (str): The complete pytest code as a string that tests the function.
-        file_path (str | Path): The path of the Python file containing the function, for uniqueness.
         imports (List[str], optional): Additional import statements required for the test.
     """
-    name: str
+    id: str
     test_code: str
-    file_path: str
     imports: List[str] = []
 
 class UnitTestOutputList(BaseModel):
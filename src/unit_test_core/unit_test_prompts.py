@@ -27,8 +27,7 @@ Return a **JSON object** matching this Pydantic model:
 {
   "items": [
     {
-      "name": "string",          # function name
-      "file_path": "string",     # path of the file containing the function
+      "id": "string",            # item ID from the prompt header, e.g. "i3"
       "test_code": "string",     # pytest code body (without imports)
       "imports": ["string", ...] # list of import statements required
     }
@@ -47,9 +46,9 @@ PROMPT_TEMPLATE_TESTS = """
 Analyze the following Python functions.
 Generate pytest unit tests for each function provided.
 
+Each target is labelled "# [<id>] <type> <name>" below the "# File:" line of its file.
 Each output should be a JSON array of objects, each object with the following keys:
-- "name": the function name
-- "file_path": the path to the file containing the function
+- "id": the ID of the function (e.g. "i3")
 - "test_code": the full pytest code as a string
 - "imports": a list of import statements required for the test
 
@@ -0,0 +1,240 @@
+import ast
+import builtins
+import importlib.util
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Set
+
+from src.core_base.code.extractor_utils import referenced_names
+from src.core_base.indexer.project_indexer import ProjectIndexer
+
+# Names every module can read without binding them
+_MODULE_NAMES = set(dir(builtins)) | {"__file__", "__builtins__"}
+
+
+def _module_exists(module: str, project_path: Optional[Path]) -> bool:
+    """
+    Check whether an absolute module path resolves, without importing it.
+
+    Project modules are looked up as files or packages under `project_path`; anything else
+    must be an importable top-level module or package (stdlib or installed).
+
+    Args:
+      module (str): The dotted module path, e.g. 'pkg.utils'.
+      project_path (Optional[Path]): The project root used to resolve local modules.
+
+    Returns:
+      bool: True if the module can be found.
+    """
+    if project_path is not None:
+        base = Path(project_path).joinpath(*module.split("."))
+        if base.with_suffix(".py").is_file() or base.is_dir():
+            return True
+        if (Path(project_path) / module.split(".")[0]).exists():
+            return False  # Local package, but the submodule does not exist
+
+    # Only the top-level name: find_spec on 'a.b' would import 'a'
+    try:
+        return importlib.util.find_spec(module.split(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def validate_test_code(
+    test_code: str,
+    imports: Optional[List[str]] = None,
+    project_path: Optional[Path] = None,
+) -> List[str]:
+    """
+    Validate generated pytest code locally: it must parse, define at least one test and
+    only import modules that exist.
+
+    Args:
+      test_code (str): The generated test code.
+      imports (Optional[List[str]]): Extra import statements returned with the test.
+      project_path (Optional[Path]): The project root used to resolve local imports.
+
+    Returns:
+      List[str]: The problems found; an empty list means the test code is acceptable.
+    """
+    if not (test_code or "").strip():
+        return ["empty test code"]
+
+    try:
+        tree = ast.parse("\n".join(imports or []) + "\n" + test_code)
+    except SyntaxError as e:
+        return [f"syntax error: {e.msg} (line {e.lineno})"]
+
+    issues: List[str] = []
+    if not any(
+        isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test")
+        for node in ast.walk(tree)
+    ):
+        issues.append("no test function defined")
+
+    unresolved = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules = [node.module]
+        else:
+            continue  # Relative imports are rewritten by the writer
+        unresolved.update(m for m in modules if not _module_exists(m, project_path))
+
+    if unresolved:
+        issues.append(f"unresolved imports: {', '.join(sorted(unresolved))}")
+    return issues
+
+
+def _bound_names(tree: ast.AST) -> Set[str]:
+    """
+    Collect every name bound anywhere in a module: imports, definitions, parameters,
+    assignment/loop/with/except targets, pattern captures and global declarations.
+
+    The analysis ignores scopes and order on purpose: a name is only reported as undefined
+    when nothing in the file could bind it, so valid code is never sent to the fixer.
+    """
+    bound: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.update((a.asname or a.name).split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            bound.add(node.rest)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            bound.update(node.names)
+    return bound
+
+
+def _project_module_file(module: str, project_path: Path) -> Optional[Path]:
+    """
+    Return the file of a project module ('pkg/mod.py' or 'pkg/mod/__init__.py'), if any.
+    """
+    base = Path(project_path).joinpath(*module.split("."))
+    for candidate in (base.with_suffix(".py"), base / "__init__.py"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+@lru_cache(maxsize=256)
+def _module_level_names(file_path: Path, mtime: float) -> Optional[Set[str]]:
+    """
+    Return the names a project module binds at top level (None if it cannot be parsed or
+    uses a star import, i.e. its names cannot be known). `mtime` keys the cache.
+    """
+    try:
+        tree = ast.parse(file_path.read_text(encoding="utf-8"))
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return None
+    names: Set[str] = set()
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names):
+            return None
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)  # Not its body: local names are not module attributes
+        else:
+            names |= _bound_names(node)
+    return names
+
+
+def _missing_project_names(
+    module: str,
+    names: List[str],
+    project_path: Path,
+    indexer: Optional[ProjectIndexer] = None,
+) -> List[str]:
+    """
+    Return the names of a `from <module> import ...` that a project module does not define.
+
+    Functions and classes are looked up in the project index first; other names (constants,
+    re-exports, submodules) are checked against the module's own top-level bindings.
+    """
+    file_path = _project_module_file(module, project_path)
+    if file_path is None:
+        return []  # A namespace package: anything may be a submodule, checked elsewhere
+
+    indexed = {i.qualname for i in indexer.query_by_file(file_path)} if indexer else set()
+    missing = [n for n in names if n not in indexed]
+    if not missing:
+        return []
+
+    top_level = _module_level_names(file_path, file_path.stat().st_mtime)
+    if top_level is None:
+        return []
+    return [
+        n for n in missing
+        if n not in top_level and not _project_module_file(f"{module}.{n}", project_path)
+    ]
+
+
+def validate_test_file(
+    code: str,
+    project_path: Optional[Path] = None,
+    indexer: Optional[ProjectIndexer] = None,
+) -> List[str]:
+    """
+    Statically check an assembled test file before it is sent for review.
+
+    The file must compile, read no name that nothing binds, and import only modules (and,
+    for project modules, names) that exist. The diagnostics are precise enough to hand to
+    the fixer agent; an empty list means the file can be written without a review.
+
+    Args:
+      code (str): The full test file.
+      project_path (Optional[Path]): The project root used to resolve local imports.
+      indexer (Optional[ProjectIndexer]): The project index, used to look up imported definitions.
+
+    Returns:
+      List[str]: The problems found, one diagnostic per line number and kind.
+    """
+    try:
+        tree = ast.parse(code)
+        compile(tree, "<test file>", "exec")
+    except SyntaxError as e:
+        return [f"line {e.lineno}: syntax error: {e.msg}"]
+
+    issues: List[str] = []
+    if not any(
+        isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test")
+        for node in ast.walk(tree)
+    ):
+        issues.append("no test function defined")
+
+    star_import = any(
+        isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names) for node in ast.walk(tree)
+    )
+    if not star_import:
+        first_use = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                first_use[node.id] = min(node.lineno, first_use.get(node.id, node.lineno))
+        for name in sorted(referenced_names(tree) - _bound_names(tree) - _MODULE_NAMES):
+            where = f"line {first_use[name]}: " if name in first_use else ""  # else: in a string annotation
+            issues.append(f"{where}undefined name '{name}'")
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if not _module_exists(alias.name, project_path):
+                    issues.append(f"line {node.lineno}: unresolved import '{alias.name}'")
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                issues.append(f"line {node.lineno}: relative import 'from {'.' * node.level}{node.module or ''}' does not work from tests/")
+            elif not _module_exists(node.module, project_path):
+                issues.append(f"line {node.lineno}: unresolved import '{node.module}'")
+            elif project_path is not None:
+                names = [a.name for a in node.names if a.name != "*"]
+                for name in _missing_project_names(node.module, names, Path(project_path), indexer):
+                    issues.append(f"line {node.lineno}: '{node.module}' has no name '{name}'")
+    return issues
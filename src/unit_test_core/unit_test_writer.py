@@ -1,7 +1,18 @@
+import ast
+import asyncio
+import textwrap
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, Tuple
 from collections import defaultdict
+from src.core_base.code.extractor_utils import referenced_names
+from src.core_base.code.file_io import read_text, run_io, write_text_if_changed
+from src.core_base.indexer.project_indexer import ProjectIndexer
 from src.unit_test_core.fixer_agent import UnitTestFixerAgent  # Custom LLM agent
+from src.unit_test_core.fix_patch import FixPatch, apply_patch, failing_regions, other_blocks, render_regions
+from src.unit_test_core.unit_test_validation import validate_test_file
+from src.unit_test_core.sandbox_runner import SandboxRunner
+from src.unit_test_core.unit_test_merge import merge_test_file, mirrored_test_path
+from constants import FIXER_MODE, REVIEW_CONCURRENCY
 
 SYSTEM_PROMPT_FIXER = """
 You are an expert Python developer and pytest specialist.
@@ -27,52 +38,164 @@ Output format:
 """
 
 
+def _split_imports(test_code: str):
+    """
+    Separates the top-level import statements of generated test code from the rest, so they are
+    normalized with the other imports instead of being repeated in the middle of the file.
+
+    Args:
+      test_code (str): The generated test code.
+
+    Returns:
+      Tuple[str, List[str]]: The code without its top-level imports, and those imports.
+    """
+    try:
+        tree = ast.parse(test_code)
+    except SyntaxError:
+        return test_code, []
+    lines = test_code.splitlines()
+    imports, removed = [], set()
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            imports.append(ast.unparse(node))
+            removed.update(range(node.lineno - 1, node.end_lineno))
+    if not imports:
+        return test_code, []
+    return "\n".join(line for index, line in enumerate(lines) if index not in removed), imports
+
+
 class UnitTestWriterWithReview:
     """
     Writes pytest test files for a project and optionally reviews the code using an LLM agent before writing.
+    
+    Test files are reviewed concurrently; one semaphore per writer bounds the in-flight reviews,
+    including those of concurrent `write_unit_tests` calls, so build one writer per run.
+    With a `verifier`, every test file is also run in a sandbox before it is written, and its
+    failures are sent back to the fixer for up to `fix_rounds` rounds.
     """
 
-    def __init__(self, model_name: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        review_concurrency: int = REVIEW_CONCURRENCY,
+        verifier: Optional[SandboxRunner] = None,
+        fix_rounds: int = 0,
+    ):
         """
         Initializes the UnitTestWriterWithReview with the specified model name. The default model is 'gpt-4o-mini'.
         
         Args:
           model_name (str): The name of the language model to use for code fixing.
+          review_concurrency (int): Maximum number of fixer reviews in flight, default is REVIEW_CONCURRENCY.
+          verifier (Optional[SandboxRunner]): Runs each test file before it is written, None to skip verification.
+          fix_rounds (int): Maximum fixer rounds for test files that fail verification, default is 0.
         """
         self.model_name = model_name
+        self.verifier = verifier
+        self.fix_rounds = max(0, fix_rounds)
+        self._review_slots = asyncio.Semaphore(max(1, review_concurrency))
         self.fixer_agent = UnitTestFixerAgent(name="unit_test_fixer",
                                               model_name=model_name, 
                                               system_prompt=SYSTEM_PROMPT_FIXER)
 
     @staticmethod
-    def normalize_imports(import_lines: List[str]) -> List[str]:
+    def normalize_imports(
+        import_lines: List[str],
+        source_imports: Optional[List[str]] = None,
+        code: str = "",
+    ) -> List[str]:
         """
-        Normalizes a list of import statements by grouping them into 'import' and 'from ... import' formats, ensuring no duplicates.
+        Normalizes import statements with `ast`: every alias of every statement (including
+        `as` aliases and multi-line imports) is kept, merged per module, deduplicated by the
+        name it binds and sorted (`__future__` first, then `import x`, then `from x import y`).
+        
+        Names used by `code` but bound by none of `import_lines` are imported from `source_imports`
+        (the minimal imports of the tested items), which fixes forgotten imports without a fixer round-trip.
+        When `code` parses, imports it never uses are pruned.
         
         Args:
           import_lines (List[str]): A list of import lines to normalize.
+          source_imports (Optional[List[str]]): Absolute import statements the tested items rely on.
+          code (str, optional): The test code the imports are for.
         
         Returns:
           List[str]: A sorted list of normalized import lines.
         """
-        import_map = defaultdict(set)  # module -> set of names
-        raw_imports = set()
-        for line in import_lines:
-            line = line.strip()
-            if line.startswith("import "):
-                raw_imports.add(line)
-            elif line.startswith("from "):
-                parts = line.split()
-                module = parts[1]
-                names = parts[3].split(",")
-                for n in names:
-                    import_map[module].add(n.strip())
-        normalized = list(raw_imports)
-        for module, names in import_map.items():
-            normalized.append(f"from {module} import {', '.join(sorted(names))}")
-        return sorted(normalized)
-
-    async def _review_code(self, code: str, project_path: str, original_path: str) -> str:
+        used: Optional[Set[str]] = None
+        if code:
+            try:
+                tree = ast.parse(code)
+                # Parameters count as uses: imported pytest fixtures are only named as arguments
+                used = referenced_names(tree) | {n.arg for n in ast.walk(tree) if isinstance(n, ast.arg)}
+            except SyntaxError:
+                used = None
+
+        # One entry per bound name (first statement wins), or per module for `import a.b` which
+        # can share its binding `a` with `import a`: key -> (bound, level, module or None, name, asname)
+        bindings: Dict[str, Tuple[str, int, Optional[str], str, Optional[str]]] = {}
+        bound_names: Set[str] = set()
+        star_imports: Set[Tuple[int, str]] = set()
+
+        def add(statements: List[str], only_missing: bool = False):
+            for statement in statements:
+                try:
+                    nodes = ast.parse(textwrap.dedent(statement)).body
+                except SyntaxError:
+                    continue  # Unparseable line: drop it rather than break the file
+                for node in nodes:
+                    if isinstance(node, ast.Import):
+                        entries = [(0, None, a.name, a.asname, a.asname or a.name.split(".")[0]) for a in node.names]
+                    elif isinstance(node, ast.ImportFrom):
+                        if only_missing and node.level:
+                            continue  # relative imports do not resolve from tests/
+                        if any(a.name == "*" for a in node.names):
+                            star_imports.add((node.level, node.module or ""))
+                            continue
+                        entries = [(node.level, node.module or "", a.name, a.asname, a.asname or a.name) for a in node.names]
+                    else:
+                        continue
+                    for level, module, name, asname, bound in entries:
+                        key = name if module is None and not asname else bound
+                        if key in bindings or (only_missing and (bound in bound_names or used is None or bound not in used)):
+                            continue
+                        bindings[key] = (bound, level, module, name, asname)
+                        bound_names.add(bound)
+
+        add(import_lines)
+        if source_imports:
+            add(source_imports, only_missing=True)
+
+        plain: Set[str] = set()
+        merged: Dict[Tuple[int, str], Set[str]] = defaultdict(set)
+        for bound, level, module, name, asname in bindings.values():
+            if used is not None and bound not in used and module != "__future__":
+                continue  # Unused by the tests
+            alias = f"{name} as {asname}" if asname and asname != name else name
+            if module is None:
+                plain.add(f"import {alias}")
+            else:
+                merged[(level, module)].add(alias)
+
+        def from_line(level: int, module: str, names: Set[str]) -> str:
+            line = f"from {'.' * level}{module} import {', '.join(sorted(names))}"
+            if len(line) <= 100:
+                return line
+            body = "".join(f"    {n},\n" for n in sorted(names))
+            return f"from {'.' * level}{module} import (\n{body})"
+
+        future = [from_line(0, m, n) for (l, m), n in merged.items() if m == "__future__"]
+        froms = [from_line(l, m, n) for (l, m), n in sorted(merged.items()) if m != "__future__"]
+        stars = [f"from {'.' * l}{m} import *" for l, m in sorted(star_imports)]
+        return future + sorted(plain) + froms + stars
+
+    async def _review_code(
+        self,
+        code: str,
+        project_path: str,
+        original_path: str,
+        diagnostics: Optional[List[str]] = None,
+        test_file: Optional[Path] = None,
+    ) -> str:
         """
         Submits the test file content for review and correction by the fixer agent.
         
@@ -80,77 +203,249 @@ class UnitTestWriterWithReview:
           code (str): The full content of the test file.
           project_path (str): The path to the project.
           original_path (str): The original path of the test file.
+          diagnostics (Optional[List[str]]): The problems found by the local validation, passed to the fixer.
+          test_file (Optional[Path]): The test file path, used to locate the diagnostics in it.
         
         Returns:
           str: The corrected version of the test file content.
         """
-        corrected_code = await self.fixer_agent.fix_tests(code, str(project_path), str(original_path))
+        async with self._review_slots:
+            if diagnostics and FIXER_MODE == "patch":
+                patched = await self._patch_code(code, project_path, original_path, diagnostics, test_file)
+                if patched is not None:
+                    return patched
+            corrected_code = await self.fixer_agent.fix_tests(
+                code, str(project_path), str(original_path), diagnostics=diagnostics
+            )
         return corrected_code
 
+    async def _patch_code(
+        self,
+        code: str,
+        project_path: str,
+        original_path: str,
+        diagnostics: List[str],
+        test_file: Optional[Path] = None,
+    ) -> Optional[str]:
+        """
+        Sends only the import block and the failing blocks to the fixer and applies the returned patch.
+        
+        Args:
+          code (str): The full content of the test file.
+          project_path (str): The path to the project.
+          original_path (str): The original path of the test file.
+          diagnostics (List[str]): The problems to fix.
+          test_file (Optional[Path]): The test file path, to tell its traceback frames from other files'.
+        
+        Returns:
+          Optional[str]: The patched test file, or None when the diagnostics cannot be located or
+          the patch cannot be applied (the caller then asks for the whole file).
+        """
+        regions = failing_regions(code, diagnostics, None if test_file is None else str(test_file))
+        if regions is None:
+            return None
+        response = await self.fixer_agent.fix_tests_patch(
+            render_regions(code, regions), other_blocks(code, regions), str(project_path), str(original_path), diagnostics
+        )
+        try:
+            return apply_patch(code, FixPatch.from_response(response))
+        except ValueError as e:
+            print(f"[WARN] Could not apply the fixer patch for {original_path} ({e}), asking for the whole file")
+            return None
+
+    async def _verify(self, test_file: Path, code: str, project_path: Path, original_path: str) -> str:
+        """
+        Runs a test file in the sandbox and, while tests fail and fix rounds remain, asks the
+        fixer to correct the reported failures. A fix is kept only if it passes more tests
+        without passing fewer.
+        
+        Args:
+          test_file (Path): The test file being written.
+          code (str): Its content.
+          project_path (Path): The project root.
+          original_path (str): The source file the tests were generated for.
+        
+        Returns:
+          str: The best verified version of the test file.
+        """
+        result = await self.verifier.run(test_file, code)
+        for round_number in range(1, self.fix_rounds + 1):
+            if not result.failures:
+                break
+            print(f"[INFO] {test_file}: {len(result.failures)} failing test(s), fix round {round_number}/{self.fix_rounds}")
+            fixed = await self._review_code(
+                code, str(project_path), original_path, [f.diagnostic() for f in result.failures], test_file
+            )
+            candidate = await self.verifier.run(test_file, fixed)
+            if candidate.passed >= result.passed and len(candidate.failures) < len(result.failures):
+                code, result = fixed, candidate
+        # Report the kept version
+        self.verifier.results[str(test_file)] = result
+
+        status = "✅" if result.ok else "❌"
+        print(f"{status} Verified {test_file}: {result.passed}/{result.total} passed in {result.duration:.2f}s")
+        return code
+
+    def _build_test_file(self, items: List[Dict]) -> str:
+        """
+        Assembles the content of one test file: normalized imports followed by every test function.
+        
+        Args:
+          items (List[Dict]): The generated unit tests of the file.
+        
+        Returns:
+          str: The test file content.
+        """
+        lines = []
+
+        # Collect all imports from items
+        all_imports = set()
+        source_imports = set()
+        bodies = []
+        for item in items:
+            for imp in item.get("imports", []):
+                all_imports.add(imp.strip())
+            source_imports.update(item.get("source_imports", []))
+            body, hoisted = _split_imports(item["test_code"])
+            all_imports.update(hoisted)
+            bodies.append(body)
+
+        # Normalize and merge
+        tests_code = "\n\n".join(bodies)
+        final_imports = self.normalize_imports(sorted(all_imports), sorted(source_imports), tests_code)
+        lines.extend(final_imports)
+        lines.append("")  # blank line after imports
+
+        # Add all test functions
+        for body in bodies:
+            lines.extend(body.strip().splitlines())
+            lines.append("")  # blank line between functions
+
+        # Combine into single string
+        return "\n".join(lines).rstrip() + "\n"
+
+    async def _write_test_file(
+        self,
+        test_file: Path,
+        items: List[Dict],
+        project_path: Path,
+        review: bool,
+        indexer: Optional[ProjectIndexer],
+        merge: bool = True,
+    ) -> bool:
+        """
+        Builds, optionally reviews and writes one test file.
+        
+        With `merge`, new tests are merged into the existing file (see merge_test_file); when
+        nothing new is added, the file is neither reviewed nor written.
+        
+        Args:
+          test_file (Path): The test file to write.
+          items (List[Dict]): Its generated unit tests.
+          project_path (Path): The project root.
+          review (bool): Whether to validate the code and have the fixer agent fix the problems found.
+          indexer (Optional[ProjectIndexer]): Project index refreshed after the file is written.
+          merge (bool): Merge into an existing test file instead of overwriting it.
+        
+        Returns:
+          bool: True if the file was written, False if it was already up to date.
+        """
+        full_file_code = self._build_test_file(items)
+
+        # Keep existing tests (and hand edits); only append what is new
+        if merge and test_file.is_file():
+            existing = await run_io(read_text, test_file)
+            try:
+                full_file_code = merge_test_file(existing, full_file_code)
+            except SyntaxError as e:
+                print(f"[WARN] Could not merge into {test_file} ({e.msg}, line {e.lineno}), overwriting it")
+            else:
+                if full_file_code == existing:
+                    print(f"[INFO] {test_file} already has these tests")
+                    return False
+
+        # Review and fix the code using the agent if requested, only when local checks find problems
+        if review:
+            diagnostics = await run_io(validate_test_file, full_file_code, project_path, indexer)
+            if diagnostics:
+                print(f"[INFO] {test_file}: {len(diagnostics)} problem(s) found, sending to the fixer")
+                full_file_code = await self._review_code(
+                    full_file_code, str(project_path), str(items[0]["file_path"]), diagnostics, test_file
+                )
+            else:
+                print(f"[INFO] {test_file} passed local validation, review skipped")
+
+        # Run the tests in the sandbox, looping failures back to the fixer
+        if self.verifier is not None:
+            full_file_code = await self._verify(test_file, full_file_code, project_path, str(items[0]["file_path"]))
+
+        # Write the final file (overwrite) atomically, off the event loop, unless unchanged
+        if not await run_io(write_text_if_changed, test_file, full_file_code):
+            print(f"[INFO] {test_file} already up to date")
+            return False
+        if indexer is not None:
+            await run_io(indexer.refresh_file, test_file)
+        print(f"✅ Updated {test_file}")
+        return True
+
     async def write_unit_tests(
         self,
         results: List[Dict],
         project_path: str,
         tests_root: str = "tests",
-        review: bool = True
-    ):
+        review: bool = True,
+        indexer: Optional[ProjectIndexer] = None,
+        merge: bool = True,
+    ) -> int:
         """
         Creates or updates pytest test files in a mirrored 'tests/' directory based on the results provided. Optionally reviews and fixes the generated code using an LLM agent.
         
+        Existing test files are updated with an AST merge: their tests and hand edits are kept, and
+        only tests and imports that are not there yet are added. Only files that change are reviewed.
+        
+        Test files are reviewed and written concurrently (see REVIEW_CONCURRENCY). Test files whose
+        content would not change are left untouched.
+        
         Args:
           results (List[Dict]): A list of test results containing file paths and test code.
           project_path (str): The path to the project root.
           tests_root (str, optional): The root directory for test files, defaulting to 'tests'.
           review (bool, optional): A flag indicating whether to review and fix the code, default is True.
+            The code is validated locally first (see validate_test_file); only files with problems reach the fixer.
+          indexer (Optional[ProjectIndexer], optional): Project index refreshed in place for every test file written.
+          merge (bool, optional): Merge new tests into existing test files instead of overwriting them, default is True.
+        
+        Returns:
+          int: The number of test files actually written.
+        
+        Raises:
+          RuntimeError: If some test files could not be reviewed or written (after the others are written).
         """
         project_path = Path(project_path).resolve()
-        tests_root = Path(tests_root)
         grouped = defaultdict(list)
+        written = 0
 
         # Group items by test file path
         for item in results:
-            src_path = Path(item["file_path"]).resolve()
-            try:
-                rel_path = src_path.relative_to(project_path)
-            except ValueError:
-                rel_path = src_path.name
-
-            test_file = tests_root / rel_path.parent / f"test_{rel_path.stem}.py"
-            grouped[test_file].append(item)
-
-        # Process each test file
-        for test_file, items in grouped.items():
-            orig_path = items[0]['file_path']
-            test_file.parent.mkdir(parents=True, exist_ok=True)
-            lines = []
-
-            # Collect all imports from items
-            all_imports = set()
-            for item in items:
-                for imp in item.get("imports", []):
-                    all_imports.add(imp.strip())
-
-            # Normalize and merge
-            final_imports = self.normalize_imports(list(all_imports))
-            lines.extend(final_imports)
-            lines.append("")  # blank line after imports
-
-            # Add all test functions
-            for item in items:
-                code_lines = item["test_code"].strip().splitlines()
-                lines.extend(code_lines)
-                lines.append("")  # blank line between functions
-
-            # Combine into single string
-            full_file_code = "\n".join(lines).rstrip() + "\n"
-
-            # Review and fix the code using the agent if requested
-            if review:
-                full_file_code = await self._review_code(full_file_code, str(project_path), str(orig_path))
-
-            # Write the final file (overwrite)
-            test_file.write_text(full_file_code, encoding="utf-8")
-            print(f"✅ Updated {test_file}")
+            grouped[mirrored_test_path(item["file_path"], project_path, tests_root)].append(item)
+
+        # Review and write every test file concurrently; a failing file does not stop the others
+        test_files = list(grouped)
+        outcomes = await asyncio.gather(
+            *(self._write_test_file(f, grouped[f], project_path, review, indexer, merge) for f in test_files),
+            return_exceptions=True,
+        )
+        failed = []
+        for test_file, outcome in zip(test_files, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"❌ Could not write {test_file}: {outcome}")
+                failed.append(str(test_file))
+            elif outcome:
+                written += 1
+
+        if failed:
+            raise RuntimeError(f"{len(failed)} test file(s) not written: {', '.join(failed)}")
+        return written
 
 # Usage example (async context):
 # writer = UnitTestWriterWithReview(model_name="gpt-4o-mini")